@@ -1,9 +1,18 @@
-import copy
+import math
+from typing import Optional
 
 from board.board_class import Board
-from board.interaction import add_piece
+from board.evaluation_cache import EvaluationCache
+from board.move_generation import non_losing_columns
+from board.pattern_based_value_calculation import get_board_value as get_pattern_board_value, \
+    get_board_values_array as get_pattern_board_values
 from board.value_calculation import get_board_value
+from board.views import view, writable_copy, played
 from data_structures import Observation, Configuration
+from search.negamax import get_searcher
+from search.stats import SearchStats
+from search.tablebase import Tablebase
+from search.threat_space import find_forced_win
 
 
 def random_agent(observation: Observation, configuration: Configuration):
@@ -11,35 +20,136 @@ def random_agent(observation: Observation, configuration: Configuration):
     return choice([c for c in range(configuration.columns) if observation.board[c] == 0])
 
 
-def simple_reward_agent(observation: Observation, configuration: Configuration):
-    board = Board(observation.board, configuration.rows, configuration.columns)
+def simple_reward_agent(observation: Observation, configuration: Configuration, *,
+                        cache: Optional[EvaluationCache] = None):
+    assert cache is None or cache.evaluate is get_board_value, \
+        'the cache must memoise value_calculation, not the evaluator it was created with'
+    board = view(observation.board, configuration.rows, configuration.columns)
     our_mark = observation.mark
+    evaluate = cache.get_board_value if cache is not None else get_board_value
     next_state_best_board_value = 0
     next_state_best_column = -1
-    for column in range(board.columns):
-        next_state_board = copy.deepcopy(board)
-        try:
-            add_piece(next_state_board, our_mark, column)
-        except AssertionError:
-            continue
-        next_state_value = get_board_value(next_state_board, our_mark)
+    columns = non_losing_columns(board, our_mark)
+    next_state_board = writable_copy(board)
+    for column in columns:
+        with played(next_state_board, our_mark, column):
+            next_state_value = evaluate(next_state_board, our_mark)
         if next_state_value > next_state_best_board_value:
             next_state_best_board_value = next_state_value
             next_state_best_column = column
 
     # total_reward = next_state_best_board_value - board_value
-    return next_state_best_column if next_state_best_column != -1 else 3
+    if next_state_best_column != -1:
+        return next_state_best_column
+    return 3 if 3 in columns else columns[0]
+
+
+def pattern_reward_agent(observation: Observation, configuration: Configuration, *,
+                         cache: Optional[EvaluationCache] = None):
+    """
+    a cache for this agent must be created with
+    `EvaluationCache(evaluate=pattern_based_value_calculation.get_board_value)`,
+    the key of the cache doesn't tell the evaluators apart
+    """
+    assert cache is None or cache.evaluate is get_pattern_board_value, \
+        'the cache must memoise pattern_based_value_calculation, not the evaluator it was created with'
+    board = view(observation.board, configuration.rows, configuration.columns)
+    our_mark = observation.mark
+    evaluate = cache.get_board_value if cache is not None else get_pattern_board_value
+    next_state_best_board_value = -math.inf
+    next_state_best_column = -1
+    next_state_board = writable_copy(board)
+    for column in non_losing_columns(board, our_mark):
+        with played(next_state_board, our_mark, column):
+            next_state_value = evaluate(next_state_board, our_mark)
+        if next_state_value > next_state_best_board_value:
+            next_state_best_board_value = next_state_value
+            next_state_best_column = column
 
+    return next_state_best_column
 
 
-def search_based_agent(observation: Observation, configuration: Configuration):
+def search_based_agent(observation: Observation, configuration: Configuration, *, depth: int = 6,
+                       time_limit: Optional[float] = None, searcher=None, threat_nodes: int = 2000,
+                       tablebase: Optional[Tablebase] = None):
+    """
+    negamax search, see `search.negamax`. Bind a `search.parallel.ParallelSearcher`
+    as searcher to split the root moves across processes, e.g.
+    `functools.partial(search_based_agent, searcher=ParallelSearcher())`.
+    A forced win of immediate threats found in `threat_nodes` nodes, see
+    `search.threat_space`, is played without searching; 0 disables it.
+    Positions stored in a bound `search.tablebase.Tablebase` are played from it.
+    """
     board = Board(observation.board, configuration.rows, configuration.columns)
     our_mark = observation.mark
+    if searcher is None:
+        searcher = get_searcher(configuration.rows, configuration.columns)
+    if tablebase is not None:
+        column = tablebase.best_column(board, our_mark)
+        if column is not None:
+            _report_shortcut(searcher, 'tablebase')
+            return column
+    if threat_nodes:
+        forced_win = find_forced_win(board, our_mark, threat_nodes)
+        if forced_win is not None:
+            _report_shortcut(searcher, 'threat')
+            return forced_win.column
+    return searcher.search(board, our_mark, depth, time_limit).column
+
+
+def _report_shortcut(searcher, source: str):
+    """reports a move played without searching to the listener of the searcher, see `search.stats`"""
+    listener = getattr(searcher, 'listener', None)
+    if listener is not None:
+        listener(SearchStats(source=source))
+
+
+def simple_reward_agent_batch(observations: list[Observation], configuration: Configuration, *,
+                              cache: Optional[EvaluationCache] = None) -> list[int]:
+    """
+    `simple_reward_agent` for many observations. Its evaluation can't be
+    vectorised, but a position reached from several boards of the batch is only
+    evaluated once, through a cache shared by the whole batch.
+    """
+    cache = cache if cache is not None else EvaluationCache()
+    return [simple_reward_agent(observation, configuration, cache=cache) for observation in observations]
+
+
+def pattern_reward_agent_batch(observations: list[Observation], configuration: Configuration) -> list[int]:
+    """`pattern_reward_agent` for many observations, with one vectorised evaluation of every next state"""
+    children = []
+    marks = []
+    candidates = []  # (observation index, column)
+    for i, observation in enumerate(observations):
+        board = Board(observation.board, configuration.rows, configuration.columns)
+        for column in non_losing_columns(board, observation.mark):
+            child = list(board.board)
+            child[board.landing_index(column)] = observation.mark
+            children.append(child)
+            marks.append(observation.mark)
+            candidates.append((i, column))
+
+    values = get_pattern_board_values(children, marks, configuration.rows, configuration.columns)
+    best_values = [-math.inf] * len(observations)
+    best_columns = [-1] * len(observations)
+    for (i, column), value in zip(candidates, values.tolist()):
+        if value > best_values[i]:
+            best_values[i] = value
+            best_columns[i] = column
+    return best_columns
 
-    for column in range(board.columns):
-        next_state_board = copy.deepcopy(board)
-        try:
-            add_piece(next_state_board, our_mark, column)
-        except AssertionError:
-            continue
 
+def search_based_agent_batch(observations: list[Observation], configuration: Configuration, *, depth: int = 6,
+                             time_limit: Optional[float] = None, threat_nodes: int = 2000,
+                             tablebase: Optional[Tablebase] = None) -> list[int]:
+    """
+    `search_based_agent` for many observations, all searched with the same
+    searcher, so positions shared between the boards of the batch are found in
+    its transposition table
+    """
+    searcher = get_searcher(configuration.rows, configuration.columns)
+    return [
+        search_based_agent(observation, configuration, depth=depth, time_limit=time_limit, searcher=searcher,
+                           threat_nodes=threat_nodes, tablebase=tablebase)
+        for observation in observations
+    ]
@@ -0,0 +1,79 @@
+"""registry of the agents in this project, by the names used on the command line"""
+import atexit
+import types
+from functools import partial
+
+from agent import random_agent, simple_reward_agent, pattern_reward_agent, search_based_agent, \
+    simple_reward_agent_batch, pattern_reward_agent_batch, search_based_agent_batch
+from arena.batch import BatchAgent, batched
+from arena.game import Agent
+from board.evaluation_cache import EvaluationCache
+from board.pattern_based_value_calculation import get_board_value as get_pattern_board_value
+from priority_based_agent.batch import priority_based_agent_batch
+from priority_based_agent.incremental import IncrementalPriorityAgent
+from priority_based_agent.priority_based_agent import priority_based_agent
+from priority_based_agent.submission import act
+from search.parallel import ParallelSearcher
+from search.ponder import PonderingAgent
+
+
+def _closed_at_exit(searcher: ParallelSearcher) -> ParallelSearcher:
+    """the searcher, closed when the interpreter exits, as its pool and shared table outlive the calls of the agent"""
+    atexit.register(searcher.close)
+    return searcher
+
+
+AGENTS: dict[str, Agent] = {
+    'random': random_agent,
+    'simple_reward': simple_reward_agent,
+    'simple_reward_cached': partial(simple_reward_agent, cache=EvaluationCache()),
+    'pattern_reward': pattern_reward_agent,
+    'pattern_reward_cached': partial(
+        pattern_reward_agent, cache=EvaluationCache(evaluate=get_pattern_board_value)
+    ),
+    'priority': priority_based_agent,
+    'priority_lookahead': partial(priority_based_agent, lookahead=True),
+    'priority_threats': partial(priority_based_agent, threat_nodes=2000),
+    'priority_incremental': IncrementalPriorityAgent(),
+    'search': search_based_agent,
+    'search_no_threats': partial(search_based_agent, threat_nodes=0),
+    'search_parallel': partial(search_based_agent, searcher=_closed_at_exit(ParallelSearcher())),
+    'search_parallel_shared': partial(search_based_agent,
+                                      searcher=_closed_at_exit(ParallelSearcher(table_size=1 << 20))),
+    'search_ponder': PonderingAgent(),
+    'submission': act,
+}
+
+
+def is_stateful(agent: Agent) -> bool:
+    """
+    whether the agent keeps state between calls, which races when several
+    threads call it at once: an instance of a class, an agent with a bound
+    `cache` or `searcher`, or a search agent using the searcher of the process
+    (`search.negamax.get_searcher`); a process pool calls each copy from one thread only
+    """
+    function, keywords = (agent.func, agent.keywords) if isinstance(agent, partial) else (agent, {})
+    if keywords.get('cache') is not None or keywords.get('searcher') is not None:
+        return True
+    if function in (search_based_agent, search_based_agent_batch):
+        return True
+    return not isinstance(function, types.FunctionType)
+
+
+# entry points acting on many observations in one call, see `arena.batch`
+BATCH_AGENTS: dict[str, BatchAgent] = {
+    'simple_reward': simple_reward_agent_batch,
+    'pattern_reward': pattern_reward_agent_batch,
+    'priority': priority_based_agent_batch,
+    'search': search_based_agent_batch,
+}
+
+
+def get_agent(name: str) -> Agent:
+    assert name in AGENTS, f'unknown agent {name}, choose from {sorted(AGENTS)}'
+    return AGENTS[name]
+
+
+def get_batch_agent(name: str) -> BatchAgent:
+    """the batch entry point of the agent, or one calling the agent per observation"""
+    return BATCH_AGENTS[name] if name in BATCH_AGENTS else batched(get_agent(name))
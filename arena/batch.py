@@ -0,0 +1,70 @@
+"""
+Plays many games in lockstep, so that every agent is called once per move for
+all running games at once, through its batch entry point (see `BATCH_AGENTS`
+in `arena.agents`). All games start together, so at every step the same
+player is to move in all of them.
+"""
+import random
+from typing import Callable, Optional
+
+from arena.game import Agent, GameRecord, GameState, Turn
+from data_structures import Observation, Configuration
+
+BatchAgent = Callable[[list[Observation], Configuration], list[int]]
+
+
+def batched(agent: Agent) -> BatchAgent:
+    """a batch entry point for an agent without one, calling it once per observation"""
+    def act_batch(observations: list[Observation], configuration: Configuration) -> list[int]:
+        return [agent(observation, configuration) for observation in observations]
+
+    return act_batch
+
+
+def play_games(
+        agents: list[BatchAgent],
+        configuration: Configuration,
+        games: int,
+        opening_moves: int = 0,
+        seed: int = 0,
+        on_moves: Optional[Callable[[list[int], int], None]] = None
+) -> list[GameRecord]:
+    """
+    plays `games` games between agents[0] (mark 1) and agents[1] (mark 2), with
+    the rules of `arena.game.play_game`; the random opening moves of game i are
+    drawn from `random.Random(seed + i)`. `on_moves` is called after every call
+    of an agent, with the indexes of the games in the call and the mark.
+    """
+    assert len(agents) == 2, 'a game needs exactly two agents'
+    states = [GameState(configuration) for _ in range(games)]
+    rngs = [random.Random(seed + game) for game in range(games)]
+    records = [GameRecord() for _ in range(games)]
+    running = list(range(games))
+
+    for step in range(configuration.rows * configuration.columns):
+        if not running:
+            break
+        mark = step % 2 + 1
+        if step < opening_moves:
+            columns = [rngs[game].choice(states[game].board.legal_columns()) for game in running]
+        else:
+            observations = [states[game].observation(step, mark) for game in running]
+            columns = agents[mark - 1](observations, configuration)
+            assert len(columns) == len(running), 'a batch agent must return one column per observation'
+            if on_moves is not None:
+                on_moves(running, mark)
+
+        still_running = []
+        for game, column in zip(running, columns):
+            state, record = states[game], records[game]
+            record.turns.append(Turn(list(state.board.board), mark, column))
+            if not state.is_legal(column):
+                record.invalid_move_by = mark
+                record.winner = 3 - mark
+            elif state.play(mark, column):
+                record.winner = mark
+            else:
+                still_running.append(game)
+        running = still_running
+
+    return records
@@ -0,0 +1,112 @@
+"""
+Measures the per-move latency of agents on a fixed corpus of games.
+
+Every agent plays the same seeded games against a random opponent, alternating
+colors, and only the agent's own moves are timed. With --baseline, the speedup of every
+agent's mean latency over the baseline agent is reported too, e.g. for the
+parallel search over the single-process one
+
+    python -m arena.benchmark --agents priority priority_incremental --games 20
+    python -m arena.benchmark --agents search search_parallel --baseline search
+"""
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import time
+from dataclasses import dataclass
+
+from arena.agents import get_agent, AGENTS
+from arena.game import play_game, Agent
+from data_structures import Configuration
+
+
+@dataclass
+class LatencyReport:
+    name: str
+    moves: int
+    mean: float  # all in milliseconds
+    median: float
+    p95: float
+    max: float
+
+    def speedup_over(self, baseline: 'LatencyReport') -> float:
+        return baseline.mean / self.mean
+
+    def __str__(self):
+        return f'{self.name:<24} {self.moves:>6} {self.mean:>9.2f} {self.median:>9.2f} {self.p95:>9.2f} {self.max:>9.2f}'
+
+
+def seeded_random_agent(seed: int) -> Agent:
+    rng = random.Random(seed)
+
+    def agent(observation, configuration):
+        return rng.choice([c for c in range(configuration.columns) if observation.board[c] == 0])
+
+    return agent
+
+
+def measure_latencies(agent: Agent, games: int, configuration: Configuration, opening_moves: int = 2,
+                      seed: int = 0) -> list[float]:
+    """returns the duration of every move of the agent, in seconds"""
+    latencies = []
+
+    def timed_agent(observation, configuration_):
+        start = time.perf_counter()
+        column = agent(observation, configuration_)
+        latencies.append(time.perf_counter() - start)
+        return column
+
+    for game in range(games):
+        opponent = seeded_random_agent(seed + game)
+        agents = [timed_agent, opponent] if game % 2 == 0 else [opponent, timed_agent]
+        # some agents print their reasoning on every move
+        with contextlib.redirect_stdout(io.StringIO()):
+            play_game(agents, configuration, opening_moves, random.Random(seed + game))
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> LatencyReport:
+    milliseconds = sorted(latency * 1000 for latency in latencies)
+    return LatencyReport(
+        name,
+        len(milliseconds),
+        statistics.fmean(milliseconds),
+        statistics.median(milliseconds),
+        milliseconds[int(0.95 * (len(milliseconds) - 1))],
+        milliseconds[-1],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', nargs='+', default=['priority', 'priority_incremental'], choices=sorted(AGENTS))
+    parser.add_argument('--baseline', choices=sorted(AGENTS), help='report speedups over this agent')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--opening-moves', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    configuration = Configuration(columns=args.columns, rows=args.rows)
+    names = args.agents
+    if args.baseline is not None and args.baseline not in names:
+        names = [args.baseline] + names
+    reports = {
+        name: report(name, measure_latencies(get_agent(name), args.games, configuration, args.opening_moves, args.seed))
+        for name in names
+    }
+
+    header = f'{"agent":<24} {"moves":>6} {"mean ms":>9} {"median":>9} {"p95":>9} {"max":>9}'
+    print(header if args.baseline is None else f'{header} {"speedup":>9}')
+    for latency_report in reports.values():
+        if args.baseline is None:
+            print(latency_report)
+        else:
+            print(f'{latency_report} {latency_report.speedup_over(reports[args.baseline]):>8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
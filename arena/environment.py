@@ -0,0 +1,284 @@
+"""
+A local stand-in for `kaggle_environments.make('connectx')`, to play and
+render games without importing kaggle_environments or going online.
+
+It keeps the shapes of the Kaggle environment: agents are called with an
+observation (`board`, `step`, `mark`, `remainingOverageTime`) and the
+configuration (`columns`, `rows`, `inarow`, `timeout`, `actTimeout`, ...),
+both dicts that also allow attribute access, and `steps` holds the state of
+both agents after every step (`action`, `reward`, `info`, `observation`,
+`status`), with the board and step in the observation of the first agent.
+A win scores 1 and the loss -1; a draw scores 0 for both. An agent that
+plays an invalid column, raises, or runs out of time (a move may overrun
+`actTimeout` by the `remainingOverageTime` it has left) scores None and its
+opponent 0.
+
+With `validate=False` the fast path skips the checks of the configuration and
+the actions, and agents get the board of the game itself rather than a copy,
+so they must not change it.
+
+    env = make('connectx', debug=True)
+    env.run([priority_based_agent, 'random'])
+    print(env.render(mode='ansi'))
+"""
+import time
+from typing import Callable, Optional, Union
+
+from arena.agents import get_agent
+
+DEFAULT_CONFIGURATION = {
+    'episodeSteps': 1000,
+    'actTimeout': 2,
+    'runTimeout': 1200,
+    'agentTimeout': 60,
+    'columns': 7,
+    'rows': 6,
+    'inarow': 4,
+    'timeout': 2,
+}
+
+ACTIVE, INACTIVE, DONE, INVALID, TIMEOUT, ERROR = 'ACTIVE', 'INACTIVE', 'DONE', 'INVALID', 'TIMEOUT', 'ERROR'
+
+AgentSpec = Union[str, Callable, None]
+
+
+class Struct(dict):
+    """a dict whose keys are also attributes, like `kaggle_environments.utils.Struct`"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+def validate_configuration(configuration: dict):
+    for key in ['columns', 'rows', 'inarow']:
+        assert isinstance(configuration[key], int) and configuration[key] > 0, f'{key} must be a positive int'
+    assert configuration['inarow'] <= max(configuration['columns'], configuration['rows']), \
+        'inarow must fit on the board'
+    for key in ['actTimeout', 'agentTimeout', 'runTimeout', 'timeout']:
+        assert isinstance(configuration[key], (int, float)) and configuration[key] >= 0, \
+            f'{key} must be a non-negative number'
+
+
+def is_win(board: list[int], columns: int, inarow: int, index: int) -> bool:
+    """returns if the piece at index is part of `inarow` pieces of its player in a row"""
+    rows = len(board) // columns
+    row, column = divmod(index, columns)
+    mark = board[index]
+    for row_step, column_step in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        count = 1
+        for sign in [1, -1]:
+            r, c = row + sign * row_step, column + sign * column_step
+            while 0 <= r < rows and 0 <= c < columns and board[r * columns + c] == mark:
+                count += 1
+                r, c = r + sign * row_step, c + sign * column_step
+        if count >= inarow:
+            return True
+    return False
+
+
+def make(environment: str = 'connectx', configuration: Optional[dict] = None, debug: bool = False,
+         validate: bool = True) -> 'Environment':
+    """`kaggle_environments.make` for connectx; `debug` re-raises the exceptions of agents"""
+    assert environment == 'connectx', f'only connectx is available, not {environment}'
+    return Environment({**DEFAULT_CONFIGURATION, **(configuration or {})}, debug, validate)
+
+
+class Environment:
+    def __init__(self, configuration: dict, debug: bool = False, validate: bool = True):
+        if validate:
+            validate_configuration(configuration)
+        self.name = 'connectx'
+        self.configuration = Struct(configuration)
+        self.debug = debug
+        self.validate = validate
+        self.board: list[int] = []
+        self.steps: list[list[Struct]] = []
+        self.reset()
+
+    @property
+    def state(self) -> list[Struct]:
+        return self.steps[-1]
+
+    @property
+    def done(self) -> bool:
+        return all(agent.status not in (ACTIVE, INACTIVE) for agent in self.state)
+
+    def reset(self, num_agents: int = 2) -> list[Struct]:
+        assert num_agents == 2, 'connectx is played by two agents'
+        configuration = self.configuration
+        self.board = [0] * (configuration.rows * configuration.columns)
+        overage = configuration.agentTimeout
+        self.steps = [[
+            Struct(action=0, reward=0, info={}, status=ACTIVE,
+                   observation=Struct(remainingOverageTime=overage, step=0, board=list(self.board), mark=1)),
+            Struct(action=0, reward=0, info={}, status=INACTIVE,
+                   observation=Struct(remainingOverageTime=overage, mark=2)),
+        ]]
+        return self.state
+
+    def observation(self, mark: int) -> Struct:
+        """the observation the agent with that mark is called with"""
+        return Struct(
+            remainingOverageTime=self.state[mark - 1].observation.remainingOverageTime,
+            step=len(self.steps) - 1,
+            board=list(self.board) if self.validate else self.board,
+            mark=mark,
+        )
+
+    def step(self, actions: list) -> list[Struct]:
+        """plays the action of the active agent, the other action is ignored"""
+        return self._step(actions)
+
+    def _step(self, actions: list, failure: Optional[str] = None) -> list[Struct]:
+        """`step`, or with a `failure` (ERROR or TIMEOUT, see `act`) ends the game for the active agent"""
+        assert not self.done, 'the game is over, call reset'
+        previous = self.state
+        state = [Struct(agent, observation=Struct(agent.observation), info={}) for agent in previous]
+        active = 0 if previous[0].status == ACTIVE else 1
+        for agent, action in zip(state, actions):
+            agent.action = action
+        if failure is not None:
+            state[active].action = None
+            state[active].status, state[active].reward = failure, None
+            state[1 - active].status = DONE
+        else:
+            self._play(state, active, actions[active])
+        state[0].observation.step = len(self.steps)
+        state[0].observation.board = list(self.board)
+        self.steps.append(state)
+        return state
+
+    def _play(self, state: list[Struct], active: int, action):
+        configuration = self.configuration
+        player, opponent = state[active], state[1 - active]
+        if self.validate and not (isinstance(action, int) and not isinstance(action, bool)):
+            player.info = {'error': f'invalid action {action!r}'}
+            action = -1
+        try:
+            column = int(action)
+        except (TypeError, ValueError):
+            column = -1
+        if not 0 <= column < configuration.columns or self.board[column] != 0:
+            player.status, player.reward = INVALID, None
+            opponent.status = DONE
+            return
+
+        index = max(row * configuration.columns + column for row in range(configuration.rows)
+                    if self.board[row * configuration.columns + column] == 0)
+        self.board[index] = active + 1
+        if is_win(self.board, configuration.columns, configuration.inarow, index):
+            player.reward, opponent.reward = 1, -1
+            player.status = opponent.status = DONE
+        elif all(self.board[:configuration.columns]) or len(self.steps) >= configuration.episodeSteps:
+            player.status = opponent.status = DONE
+        else:
+            player.status, opponent.status = INACTIVE, ACTIVE
+
+    def act(self, agent: Callable, mark: int) -> tuple[object, Optional[str]]:
+        """
+        returns the action of the agent and None, or None and the status ERROR
+        or TIMEOUT; the time beyond `actTimeout` is taken from its overage time
+        """
+        observation = self.observation(mark)
+        start = time.perf_counter()
+        try:
+            action = agent(observation, self.configuration)
+        except Exception:
+            if self.debug:
+                raise
+            return None, ERROR
+        overrun = time.perf_counter() - start - self.configuration.actTimeout
+        if overrun > 0:
+            overage = self.state[mark - 1].observation.remainingOverageTime - overrun
+            self.state[mark - 1].observation.remainingOverageTime = max(overage, 0)
+            if overage < 0:
+                return None, TIMEOUT
+        return action, None
+
+    def run(self, agents: list[AgentSpec]) -> list[list[Struct]]:
+        """plays a whole game from the current state; agents are callables or names of `arena.agents`"""
+        agents = [get_agent(agent) if isinstance(agent, str) else agent for agent in agents]
+        assert len(agents) == 2, 'connectx is played by two agents'
+        while not self.done:
+            active = 0 if self.state[0].status == ACTIVE else 1
+            actions = [0, 0]
+            actions[active], failure = self.act(agents[active], active + 1)
+            self._step(actions, failure)
+        return self.steps
+
+    def train(self, agents: list[AgentSpec]) -> 'Trainer':
+        """a trainer for the agent in place of None, playing against the other"""
+        assert len(agents) == 2 and agents.count(None) == 1, 'exactly one of the agents must be None'
+        return Trainer(self, agents)
+
+    def toJSON(self) -> dict:
+        """the episode, in the shape of Kaggle's episode logs, see `arena.replay`"""
+        return {
+            'name': self.name,
+            'configuration': dict(self.configuration),
+            'rewards': [agent.reward for agent in self.state],
+            'statuses': [agent.status for agent in self.state],
+            'steps': self.steps,
+        }
+
+    def render(self, mode: str = 'ansi') -> Optional[str]:
+        assert mode in ('ansi', 'human'), 'only the ansi and human modes are available offline'
+        columns = self.configuration.columns
+        symbols = {0: '.', 1: 'X', 2: 'O'}
+        lines = [' '.join(symbols[value] for value in self.board[row:row + columns])
+                 for row in range(0, len(self.board), columns)]
+        lines.append(' '.join(str(column) for column in range(columns)))
+        text = '\n'.join(lines) + '\n'
+        if mode == 'human':
+            print(text, end='')
+            return None
+        return text
+
+
+class Trainer:
+    """`kaggle_environments` trainer: steps a game for one agent, playing the opponent's moves in between"""
+
+    def __init__(self, environment: Environment, agents: list[AgentSpec]):
+        self.environment = environment
+        self.position = agents.index(None)
+        opponent = agents[1 - self.position]
+        self.opponent = get_agent(opponent) if isinstance(opponent, str) else opponent
+
+    def reset(self) -> Struct:
+        self.environment.reset()
+        self._play_opponent()
+        return self.environment.observation(self.position + 1)
+
+    def step(self, action: int) -> tuple[Struct, Optional[float], bool, dict]:
+        """plays the action and the opponent's reply; returns (observation, reward, done, info)"""
+        actions = [0, 0]
+        actions[self.position] = action
+        self.environment.step(actions)
+        self._play_opponent()
+        agent = self.environment.state[self.position]
+        return self.environment.observation(self.position + 1), agent.reward, self.environment.done, agent.info
+
+    def _play_opponent(self):
+        environment = self.environment
+        opponent = 1 - self.position
+        if not environment.done and environment.state[opponent].status == ACTIVE:
+            actions = [0, 0]
+            actions[opponent], failure = environment.act(self.opponent, opponent + 1)
+            environment._step(actions, failure)
+
+
+def evaluate(environment: str, agents: list[AgentSpec], configuration: Optional[dict] = None,
+             num_episodes: int = 1, validate: bool = True) -> list[list[Optional[float]]]:
+    """`kaggle_environments.evaluate`: the rewards of both agents in every episode"""
+    rewards = []
+    for _ in range(num_episodes):
+        env = make(environment, configuration, validate=validate)
+        env.run(agents)
+        rewards.append([agent.reward for agent in env.state])
+    return rewards
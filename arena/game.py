@@ -0,0 +1,89 @@
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from board.bitboard import get_layout, has_four
+from board.board_class import Board
+from board.interaction import add_piece
+from data_structures import Observation, Configuration
+
+Agent = Callable[[Observation, Configuration], int]
+
+
+@dataclass
+class Turn:
+    board: list[int]  # the board before the move
+    mark: int
+    column: int
+
+
+@dataclass
+class GameRecord:
+    turns: list[Turn] = field(default_factory=list)
+    winner: int = 0  # 0 for a draw
+    invalid_move_by: Optional[int] = None  # mark of the player who forfeited
+
+    def result_for(self, mark: int) -> int:
+        """1 for a win, 0 for a draw and -1 for a loss of the player with that mark"""
+        if self.winner == 0:
+            return 0
+        return 1 if self.winner == mark else -1
+
+
+class GameState:
+    """the board of a running game, with the bits of both players to detect a win in O(1)"""
+
+    def __init__(self, configuration: Configuration):
+        self.configuration = configuration
+        self.board = Board.with_heights([0] * (configuration.rows * configuration.columns), configuration.rows,
+                                        configuration.columns)
+        self._cell_bits = get_layout(self.board.rows, self.board.columns).cell_bits
+        self._player_bits = {1: 0, 2: 0}
+
+    def observation(self, step: int, mark: int) -> Observation:
+        return Observation(list(self.board.board), step, mark)
+
+    def is_legal(self, column) -> bool:
+        return column in self.board.legal_columns()
+
+    def play(self, mark: int, column: int) -> bool:
+        """plays a legal column and returns if it won the game"""
+        index = add_piece(self.board, mark, column)
+        self._player_bits[mark] |= 1 << self._cell_bits[index]
+        return has_four(self._player_bits[mark], self.board.rows)
+
+
+def play_game(
+        agents: list[Agent],
+        configuration: Configuration,
+        opening_moves: int = 0,
+        rng: Optional[random.Random] = None
+) -> GameRecord:
+    """
+    plays one game between agents[0] (mark 1) and agents[1] (mark 2).
+    The first `opening_moves` moves are played randomly to diversify the games.
+    A player returning an illegal column loses the game.
+    """
+    assert len(agents) == 2, 'a game needs exactly two agents'
+    rng = rng or random.Random()
+    state = GameState(configuration)
+    record = GameRecord()
+
+    for step in range(len(state.board.board)):
+        mark = step % 2 + 1
+        if step < opening_moves:
+            column = rng.choice(state.board.legal_columns())
+        else:
+            column = agents[mark - 1](state.observation(step, mark), configuration)
+        record.turns.append(Turn(list(state.board.board), mark, column))
+
+        if not state.is_legal(column):
+            record.invalid_move_by = mark
+            record.winner = 3 - mark
+            return record
+
+        if state.play(mark, column):
+            record.winner = mark
+            return record
+
+    return record
@@ -0,0 +1,146 @@
+"""
+Memory accounting for agents, with `tracemalloc`.
+
+Every move of a `MemoryTracker` records the peak memory allocated during the
+move and the memory it retained afterwards, e.g. grown caches and tables.
+Without a running `tracemalloc`, every move starts and stops it, so start it
+once for many moves (see `arena.tournament --memory`); tracing makes the
+agents several times slower.
+
+The caches and transposition tables of an agent are found with `find_caches`
+and report their approximate size with `nbytes`. A `CacheBudget` keeps their
+total under a limit, by halving the largest resizable cache whenever the total
+approaches the limit, after every move. Some of these caches are shared by the
+whole process, like the table of `search.negamax.get_searcher`, so
+`CacheBudget.restore` gives them back their sizes once the budget is done.
+"""
+import tracemalloc
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Optional
+
+from agent import search_based_agent, search_based_agent_batch
+from data_structures import Configuration
+from search.negamax import get_searcher
+
+# a budget starts shrinking caches beyond this fraction of the limit
+HIGH_WATER = 0.9
+
+
+@dataclass
+class MoveMemory:
+    peak: int  # bytes allocated at the peak of the move, above what was allocated before it
+    retained: int  # bytes still allocated after the move, may be negative
+
+
+def measure(function: Callable, *args):
+    """returns the result of `function(*args)` and its `MoveMemory`"""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = function(*args)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return result, MoveMemory(peak - before, after - before)
+
+
+@dataclass
+class MemoryStats:
+    moves: int = 0
+    max_peak: int = 0
+    total_peak: int = 0
+    retained: int = 0
+    cache_nbytes: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mean_peak(self) -> float:
+        return self.total_peak / self.moves if self.moves else 0.0
+
+    def add(self, memory: MoveMemory):
+        self.moves += 1
+        self.max_peak = max(self.max_peak, memory.peak)
+        self.total_peak += memory.peak
+        self.retained += memory.retained
+
+    def __str__(self):
+        caches = ', '.join(f'{name} {nbytes / 1024:.0f} KiB' for name, nbytes in self.cache_nbytes.items())
+        return f'peak {self.max_peak / 1024:.0f} KiB (mean {self.mean_peak / 1024:.0f} KiB), ' \
+               f'retained {self.retained / 1024:.0f} KiB over {self.moves} moves' + \
+               (f', caches: {caches}' if caches else '')
+
+
+def find_caches(agent: Callable, configuration: Configuration) -> dict[str, object]:
+    """the caches and transposition tables held by an agent of `arena.agents`, by name"""
+    function, keywords = (agent.func, agent.keywords) if isinstance(agent, partial) else (agent, {})
+    caches = {}
+    for name, value in [*keywords.items(), ('agent', function)]:
+        if hasattr(value, 'nbytes'):
+            caches[name] = value
+        elif getattr(value, 'table', None) is not None:
+            caches[f'{name}.table'] = value.table
+    if function in (search_based_agent, search_based_agent_batch) and keywords.get('searcher') is None:
+        caches['table'] = get_searcher(configuration.rows, configuration.columns).table
+    return caches
+
+
+class CacheBudget:
+    """
+    keeps the total `nbytes` of caches under `limit` bytes; caches with a
+    `resize(max_size)` are shrunk, others (like a shared table) only count
+    """
+
+    def __init__(self, limit: int):
+        assert limit > 0, 'limit must be positive'
+        self.limit = limit
+        self.shrinks = 0
+        self._sizes: dict[int, tuple[object, int]] = {}  # the max_size of every shrunk cache before, by id
+
+    def restore(self):
+        """
+        gives the shrunk caches back their max_size, their evicted entries are
+        lost; a cache another budget restored to a larger size is left as it is
+        """
+        for cache, max_size in self._sizes.values():
+            if cache.max_size < max_size:
+                cache.resize(max_size)
+        self._sizes.clear()
+
+    def enforce(self, caches: list):
+        resizable = [cache for cache in caches if hasattr(cache, 'resize')]
+        while sum(cache.nbytes for cache in caches) > HIGH_WATER * self.limit:
+            largest = max(resizable, key=lambda cache: cache.nbytes, default=None)
+            if largest is None or len(largest) <= 1:
+                break
+            self._sizes.setdefault(id(largest), (largest, largest.max_size))
+            largest.resize(max(len(largest) // 2, 1))
+            self.shrinks += 1
+
+
+class MemoryTracker:
+    """
+    wraps an agent, or a batch agent, recording the memory of every call in
+    `stats`; with a `budget` in bytes, the caches of the agent are kept under
+    it. The caches are looked up in `owner`, by default the agent itself, e.g.
+    the agent behind a batch entry point.
+    """
+
+    def __init__(self, agent: Callable, budget: Optional[int] = None, owner: Optional[Callable] = None):
+        self.agent = agent
+        self.owner = owner if owner is not None else agent
+        self.stats = MemoryStats()
+        self.budget = CacheBudget(budget) if budget is not None else None
+
+    def __call__(self, observation, configuration: Configuration):
+        action, memory = measure(self.agent, observation, configuration)
+        self.stats.add(memory)
+        # looked up after every move, some agents create their tables on the first one
+        caches = find_caches(self.owner, configuration)
+        if self.budget is not None:
+            self.budget.enforce(list(caches.values()))
+        self.stats.cache_nbytes = {name: cache.nbytes for name, cache in caches.items()}
+        return action
@@ -0,0 +1,196 @@
+"""
+Replays a corpus of positions through an agent under a profiler, and reports
+where the time goes, aggregated over all moves.
+
+The corpus is every position of seeded games against a random opponent (like
+`arena.benchmark`), or the positions of a self-play data set (see
+`dataset.shards`). Two profilers are available:
+- cprofile: exact call counts and times per function, printed as a top-N table
+  and optionally saved for pstats, snakeviz and the like with --pstats
+- sample: samples the call stack every --interval seconds of CPU time, prints
+  a top-N table of self and total time and, with --collapsed, writes the
+  stacks in the collapsed format of flamegraph.pl and speedscope. cProfile
+  doesn't record whole stacks, so only the sampler can write them.
+
+    python -m arena.profiling --agent priority --games 5 --top 15
+    python -m arena.profiling --agent submission --profiler sample --collapsed submission.folded
+"""
+import argparse
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import random
+import signal
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional, TextIO
+
+from arena.agents import get_agent, AGENTS
+from arena.benchmark import seeded_random_agent
+from arena.game import Agent, play_game
+from data_structures import Observation, Configuration
+
+
+def positions_from_games(games: int, configuration: Configuration, opening_moves: int = 2,
+                         seed: int = 0) -> list[Observation]:
+    """every position of `games` seeded games between two random agents"""
+    positions = []
+
+    for game in range(games):
+        opponent = seeded_random_agent(seed + game)
+
+        def recording_agent(observation, configuration_):
+            positions.append(observation)
+            return opponent(observation, configuration_)
+
+        play_game([recording_agent, recording_agent], configuration, opening_moves, random.Random(seed + game))
+    return positions
+
+
+def positions_from_shards(directory: str, limit: int) -> list[Observation]:
+    from dataset.shards import list_shards, iter_batches
+    positions = []
+    for batch in iter_batches(list_shards(directory)):
+        for board, mark in zip(batch.boards.tolist(), batch.marks.tolist()):
+            positions.append(Observation(board, sum(1 for cell in board if cell != 0), mark))
+            if len(positions) == limit:
+                return positions
+    return positions
+
+
+def replay(agent: Agent, positions: list[Observation], configuration: Configuration) -> float:
+    """returns the total time of all moves, in seconds"""
+    start = time.perf_counter()
+    # some agents print their reasoning on every move
+    with contextlib.redirect_stdout(io.StringIO()):
+        for observation in positions:
+            agent(observation, configuration)
+    return time.perf_counter() - start
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f'{module}:{code.co_qualname}'
+
+
+class StackSampler:
+    """
+    samples the Python call stack of the main thread every `interval` seconds of
+    CPU time, with SIGPROF; only frames below `root` (a code object) are kept
+    """
+
+    def __init__(self, interval: float = 0.001, root=None):
+        self.interval = interval
+        self.root = root
+        self.stacks: Counter[str] = Counter()
+        self._previous_handler = None
+
+    def _sample(self, signum, frame):
+        labels = []
+        while frame is not None:
+            labels.append(frame_label(frame))
+            if frame.f_code is self.root:
+                break
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(labels))] += 1
+
+    def __enter__(self) -> 'StackSampler':
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *exc_info):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler)
+
+    def write_collapsed(self, output: TextIO):
+        for stack, count in sorted(self.stacks.items()):
+            output.write(f'{stack} {count}\n')
+
+
+@dataclass
+class FunctionSamples:
+    function: str
+    self_samples: int  # samples with the function on top of the stack
+    total_samples: int  # samples with the function anywhere on the stack
+
+
+def top_functions(stacks: Counter, top: int) -> list[FunctionSamples]:
+    self_samples = Counter()
+    total_samples = Counter()
+    for stack, count in stacks.items():
+        labels = stack.split(';')
+        self_samples[labels[-1]] += count
+        for label in set(labels):
+            total_samples[label] += count
+    functions = [FunctionSamples(label, self_samples[label], total) for label, total in total_samples.items()]
+    functions.sort(key=lambda function: (-function.self_samples, -function.total_samples))
+    return functions[:top]
+
+
+def print_samples(functions: list[FunctionSamples], samples: int, output: TextIO):
+    output.write(f'{"self %":>7} {"total %":>8}  function\n')
+    for function in functions:
+        output.write(f'{100 * function.self_samples / samples:>7.1f} {100 * function.total_samples / samples:>8.1f}'
+                     f'  {function.function}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agent', default='priority', choices=sorted(AGENTS))
+    parser.add_argument('--profiler', choices=['cprofile', 'sample'], default='cprofile')
+    parser.add_argument('--games', type=int, default=5, help='games to take the positions from')
+    parser.add_argument('--shards', help='take the positions from the self-play data set in this directory instead')
+    parser.add_argument('--limit', type=int, default=1000, help='maximum number of positions from --shards')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--sort', choices=['tottime', 'cumulative', 'ncalls'], default='tottime',
+                        help='order of the cprofile table')
+    parser.add_argument('--pstats', help='save the cprofile statistics to this file')
+    parser.add_argument('--interval', type=float, default=0.001, help='seconds of CPU time between samples')
+    parser.add_argument('--collapsed', help='write the sampled stacks to this file, in the collapsed format')
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.collapsed and args.profiler != 'sample':
+        parser.error('--collapsed needs --profiler sample')
+
+    configuration = Configuration(args.columns, args.rows)
+    if args.shards:
+        positions = positions_from_shards(args.shards, args.limit)
+    else:
+        positions = positions_from_games(args.games, configuration, seed=args.seed)
+    agent = get_agent(args.agent)
+
+    profiler: Optional[cProfile.Profile] = None
+    if args.profiler == 'cprofile':
+        profiler = cProfile.Profile()
+        elapsed = profiler.runcall(replay, agent, positions, configuration)
+    else:
+        with StackSampler(args.interval, root=replay.__code__) as sampler:
+            elapsed = replay(agent, positions, configuration)
+
+    print(f'{args.agent}: {len(positions)} moves in {elapsed:.2f}s, '
+          f'{1000 * elapsed / max(len(positions), 1):.2f} ms per move')
+    if profiler is not None:
+        stats = pstats.Stats(profiler, stream=sys.stdout)
+        stats.sort_stats(args.sort).print_stats(args.top)
+        if args.pstats:
+            stats.dump_stats(args.pstats)
+    else:
+        samples = sum(sampler.stacks.values())
+        print(f'{samples} samples')
+        if samples:
+            print_samples(top_functions(sampler.stacks, args.top), samples, sys.stdout)
+        if args.collapsed:
+            with open(args.collapsed, 'w') as file:
+                sampler.write_collapsed(file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Re-analyses logged games: every position of every episode is played again by
+one or more agents, in a process pool, and compared with the move of the log.
+
+Episodes are Kaggle episode logs, a JSON object with the `configuration` and
+the `steps` (see `arena.environment`, whose `toJSON` writes them), one per
+.json file or one per line of a .jsonl file. They are read lazily, and at most
+--batch positions are analysed at once, so any number of episodes fits in memory.
+
+The report lists, for every agent, how often it disagrees with the logged
+moves, its latency, the moves slower than --timeout, the slowest positions and
+the positions where it raised, which are also written to --disagreements.
+Latencies are measured in the worker processes, so with more workers than CPUs
+they include time waiting for a CPU.
+
+    python -m arena.replay episodes/ --agents priority priority_incremental
+    python -m arena.replay games.jsonl --agents search --timeout 2 --disagreements changed.jsonl
+"""
+import argparse
+import contextlib
+import heapq
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional, TextIO
+
+from arena.agents import get_agent, AGENTS
+from arena.benchmark import report
+from arena.environment import ERROR, TIMEOUT, INVALID
+from board.board_class import Board
+from data_structures import Observation, Configuration
+
+
+@dataclass
+class Position:
+    episode: str  # the file, and the line for JSON lines
+    step: int
+    board: Board
+    mark: int
+    logged: int  # the column played in the episode
+
+
+def list_episode_files(paths: Iterable[str]) -> list[str]:
+    """the paths, with directories replaced by their .json and .jsonl files"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.endswith(('.json', '.jsonl'))))
+        else:
+            files.append(path)
+    return files
+
+
+def iter_episodes(files: Iterable[str]) -> Iterator[tuple[str, dict]]:
+    """yields (name, episode) for every episode of the files, one at a time"""
+    for path in files:
+        with open(path) as file:
+            if path.endswith('.jsonl'):
+                for number, line in enumerate(file, 1):
+                    if line.strip():
+                        yield f'{path}:{number}', json.loads(line)
+            else:
+                yield path, json.load(file)
+
+
+def iter_positions(name: str, episode: dict) -> Iterator[Position]:
+    """
+    every position of the episode where an agent moved, with the move it
+    played; moves that failed (an error, a timeout or an illegal column) have
+    nothing to compare with and are skipped
+    """
+    configuration = episode.get('configuration', {})
+    rows, columns = configuration.get('rows', 6), configuration.get('columns', 7)
+    steps = episode['steps']
+    for step, (state, next_state) in enumerate(zip(steps, steps[1:])):
+        active = next((index for index, agent in enumerate(state) if agent['status'] == 'ACTIVE'), None)
+        if active is None:
+            continue
+        board = Board(list(state[0]['observation']['board']), rows, columns)
+        action = next_state[active]['action']
+        if next_state[active]['status'] in (ERROR, TIMEOUT, INVALID) or not (
+                isinstance(action, int) and not isinstance(action, bool) and action in board.legal_columns()):
+            continue
+        yield Position(name, step, board, active + 1, action)
+
+
+def _analyse(task: tuple[str, list[int], int, int, int, int]) -> tuple[Optional[int], float, Optional[str]]:
+    """returns the column of the agent and the time it took, or None and the exception it raised"""
+    name, board, step, mark, columns, rows = task
+    agent = get_agent(name)
+    # some agents print their reasoning on every move
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        try:
+            column = agent(Observation(board, step, mark), Configuration(columns, rows))
+        except Exception as exception:
+            return None, time.perf_counter() - start, repr(exception)
+        return column, time.perf_counter() - start, None
+
+
+@dataclass
+class AgentAnalysis:
+    name: str
+    timeout: Optional[float] = None  # seconds
+    slowest_kept: int = 10
+    positions: int = 0
+    disagreements: int = 0
+    timeouts: int = 0
+    errors: list[tuple[Position, str]] = field(default_factory=list)  # the positions where the agent raised
+    latencies: list[float] = field(default_factory=list)
+    # (seconds, order, position, column), the slowest moves as a min-heap
+    slowest: list[tuple[float, int, Position, int]] = field(default_factory=list)
+
+    def add(self, position: Position, column: Optional[int], seconds: float, error: Optional[str] = None) -> bool:
+        """adds a move of the agent, or the exception it raised; returns if it disagrees with the log"""
+        self.positions += 1
+        if error is not None:
+            self.errors.append((position, error))
+            return False
+        self.latencies.append(seconds)
+        if self.timeout is not None and seconds > self.timeout:
+            self.timeouts += 1
+        entry = (seconds, self.positions, position, column)
+        if len(self.slowest) < self.slowest_kept:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+        disagrees = column != position.logged
+        self.disagreements += disagrees
+        return disagrees
+
+    @property
+    def disagreement_rate(self) -> float:
+        return self.disagreements / self.positions if self.positions else 0.0
+
+    def slowest_moves(self) -> list[tuple[float, Position, int]]:
+        return [(seconds, position, column) for seconds, _, position, column in sorted(self.slowest, reverse=True)]
+
+
+def replay(positions: Iterable[Position], names: list[str], executor: Optional[Executor] = None,
+           batch: int = 256, timeout: Optional[float] = None, slowest: int = 10,
+           disagreements: Optional[TextIO] = None) -> list[AgentAnalysis]:
+    """
+    plays every position with every agent, in the executor or else in this
+    process, and writes the disagreements to `disagreements` as JSON lines
+    """
+    analyses = {name: AgentAnalysis(name, timeout, slowest) for name in names}
+    positions = iter(positions)
+    while chunk := list(itertools.islice(positions, batch)):
+        for name in names:
+            tasks = [(name, position.board.board, position.step, position.mark, position.board.columns,
+                      position.board.rows) for position in chunk]
+            results = executor.map(_analyse, tasks, chunksize=16) if executor is not None else map(_analyse, tasks)
+            for position, (column, seconds, error) in zip(chunk, results):
+                disagrees = analyses[name].add(position, column, seconds, error)
+                if (disagrees or error is not None) and disagreements is not None:
+                    line = {
+                        'agent': name, 'episode': position.episode, 'step': position.step, 'mark': position.mark,
+                        'logged': position.logged, 'column': column, 'board': position.board.board,
+                    }
+                    if error is not None:
+                        line['error'] = error
+                    disagreements.write(json.dumps(line) + '\n')
+    return list(analyses.values())
+
+
+def print_report(analyses: list[AgentAnalysis], output: TextIO):
+    output.write(f'{"agent":<24} {"moves":>6} {"mean ms":>9} {"median":>9} {"p95":>9} {"max":>9} '
+                 f'{"disagree":>9} {"timeouts":>9} {"errors":>9}\n')
+    for analysis in analyses:
+        latency = report(analysis.name, analysis.latencies or [0.0])
+        output.write(f'{latency} {analysis.disagreement_rate:>9.1%} {analysis.timeouts:>9} {len(analysis.errors):>9}\n')
+    for analysis in analyses:
+        if analysis.errors:
+            output.write(f'\nerrors of {analysis.name}:\n')
+        for position, error in analysis.errors:
+            output.write(f'{position.episode} step {position.step}, mark {position.mark}: {error}\n')
+    for analysis in analyses:
+        output.write(f'\nslowest positions of {analysis.name}:\n')
+        for seconds, position, column in analysis.slowest_moves():
+            output.write(f'{1000 * seconds:>9.1f} ms  {position.episode} step {position.step}, '
+                         f'mark {position.mark}: logged {position.logged}, played {column}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='episode files, or directories of them')
+    parser.add_argument('--agents', nargs='+', default=['priority'], choices=sorted(AGENTS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processes, 0 to analyse in this one')
+    parser.add_argument('--batch', type=int, default=256, help='positions analysed at once')
+    parser.add_argument('--timeout', type=float, help='count the moves slower than this many seconds')
+    parser.add_argument('--slowest', type=int, default=10, help='slowest positions listed per agent')
+    parser.add_argument('--disagreements', help='write the moves differing from the log to this file, as JSON lines')
+    args = parser.parse_args()
+
+    positions = (position for name, episode in iter_episodes(list_episode_files(args.paths))
+                 for position in iter_positions(name, episode))
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        executor = stack.enter_context(ProcessPoolExecutor(args.workers)) if args.workers else None
+        disagreements = stack.enter_context(open(args.disagreements, 'w')) if args.disagreements else None
+        analyses = replay(positions, args.agents, executor, args.batch, args.timeout, args.slowest, disagreements)
+    print_report(analyses, sys.stdout)
+    print(f'\n{analyses[0].positions} positions in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
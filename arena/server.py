@@ -0,0 +1,291 @@
+"""
+An asyncio match server running many games at once, a local stand-in for
+Kaggle's episode runner.
+
+Players are either agents of the registry, whose calls are dispatched to an
+executor (threads, or processes for CPU-bound agents), or subprocesses
+speaking the JSON line protocol of `arena.subprocess_agent`, given as
+`cmd:<command line>`. Every move has to arrive within the timeout, otherwise
+the player loses the game like Kaggle does; a subprocess that timed out is
+killed, a call in an executor can't be interrupted and finishes in the
+background. A player that raises, or a subprocess that exits or replies
+garbage, loses the game too, like an ERROR on Kaggle. Stateful agents (see
+`arena.agents.is_stateful`) need the process executor, as games in threads
+would share their state. Results are printed as the games finish, followed by
+the per-move latency (including the time spent waiting for the executor), the
+number of timeouts and the throughput in games per second.
+
+    python -m arena.server --agents priority search --games 40 --concurrency 8 --timeout 2
+    python -m arena.server --agents priority "cmd:python -m arena.subprocess_agent random"
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import shlex
+import statistics
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional, TextIO, Union
+
+from arena.agents import get_agent, is_stateful, AGENTS
+from arena.game import Agent, GameRecord, GameState, Turn
+from arena.subprocess_agent import encode_request
+from data_structures import Observation, Configuration
+
+PlayerSpec = Union[str, Agent]
+
+
+def _act(agent: Union[str, Agent], board: list[int], step: int, mark: int, columns: int, rows: int,
+         quiet: bool) -> int:
+    """
+    calls an agent, or an agent of the registry by name, which can be sent to a
+    process pool even when the agent itself can't be pickled
+    """
+    agent = get_agent(agent) if isinstance(agent, str) else agent
+    observation = Observation(board, step, mark)
+    if not quiet:
+        return agent(observation, Configuration(columns, rows))
+    # some agents print their reasoning on every move
+    with contextlib.redirect_stdout(io.StringIO()):
+        return agent(observation, Configuration(columns, rows))
+
+
+class ExecutorPlayer:
+    """an agent callable, or the name of an agent in the registry, called in the executor"""
+
+    def __init__(self, agent: Union[str, Agent], executor: Executor):
+        self.agent = agent
+        self.name = agent if isinstance(agent, str) else getattr(agent, '__name__', repr(agent))
+        self.executor = executor
+        # redirecting stdout isn't thread safe, so agents in threads print to the terminal
+        self.quiet = isinstance(executor, ProcessPoolExecutor)
+
+    async def start(self):
+        pass
+
+    async def act(self, state: GameState, step: int, mark: int) -> int:
+        configuration = state.configuration
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, _act, self.agent, list(state.board.board), step, mark,
+            configuration.columns, configuration.rows, self.quiet
+        )
+
+    async def close(self):
+        pass
+
+
+class SubprocessPlayer:
+    """a subprocess per game, started with `command`"""
+
+    def __init__(self, command: str):
+        self.name = f'cmd:{command}'
+        self.command = command
+        self._process: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self):
+        self._process = await asyncio.create_subprocess_exec(
+            *shlex.split(self.command),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+
+    async def act(self, state: GameState, step: int, mark: int) -> int:
+        self._process.stdin.write(encode_request(state.observation(step, mark), state.configuration).encode())
+        await self._process.stdin.drain()
+        line = await self._process.stdout.readline()
+        assert line, f'{self.command} exited'
+        return json.loads(line)['action']
+
+    async def close(self):
+        if self._process is None or self._process.returncode is not None:
+            return
+        self._process.kill()
+        await self._process.wait()
+
+
+@dataclass
+class MatchResult:
+    game: int
+    names: tuple[str, str]
+    record: GameRecord
+    latencies: list[float] = field(default_factory=list)  # seconds, of every move of both players
+    timed_out: Optional[int] = None  # mark of the player who ran out of time
+    error_by: Optional[int] = None  # mark of the player who failed
+    error: Optional[str] = None  # its exception
+
+
+@dataclass
+class ServerReport:
+    games: int
+    moves: int
+    timeouts: int
+    errors: int
+    mean_latency: float  # all latencies in milliseconds
+    p95_latency: float
+    max_latency: float
+    games_per_second: float
+
+    def __str__(self):
+        return f'{self.games} games, {self.moves} moves, {self.timeouts} timeouts, {self.errors} errors, ' \
+               f'{self.games_per_second:.2f} games/s, latency mean {self.mean_latency:.2f} ms, ' \
+               f'p95 {self.p95_latency:.2f} ms, max {self.max_latency:.2f} ms'
+
+
+class MatchServer:
+    def __init__(self, configuration: Configuration, executor: Executor, move_timeout: float = 2.0,
+                 concurrency: int = 8, opening_moves: int = 0, seed: int = 0):
+        self.configuration = configuration
+        self.executor = executor
+        self.move_timeout = move_timeout
+        self.concurrency = concurrency
+        self.opening_moves = opening_moves
+        self.seed = seed
+
+    def player(self, spec: PlayerSpec):
+        """`spec` is an agent callable, the name of an agent in the registry, or cmd:<command line>"""
+        if isinstance(spec, str) and spec.startswith('cmd:'):
+            return SubprocessPlayer(spec[len('cmd:'):])
+        return ExecutorPlayer(spec, self.executor)
+
+    async def play(self, game: int, specs: tuple[PlayerSpec, PlayerSpec]) -> MatchResult:
+        players = [self.player(spec) for spec in specs]
+        result = MatchResult(game, (players[0].name, players[1].name), GameRecord())
+        rng = random.Random(self.seed + game)
+        state = GameState(self.configuration)
+        try:
+            for player in players:
+                await player.start()
+            for step in range(len(state.board.board)):
+                mark = step % 2 + 1
+                if step < self.opening_moves:
+                    column = rng.choice(state.board.legal_columns())
+                else:
+                    start = time.perf_counter()
+                    try:
+                        column = await asyncio.wait_for(players[mark - 1].act(state, step, mark), self.move_timeout)
+                    except asyncio.TimeoutError:
+                        result.timed_out = mark
+                        result.record.winner = 3 - mark
+                        return result
+                    except Exception as exception:
+                        result.error_by = mark
+                        result.error = repr(exception)
+                        result.record.winner = 3 - mark
+                        return result
+                    finally:
+                        result.latencies.append(time.perf_counter() - start)
+                result.record.turns.append(Turn(list(state.board.board), mark, column))
+
+                if not state.is_legal(column):
+                    result.record.invalid_move_by = mark
+                    result.record.winner = 3 - mark
+                    return result
+                if state.play(mark, column):
+                    result.record.winner = mark
+                    return result
+            return result
+        finally:
+            for player in players:
+                await player.close()
+
+    async def run(self, pairings: list[tuple[PlayerSpec, PlayerSpec]]) -> AsyncIterator[MatchResult]:
+        """plays every pairing, at most `concurrency` at once, and yields the results as the games finish"""
+        if isinstance(self.executor, ThreadPoolExecutor):
+            stateful = sorted({self.player(spec).name for specs in pairings for spec in specs
+                               if not (isinstance(spec, str) and spec.startswith('cmd:'))
+                               and is_stateful(get_agent(spec) if isinstance(spec, str) else spec)})
+            assert not stateful, f'{", ".join(stateful)} keep state between moves, play them in a process executor'
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def limited(game: int, specs: tuple[PlayerSpec, PlayerSpec]) -> MatchResult:
+            async with semaphore:
+                return await self.play(game, specs)
+
+        tasks = [asyncio.create_task(limited(game, specs)) for game, specs in enumerate(pairings)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def summarize(results: list[MatchResult], elapsed: float) -> ServerReport:
+    milliseconds = sorted(latency * 1000 for result in results for latency in result.latencies) or [0.0]
+    return ServerReport(
+        len(results),
+        sum(len(result.record.turns) for result in results),
+        sum(1 for result in results if result.timed_out is not None),
+        sum(1 for result in results if result.error_by is not None),
+        statistics.fmean(milliseconds),
+        milliseconds[int(0.95 * (len(milliseconds) - 1))],
+        milliseconds[-1],
+        len(results) / elapsed if elapsed > 0 else 0.0,
+    )
+
+
+def describe(result: MatchResult) -> str:
+    record = result.record
+    if result.timed_out is not None:
+        outcome = f'{result.names[result.timed_out - 1]} timed out'
+    elif result.error_by is not None:
+        outcome = f'{result.names[result.error_by - 1]} failed with {result.error}'
+    elif record.invalid_move_by is not None:
+        outcome = f'{result.names[record.invalid_move_by - 1]} played an invalid move'
+    elif record.winner == 0:
+        outcome = 'draw'
+    else:
+        outcome = f'{result.names[record.winner - 1]} won'
+    return f'game {result.game}: {result.names[0]} vs {result.names[1]}, {outcome} after {len(record.turns)} moves'
+
+
+async def serve(server: MatchServer, pairings: list[tuple[PlayerSpec, PlayerSpec]], output: TextIO) \
+        -> ServerReport:
+    """
+    `output` is passed explicitly, agents running in threads redirect `sys.stdout`
+    while they play
+    """
+    start = time.perf_counter()
+    results = []
+    async for result in server.run(pairings):
+        results.append(result)
+        print(describe(result), file=output, flush=True)
+    return summarize(results, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', nargs=2, default=['priority', 'random'], metavar='AGENT',
+                        help=f'agents of the registry ({", ".join(sorted(AGENTS))}) or cmd:<command line>')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8, help='games played at once')
+    parser.add_argument('--timeout', type=float, default=2.0, help='seconds per move')
+    parser.add_argument('--executor', choices=['thread', 'process'], default='process')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--opening-moves', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for spec in args.agents:
+        if not spec.startswith('cmd:') and spec not in AGENTS:
+            parser.error(f'unknown agent {spec}')
+        if args.executor == 'thread' and not spec.startswith('cmd:') and is_stateful(get_agent(spec)):
+            parser.error(f'{spec} keeps state between moves, use --executor process')
+    # every agent plays both colors
+    pairings = [tuple(args.agents) if game % 2 == 0 else tuple(reversed(args.agents)) for game in range(args.games)]
+    executor_class = ProcessPoolExecutor if args.executor == 'process' else ThreadPoolExecutor
+    with executor_class(args.workers) as executor:
+        server = MatchServer(Configuration(args.columns, args.rows), executor, args.timeout, args.concurrency,
+                             args.opening_moves, args.seed)
+        report = asyncio.run(serve(server, pairings, sys.stdout))
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
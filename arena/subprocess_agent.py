@@ -0,0 +1,59 @@
+"""
+Runs an agent of the registry as a subprocess speaking the JSON line protocol
+of `arena.server`: every request line on stdin
+
+    {"observation": {"board": [...], "step": 4, "mark": 1}, "configuration": {"columns": 7, "rows": 6}}
+
+is answered with one line {"action": <column>} on stdout.
+
+    python -m arena.subprocess_agent priority
+"""
+import argparse
+import contextlib
+import json
+import sys
+from typing import TextIO
+
+from arena.agents import get_agent, AGENTS
+from arena.game import Agent
+from data_structures import Observation, Configuration
+
+
+def encode_request(observation: Observation, configuration: Configuration) -> str:
+    return json.dumps({
+        'observation': {'board': observation.board, 'step': observation.step, 'mark': observation.mark},
+        'configuration': {'columns': configuration.columns, 'rows': configuration.rows},
+    }) + '\n'
+
+
+def decode_request(line: str) -> tuple[Observation, Configuration]:
+    request = json.loads(line)
+    observation = request['observation']
+    configuration = request['configuration']
+    return (
+        Observation(observation['board'], observation['step'], observation['mark']),
+        Configuration(configuration['columns'], configuration['rows']),
+    )
+
+
+def serve(agent: Agent, requests: TextIO, responses: TextIO):
+    for line in requests:
+        if not line.strip():
+            continue
+        observation, configuration = decode_request(line)
+        # anything the agent prints would corrupt the protocol
+        with contextlib.redirect_stdout(sys.stderr):
+            action = agent(observation, configuration)
+        responses.write(json.dumps({'action': int(action)}) + '\n')
+        responses.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('agent', choices=sorted(AGENTS))
+    args = parser.parse_args()
+    serve(get_agent(args.agent), sys.stdin, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
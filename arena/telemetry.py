@@ -0,0 +1,65 @@
+"""
+Collects the search telemetry (see `search.stats`) of the search-based agents
+of `arena.agents`, per game of the batch simulator `arena.batch`.
+
+Only searches of a `search.negamax.Searcher` are reported: the root-parallel
+searcher of `search.parallel` scores moves in other processes and has no
+telemetry.
+"""
+from functools import partial
+from typing import Callable
+
+from agent import search_based_agent, search_based_agent_batch
+from arena.batch import BatchAgent
+from data_structures import Observation, Configuration
+from search.negamax import get_searcher
+from search.stats import SearchStats, GameStats
+
+
+def find_listener_target(agent: Callable, configuration: Configuration):
+    """the searcher, or agent, of an agent of `arena.agents` that reports its searches to a `listener`"""
+    function, keywords = (agent.func, agent.keywords) if isinstance(agent, partial) else (agent, {})
+    searcher = keywords.get('searcher')
+    if searcher is not None:
+        return searcher if hasattr(searcher, 'listener') else None
+    if function in (search_based_agent, search_based_agent_batch):
+        return get_searcher(configuration.rows, configuration.columns)
+    return function if hasattr(function, 'listener') else None
+
+
+class TelemetryRecorder:
+    """
+    wraps a batch agent, and sums the stats of its searches per game in
+    `games`; call `add_moves` after every call of the agent with the indexes of
+    the games it moved in, see `arena.batch.play_games`
+    """
+
+    def __init__(self, agent: BatchAgent, owner: Callable):
+        self.agent = agent
+        self.owner = owner  # the agent of `arena.agents` behind the batch agent
+        self.games: dict[int, GameStats] = {}
+        self._searches: list[SearchStats] = []
+        self._reported = False  # whether the last call had a searcher to listen to
+
+    def __call__(self, observations: list[Observation], configuration: Configuration) -> list[int]:
+        self._searches = []
+        target = find_listener_target(self.owner, configuration)
+        self._reported = target is not None
+        if target is None:
+            return self.agent(observations, configuration)
+        previous, target.listener = target.listener, self._searches.append
+        try:
+            return self.agent(observations, configuration)
+        finally:
+            target.listener = previous
+
+    def add_moves(self, games: list[int]):
+        # search agents report one stats per move, including the moves played without searching;
+        # when the counts differ the stats can't be matched to the games, and the moves are counted as unmatched
+        if len(self._searches) == len(games):
+            for game, stats in zip(games, self._searches):
+                self.games.setdefault(game, GameStats()).add(stats)
+        elif self._reported:
+            for game in games:
+                self.games.setdefault(game, GameStats()).unmatched += 1
+        self._searches = []
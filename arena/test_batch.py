@@ -0,0 +1,112 @@
+import contextlib
+import io
+import json
+import random
+import unittest
+
+from arena.agents import get_agent, get_batch_agent
+from arena.batch import play_games, batched
+from arena.game import play_game
+from arena.telemetry import TelemetryRecorder
+from arena.tournament import run_tournament
+from board.tests.helpers import parse_board
+from data_structures import Observation, Configuration
+
+
+def first_legal_column_agent(observation, configuration):
+    return next(c for c in range(configuration.columns) if observation.board[c] == 0)
+
+
+def last_legal_column_agent(observation, configuration):
+    return max(c for c in range(configuration.columns) if observation.board[c] == 0)
+
+
+def random_positions(games: int) -> list[Observation]:
+    configuration = Configuration(columns=7, rows=6)
+    observations = []
+
+    def recording_agent(observation, configuration_):
+        observations.append(observation)
+        return rng.choice([c for c in range(configuration_.columns) if observation.board[c] == 0])
+
+    rng = random.Random(0)
+    for _ in range(games):
+        play_game([recording_agent, recording_agent], configuration)
+    return observations
+
+
+class TestBatch(unittest.TestCase):
+    def test_same_games_as_play_game(self):
+        configuration = Configuration(columns=7, rows=6)
+        agents = [first_legal_column_agent, last_legal_column_agent]
+        records = play_games([batched(agent) for agent in agents], configuration, games=5, opening_moves=6, seed=3)
+        for game, record in enumerate(records):
+            expected = play_game(agents, configuration, 6, random.Random(3 + game))
+            self.assertEqual(record, expected)
+
+    def test_invalid_move_loses(self):
+        records = play_games([batched(lambda o, c: 0), batched(lambda o, c: 7)], Configuration(7, 6), games=2)
+        self.assertEqual([record.invalid_move_by for record in records], [2, 2])
+
+    def test_batch_agents_choose_like_the_agents(self):
+        configuration = Configuration(columns=7, rows=6)
+        observations = random_positions(10)
+        for name in ['simple_reward', 'pattern_reward', 'priority']:
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = [get_agent(name)(observation, configuration) for observation in observations]
+            self.assertEqual(get_batch_agent(name)(observations, configuration), expected, name)
+
+    def test_search_batch(self):
+        board = parse_board([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [2, 2, 2, 0, 0, 0, 0],
+            [1, 1, 1, 0, 0, 0, 0],
+        ])
+        observations = [Observation(board.board, 6, 1), Observation(board.board, 6, 2)]
+        self.assertEqual(get_batch_agent('search')(observations, Configuration(7, 6)), [3, 3])
+
+    def test_tournament(self):
+        standings = run_tournament(['random', 'priority'], Configuration(7, 6), games=4)
+        self.assertEqual([standing.games for standing in standings], [8, 8])
+        self.assertEqual(standings[0].name, 'priority')
+        self.assertEqual(sum(standing.wins for standing in standings),
+                         sum(standing.losses for standing in standings))
+
+
+class TestTelemetry(unittest.TestCase):
+    def test_tournament_telemetry(self):
+        output = io.StringIO()
+        run_tournament(['priority', 'search'], Configuration(7, 6), games=2, telemetry=output)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), 4)
+        self.assertEqual({line['agent'] for line in lines}, {'search'})
+        self.assertEqual(sorted((line['mark'], line['game']) for line in lines), [(1, 0), (1, 1), (2, 0), (2, 1)])
+        for line in lines:
+            self.assertGreater(line['moves'], 0)
+            self.assertGreater(line['nodes'], 0)
+
+    def test_telemetry_counts_moves_played_without_searching(self):
+        output = io.StringIO()
+        run_tournament(['search', 'random'], Configuration(7, 6), games=8, opening_moves=2, telemetry=output)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), 16)
+        self.assertGreater(sum(line['shortcuts'].get('threat', 0) for line in lines), 0)
+        for line in lines:
+            self.assertEqual(line['agent'], 'search')
+            # every move of the agent, after the 2 random opening moves
+            moves = (line['moves'], line['game'], line['mark'])
+            self.assertGreater(line['moves'], 0, moves)
+            self.assertEqual(line['moves'], len(range(2 + line['mark'] - 1, line['plies'], 2)), moves)
+
+    def test_unmatched_moves_are_counted(self):
+        # the batch agent doesn't search, so the searcher of the owner reports nothing
+        recorder = TelemetryRecorder(batched(get_agent('random')), get_agent('search'))
+        observations = [Observation([0] * 42, 0, 1), Observation([0] * 42, 0, 1)]
+        recorder(observations, Configuration(7, 6))
+        recorder.add_moves([0, 1])
+        self.assertEqual({game: (stats.moves, stats.unmatched) for game, stats in recorder.games.items()},
+                         {0: (0, 1), 1: (0, 1)})
+        self.assertEqual(recorder.games[0].to_dict()['unmatched'], 1)
@@ -0,0 +1,98 @@
+import time
+import unittest
+
+from agent import random_agent
+from arena.environment import make, evaluate, is_win, ACTIVE, INACTIVE, DONE, INVALID, ERROR, TIMEOUT
+
+
+def first_legal_column_agent(observation, configuration):
+    return next(c for c in range(configuration.columns) if observation.board[c] == 0)
+
+
+class TestEnvironment(unittest.TestCase):
+    def test_run(self):
+        env = make('connectx')
+        steps = env.run([first_legal_column_agent, first_legal_column_agent])
+        self.assertTrue(env.done)
+        self.assertEqual(sorted(agent.reward for agent in env.state), [-1, 1])
+        self.assertEqual([agent.status for agent in steps[0]], [ACTIVE, INACTIVE])
+        self.assertEqual([agent.status for agent in steps[1]], [INACTIVE, ACTIVE])
+        self.assertEqual(steps[1][0].observation.board[35], 1)
+        self.assertEqual(steps[1][0].observation.step, 1)
+        self.assertEqual(steps[0][0].observation.board, [0] * 42)
+
+    def test_observation_and_configuration(self):
+        seen = []
+
+        def recording_agent(observation, configuration):
+            seen.append((observation.step, observation.mark, configuration.inarow, configuration.actTimeout))
+            return first_legal_column_agent(observation, configuration)
+
+        make('connectx').run([recording_agent, recording_agent])
+        self.assertEqual(seen[:2], [(0, 1, 4, 2), (1, 2, 4, 2)])
+
+    def test_invalid_move(self):
+        env = make('connectx')
+        env.run([lambda observation, configuration: 7, random_agent])
+        self.assertEqual([(agent.status, agent.reward) for agent in env.state], [(INVALID, None), (DONE, 0)])
+
+    def test_string_action_is_invalid(self):
+        env = make('connectx')
+        env.run([lambda observation, configuration: '3', random_agent])
+        self.assertEqual([(agent.status, agent.reward) for agent in env.state], [(INVALID, None), (DONE, 0)])
+        env = make('connectx')
+        env.run([lambda observation, configuration: 'ERROR', random_agent])
+        self.assertEqual(env.state[0].status, INVALID)
+
+    def test_error_and_timeout(self):
+        def failing_agent(observation, configuration):
+            raise ValueError()
+
+        env = make('connectx')
+        env.run([random_agent, failing_agent])
+        self.assertEqual([(agent.status, agent.reward) for agent in env.state], [(DONE, 0), (ERROR, None)])
+        self.assertIsNone(env.state[1].action)
+        with self.assertRaises(ValueError):
+            make('connectx', debug=True).run([failing_agent, random_agent])
+
+        def slow_agent(observation, configuration):
+            time.sleep(0.02)
+            return first_legal_column_agent(observation, configuration)
+
+        env = make('connectx', {'actTimeout': 0, 'agentTimeout': 0.03})
+        env.run([slow_agent, random_agent])
+        self.assertEqual(env.state[0].status, TIMEOUT)
+
+    def test_draw(self):
+        env = make('connectx', {'rows': 3, 'columns': 2, 'inarow': 3})
+        env.run([first_legal_column_agent, first_legal_column_agent])
+        self.assertEqual([(agent.status, agent.reward) for agent in env.state], [(DONE, 0), (DONE, 0)])
+
+    def test_is_win(self):
+        board = [0, 0, 0, 0,
+                 0, 0, 2, 0,
+                 0, 2, 1, 0,
+                 2, 1, 1, 0]
+        self.assertTrue(is_win(board, 4, 3, 6))
+        self.assertFalse(is_win(board, 4, 3, 10))
+        self.assertTrue(is_win(board, 4, 2, 10))
+
+    def test_train(self):
+        trainer = make('connectx').train([None, 'random'])
+        observation = trainer.reset()
+        self.assertEqual(observation.mark, 1)
+        done = False
+        while not done:
+            column = next(c for c in range(7) if observation.board[c] == 0)
+            observation, reward, done, info = trainer.step(column)
+        self.assertIn(reward, [-1, 0, 1])
+
+    def test_fast_path(self):
+        rewards = evaluate('connectx', [random_agent, 'random'], num_episodes=5, validate=False)
+        self.assertEqual(len(rewards), 5)
+        for reward in rewards:
+            self.assertIn(reward, [[1, -1], [-1, 1], [0, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from arena.game import play_game
+from data_structures import Configuration
+
+
+def first_legal_column_agent(observation, configuration):
+    return next(c for c in range(configuration.columns) if observation.board[c] == 0)
+
+
+class TestPlayGame(unittest.TestCase):
+    def test_vertical_win(self):
+        # mark 1 stacks column 0 and mark 2 stacks column 1, mark 1 connects first
+        game = play_game([lambda o, c: 0, lambda o, c: 1], Configuration(columns=7, rows=6))
+        self.assertEqual(game.winner, 1)
+        self.assertEqual(len(game.turns), 7)
+        self.assertEqual(game.result_for(1), 1)
+        self.assertEqual(game.result_for(2), -1)
+
+    def test_invalid_move_loses(self):
+        game = play_game([lambda o, c: 0, lambda o, c: 7], Configuration(columns=7, rows=6))
+        self.assertEqual(game.invalid_move_by, 2)
+        self.assertEqual(game.winner, 1)
+
+    def test_turns_record_board_before_move(self):
+        game = play_game([first_legal_column_agent] * 2, Configuration(columns=7, rows=6))
+        self.assertEqual(game.turns[0].board, [0] * 42)
+        self.assertEqual(game.turns[1].board[35], 1)
@@ -0,0 +1,91 @@
+import unittest
+from functools import partial
+
+from agent import simple_reward_agent, search_based_agent
+from arena.memory import measure, find_caches, CacheBudget, MemoryTracker, HIGH_WATER
+from arena.tournament import run_tournament
+from board.evaluation_cache import EvaluationCache
+from board.tests.helpers import parse_board
+from data_structures import Observation, Configuration
+from search.negamax import TranspositionTable, get_searcher
+from search.ponder import PonderingAgent
+
+
+def observation() -> Observation:
+    board = parse_board([
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 1, 0, 0, 0],
+        [0, 2, 0, 1, 0, 0, 2],
+    ])
+    return Observation(board.board, 4, 1)
+
+
+class TestMemory(unittest.TestCase):
+    def test_measure(self):
+        kept = []
+        result, memory = measure(lambda: kept.append(bytearray(1 << 20)) or 5)
+        self.assertEqual(result, 5)
+        self.assertGreaterEqual(memory.peak, 1 << 20)
+        self.assertGreaterEqual(memory.retained, 1 << 20)
+        _, memory = measure(lambda: len(bytearray(1 << 20)))
+        self.assertGreaterEqual(memory.peak, 1 << 20)
+        self.assertLess(memory.retained, 1 << 16)
+
+    def test_find_caches(self):
+        configuration = Configuration(7, 6)
+        cache = EvaluationCache()
+        self.assertEqual(find_caches(partial(simple_reward_agent, cache=cache), configuration), {'cache': cache})
+        self.assertEqual(find_caches(simple_reward_agent, configuration), {})
+        self.assertIs(find_caches(search_based_agent, configuration)['table'], get_searcher(6, 7).table)
+        agent = PonderingAgent()
+        self.assertIs(find_caches(agent, configuration)['agent.table'], agent.table)
+
+    def test_budget_shrinks_the_largest_cache(self):
+        small, large = TranspositionTable(), TranspositionTable()
+        for key in range(10):
+            small.store(key, 1, 0, 0.0, 3)
+        for key in range(1000):
+            large.store(key, 1, 0, 0.0, 3)
+        budget = CacheBudget(limit=small.nbytes + large.nbytes // 2)
+        budget.enforce([small, large])
+        self.assertEqual(len(small), 10)
+        self.assertLess(large.max_size, 1000)
+        self.assertGreaterEqual(budget.shrinks, 1)
+        self.assertLessEqual(small.nbytes + large.nbytes, HIGH_WATER * budget.limit)
+        self.assertEqual(len(large), large.max_size)
+        budget.restore()
+        self.assertEqual(large.max_size, 1 << 20)
+        self.assertEqual(small.max_size, 1 << 20)
+
+    def test_tracker(self):
+        cache = EvaluationCache()
+        agent = partial(simple_reward_agent, cache=cache)
+        tracker = MemoryTracker(agent, budget=1)
+        configuration = Configuration(7, 6)
+        self.assertEqual(tracker(observation(), configuration), agent(observation(), configuration))
+        self.assertEqual(tracker.stats.moves, 1)
+        self.assertGreater(tracker.stats.max_peak, 0)
+        self.assertEqual(len(cache), 1)
+        self.assertIn('cache', tracker.stats.cache_nbytes)
+
+    def test_tournament(self):
+        standings = run_tournament(['random', 'simple_reward_cached'], Configuration(7, 6), games=2, memory=True)
+        for standing in standings:
+            self.assertGreater(standing.memory.moves, 0)
+
+    def test_tournament_restores_the_shared_table(self):
+        table = get_searcher(6, 7).table
+        max_size = table.max_size
+        run_tournament(['random', 'search'], Configuration(7, 6), games=1, memory=True, memory_budget=1)
+        self.assertEqual(table.max_size, max_size)
+
+    def test_tournament_budget_needs_memory(self):
+        with self.assertRaises(AssertionError):
+            run_tournament(['random', 'search'], Configuration(7, 6), games=1, memory_budget=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
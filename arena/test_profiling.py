@@ -0,0 +1,47 @@
+import io
+import unittest
+from collections import Counter
+
+from arena.agents import get_agent
+from arena.profiling import positions_from_games, replay, top_functions, StackSampler
+from data_structures import Configuration
+
+
+def busy_agent(observation, configuration):
+    total = 0
+    for i in range(20000):
+        total += i * i
+    return next(c for c in range(configuration.columns) if observation.board[c] == 0)
+
+
+class TestProfiling(unittest.TestCase):
+    def test_positions_from_games(self):
+        positions = positions_from_games(2, Configuration(7, 6))
+        self.assertGreater(len(positions), 2 * 7)
+        self.assertEqual(positions, positions_from_games(2, Configuration(7, 6)))
+        for position in positions:
+            self.assertEqual(position.mark, position.step % 2 + 1)
+
+    def test_replay(self):
+        positions = positions_from_games(1, Configuration(7, 6))
+        self.assertGreater(replay(get_agent('priority'), positions, Configuration(7, 6)), 0)
+
+    def test_top_functions(self):
+        stacks = Counter({'replay;agent;a': 3, 'replay;agent;b': 1, 'replay;agent': 1})
+        functions = top_functions(stacks, 2)
+        self.assertEqual([(f.function, f.self_samples, f.total_samples) for f in functions],
+                         [('a', 3, 3), ('agent', 1, 5)])
+
+    def test_sampler(self):
+        positions = positions_from_games(1, Configuration(7, 6))
+        with StackSampler(0.001, root=replay.__code__) as sampler:
+            replay(busy_agent, positions, Configuration(7, 6))
+        self.assertTrue(sampler.stacks)
+        self.assertTrue(all(stack.startswith('profiling:replay') for stack in sampler.stacks))
+        output = io.StringIO()
+        sampler.write_collapsed(output)
+        self.assertIn('test_profiling:busy_agent', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from arena.environment import make
+from arena.replay import list_episode_files, iter_episodes, iter_positions, replay, print_report, Position
+from board.board_class import Board
+
+
+def first_legal_column_agent(observation, configuration):
+    return next(c for c in range(configuration.columns) if observation.board[c] == 0)
+
+
+def episode(agents) -> dict:
+    env = make('connectx')
+    with contextlib.redirect_stdout(io.StringIO()):
+        env.run(agents)
+    # through JSON, like a logged episode
+    return json.loads(json.dumps(env.toJSON()))
+
+
+class TestReplay(unittest.TestCase):
+    def test_positions(self):
+        logged = episode([first_legal_column_agent, first_legal_column_agent])
+        positions = list(iter_positions('game', logged))
+        self.assertEqual(len(positions), len(logged['steps']) - 1)
+        self.assertEqual([position.mark for position in positions[:3]], [1, 2, 1])
+        self.assertEqual(positions[0].board.board, [0] * 42)
+        self.assertEqual(positions[1].board.board[35], 1)
+        self.assertEqual([position.logged for position in positions[:7]], [0, 0, 0, 0, 0, 0, 1])
+
+    def test_failed_moves_are_skipped(self):
+        def failing_agent(observation, configuration):
+            if observation.step >= 3:
+                raise ValueError()
+            return first_legal_column_agent(observation, configuration)
+
+        logged = episode([first_legal_column_agent, failing_agent])
+        self.assertEqual(logged['statuses'], ['DONE', 'ERROR'])
+        positions = list(iter_positions('game', logged))
+        self.assertEqual([(position.step, position.mark, position.logged) for position in positions],
+                         [(0, 1, 0), (1, 2, 0), (2, 1, 0)])
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'a.json'), 'w') as file:
+                json.dump(episode(['random', 'random']), file)
+            with open(os.path.join(directory, 'b.jsonl'), 'w') as file:
+                for _ in range(2):
+                    file.write(json.dumps(episode(['random', 'random'])) + '\n')
+            names = [name for name, _ in iter_episodes(list_episode_files([directory]))]
+        self.assertEqual([os.path.basename(name) for name in names], ['a.json', 'b.jsonl:1', 'b.jsonl:2'])
+
+    def test_same_agent_agrees(self):
+        logged = episode(['priority', 'priority'])
+        output = io.StringIO()
+        analyses = replay(iter_positions('game', logged), ['priority', 'random'], batch=5, timeout=0.0,
+                          disagreements=output, slowest=2)
+        self.assertEqual([analysis.positions for analysis in analyses], [len(logged['steps']) - 1] * 2)
+        self.assertEqual(analyses[0].disagreements, 0)
+        self.assertEqual(analyses[0].timeouts, analyses[0].positions)
+        self.assertEqual(len(analyses[0].slowest_moves()), 2)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), analyses[1].disagreements)
+        self.assertTrue(all(line['agent'] == 'random' for line in lines))
+
+    def test_errors_are_reported(self):
+        logged = episode([first_legal_column_agent, first_legal_column_agent])
+        # no legal column, the random agent raises
+        full = Position('full', 0, Board([1, 2] * 21, 6, 7), 1, 0)
+        positions = [full] + list(iter_positions('game', logged))[:3]
+        output = io.StringIO()
+        analyses = replay(positions, ['random'], disagreements=output)
+        self.assertEqual(analyses[0].positions, 4)
+        self.assertEqual([(position.episode, error[:10]) for position, error in analyses[0].errors],
+                         [('full', 'IndexError')])
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line['episode'] for line in lines if 'error' in line], ['full'])
+        report = io.StringIO()
+        print_report(analyses, report)
+        self.assertIn('errors of random:\nfull step 0, mark 1: IndexError', report.getvalue())
+
+    def test_process_pool(self):
+        logged = episode([first_legal_column_agent, 'random'])
+        with ProcessPoolExecutor(1) as executor:
+            analyses = replay(iter_positions('game', logged), ['priority'], executor)
+        self.assertEqual(analyses[0].positions, len(logged['steps']) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
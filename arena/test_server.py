@@ -0,0 +1,117 @@
+import asyncio
+import io
+import sys
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from agent import search_based_agent
+from arena.agents import is_stateful, AGENTS
+from arena.server import MatchServer, summarize, serve
+from arena.subprocess_agent import encode_request, decode_request, serve as serve_agent
+from data_structures import Observation, Configuration
+from search.ponder import PonderingAgent
+
+
+def first_legal_column_agent(observation, configuration):
+    return next(c for c in range(configuration.columns) if observation.board[c] == 0)
+
+
+def slow_agent(observation, configuration):
+    time.sleep(0.5)
+    return 0
+
+
+def failing_agent(observation, configuration):
+    raise ValueError('broken')
+
+
+async def collect(server: MatchServer, pairings) -> list:
+    return [result async for result in server.run(pairings)]
+
+
+class TestMatchServer(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(4)
+        self.configuration = Configuration(columns=7, rows=6)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_concurrent_games(self):
+        server = MatchServer(self.configuration, self.executor, move_timeout=5, concurrency=3, opening_moves=2)
+        pairings = [(first_legal_column_agent, 'random')] * 6
+        results = asyncio.run(collect(server, pairings))
+        self.assertEqual(sorted(result.game for result in results), list(range(6)))
+        for result in results:
+            self.assertEqual(result.names, ('first_legal_column_agent', 'random'))
+            self.assertIsNone(result.timed_out)
+            # the opening moves aren't timed
+            self.assertEqual(len(result.latencies), len(result.record.turns) - 2)
+
+        report = summarize(results, elapsed=2.0)
+        self.assertEqual(report.games, 6)
+        self.assertEqual(report.timeouts, 0)
+        self.assertEqual(report.games_per_second, 3.0)
+
+    def test_timeout_loses(self):
+        server = MatchServer(self.configuration, self.executor, move_timeout=0.05)
+        result = asyncio.run(collect(server, [(first_legal_column_agent, slow_agent)]))[0]
+        self.assertEqual(result.timed_out, 2)
+        self.assertEqual(result.record.winner, 1)
+        self.assertEqual(len(result.record.turns), 1)
+
+    def test_error_loses(self):
+        server = MatchServer(self.configuration, self.executor, move_timeout=5, concurrency=2)
+        pairings = [(failing_agent, first_legal_column_agent), (first_legal_column_agent, first_legal_column_agent)]
+        results = sorted(asyncio.run(collect(server, pairings)), key=lambda result: result.game)
+        self.assertEqual(results[0].error_by, 1)
+        self.assertIn('broken', results[0].error)
+        self.assertEqual(results[0].record.winner, 2)
+        # the other game is played to the end
+        self.assertIsNone(results[1].error_by)
+        self.assertEqual(results[1].record.winner, 1)
+        self.assertEqual(summarize(results, elapsed=1.0).errors, 1)
+
+    def test_subprocess_exit_loses(self):
+        server = MatchServer(self.configuration, self.executor, move_timeout=30)
+        result = asyncio.run(collect(server, [(f'cmd:{sys.executable} -c pass', first_legal_column_agent)]))[0]
+        self.assertEqual(result.error_by, 1)
+        self.assertEqual(result.record.winner, 2)
+
+    def test_stateful_agents_need_processes(self):
+        server = MatchServer(self.configuration, self.executor)
+        with self.assertRaises(AssertionError):
+            asyncio.run(collect(server, [('priority_incremental', 'random')]))
+        with self.assertRaises(AssertionError):
+            asyncio.run(collect(server, [(first_legal_column_agent, PonderingAgent())]))
+        with self.assertRaises(AssertionError):
+            asyncio.run(collect(server, [(partial(search_based_agent, depth=1), 'random')]))
+
+    def test_stateful_agents_of_the_registry(self):
+        self.assertEqual(sorted(name for name, agent in AGENTS.items() if is_stateful(agent)), [
+            'pattern_reward_cached', 'priority_incremental', 'search', 'search_no_threats', 'search_parallel',
+            'search_parallel_shared', 'search_ponder', 'simple_reward_cached',
+        ])
+
+    def test_subprocess_agent(self):
+        server = MatchServer(self.configuration, self.executor, move_timeout=30)
+        command = f'cmd:{sys.executable} -m arena.subprocess_agent random'
+        output = io.StringIO()
+        report = asyncio.run(serve(server, [(command, first_legal_column_agent)], output))
+        self.assertEqual(report.games, 1)
+        self.assertEqual(report.timeouts, 0)
+        self.assertIn('game 0: cmd:', output.getvalue())
+
+
+class TestSubprocessAgent(unittest.TestCase):
+    def test_protocol(self):
+        observation = Observation([0] * 42, 0, 1)
+        configuration = Configuration(columns=7, rows=6)
+        request = encode_request(observation, configuration)
+        self.assertEqual(decode_request(request), (observation, configuration))
+
+        responses = io.StringIO()
+        serve_agent(first_legal_column_agent, io.StringIO(request + '\n' + request), responses)
+        self.assertEqual(responses.getvalue(), '{"action": 0}\n{"action": 0}\n')
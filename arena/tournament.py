@@ -0,0 +1,165 @@
+"""
+Round-robin tournament between agents, played with the batch simulator (see
+`arena.batch`): every pair of agents plays --games games with each color, and
+the agents are ranked by their score, 1 per win and 1/2 per draw.
+
+With --memory, the memory of every agent is traced (see `arena.memory`): the
+peak and retained memory of its moves, each a call for all running games, and
+the size of its caches, which --memory-budget keeps under a limit.
+
+With --telemetry FILE, the search stats of the search-based agents (see
+`search.stats`) are summed per game and written to FILE as JSON lines, one per
+game and agent, with the moves played without searching counted in `shortcuts`
+and the moves whose stats couldn't be matched to their game in `unmatched`.
+
+    python -m arena.tournament --agents simple_reward pattern_reward priority search --games 50
+    python -m arena.tournament --agents simple_reward_cached search --memory --memory-budget 16
+    python -m arena.tournament --agents priority search search_ponder --telemetry search.jsonl
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional, TextIO
+
+from arena.agents import get_agent, get_batch_agent, AGENTS
+from arena.batch import play_games
+from arena.game import GameRecord
+from arena.memory import MemoryStats, MemoryTracker
+from arena.telemetry import TelemetryRecorder
+from data_structures import Configuration
+
+
+@dataclass
+class Standing:
+    name: str
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    invalid_moves: int = 0
+    memory: Optional[MemoryStats] = None
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score(self) -> float:
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.0
+
+    def __str__(self):
+        return f'{self.name:<24} {self.games:>6} {self.wins:>6} {self.draws:>6} {self.losses:>6} ' \
+               f'{self.invalid_moves:>8} {self.score:>7.3f}'
+
+
+def run_tournament(names: list[str], configuration: Configuration, games: int, opening_moves: int = 2,
+                   seed: int = 0, memory: bool = False, memory_budget: Optional[int] = None,
+                   telemetry: Optional[TextIO] = None) -> list[Standing]:
+    """
+    returns the standings, best first; with `memory`, the standings include the
+    memory stats of the agents, whose caches are kept under `memory_budget`
+    bytes. The search stats of every game are written to `telemetry` as JSON lines.
+    """
+    assert memory_budget is None or memory, 'a memory budget needs memory'
+    standings = {name: Standing(name) for name in names}
+    trackers = {}
+    if memory:
+        trackers = {name: MemoryTracker(get_batch_agent(name), memory_budget, owner=get_agent(name))
+                    for name in names}
+        tracemalloc.start()
+    try:
+        for first, second in itertools.permutations(names, 2):
+            if memory:
+                agents = [trackers[first], trackers[second]]
+            else:
+                agents = [get_batch_agent(first), get_batch_agent(second)]
+            recorders = on_moves = None
+            if telemetry is not None:
+                recorders = [TelemetryRecorder(agent, get_agent(name)) for agent, name in zip(agents, [first, second])]
+                agents = recorders
+
+                def on_moves(moved_games: list[int], mark: int):
+                    recorders[mark - 1].add_moves(moved_games)
+
+            # some agents print their reasoning on every move
+            with contextlib.redirect_stdout(io.StringIO()):
+                records = play_games(agents, configuration, games, opening_moves, seed, on_moves)
+            add_results(standings, records, first, second)
+            if recorders is not None:
+                write_telemetry(telemetry, recorders, records, first, second)
+    finally:
+        if memory:
+            tracemalloc.stop()
+        # the tables of the search agents are shared by the process, give them back their sizes
+        for tracker in trackers.values():
+            if tracker.budget is not None:
+                tracker.budget.restore()
+    if memory:
+        for name, standing in standings.items():
+            standing.memory = trackers[name].stats
+    return sorted(standings.values(), key=lambda standing: -standing.score)
+
+
+def write_telemetry(output: TextIO, recorders: list[TelemetryRecorder], records: list[GameRecord], first: str,
+                    second: str):
+    for mark, (name, opponent) in [(1, (first, second)), (2, (second, first))]:
+        for game, stats in sorted(recorders[mark - 1].games.items()):
+            line = {'agent': name, 'opponent': opponent, 'mark': mark, 'game': game,
+                    'result': records[game].result_for(mark), 'plies': len(records[game].turns),
+                    **stats.to_dict()}
+            output.write(json.dumps(line) + '\n')
+
+
+def add_results(standings: dict[str, Standing], records: list[GameRecord], first: str, second: str):
+    for record in records:
+        for mark, name in [(1, first), (2, second)]:
+            result = record.result_for(mark)
+            standing = standings[name]
+            if result == 1:
+                standing.wins += 1
+            elif result == 0:
+                standing.draws += 1
+            else:
+                standing.losses += 1
+            if record.invalid_move_by == mark:
+                standing.invalid_moves += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', nargs='+', default=['simple_reward', 'pattern_reward', 'priority'],
+                        choices=sorted(AGENTS))
+    parser.add_argument('--games', type=int, default=20, help='games per pairing and color')
+    parser.add_argument('--opening-moves', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--memory', action='store_true', help='trace the memory of the agents')
+    parser.add_argument('--memory-budget', type=float, help='MiB the caches of every agent are kept under')
+    parser.add_argument('--telemetry', help='write the search stats of every game to this file, as JSON lines')
+    args = parser.parse_args()
+    if args.memory_budget is not None and not args.memory:
+        parser.error('--memory-budget needs --memory')
+    budget = None if args.memory_budget is None else int(args.memory_budget * (1 << 20))
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        telemetry = None if args.telemetry is None else stack.enter_context(open(args.telemetry, 'w'))
+        standings = run_tournament(args.agents, Configuration(args.columns, args.rows), args.games,
+                                   args.opening_moves, args.seed, args.memory, budget, telemetry)
+    elapsed = time.perf_counter() - start
+    print(f'{"agent":<24} {"games":>6} {"wins":>6} {"draws":>6} {"losses":>6} {"invalid":>8} {"score":>7}')
+    for standing in standings:
+        print(standing)
+    print(f'{sum(standing.games for standing in standings) // 2} games in {elapsed:.1f}s')
+    for standing in standings:
+        if standing.memory is not None:
+            print(f'{standing.name}: {standing.memory}')
+
+
+if __name__ == '__main__':
+    main()
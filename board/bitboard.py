@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+from board.board_class import Board
+
+
+@dataclass(frozen=True)
+class BitboardLayout:
+    """
+    Precomputed masks for a board shape. The bitboard stores the board column by
+    column, from the bottom up, with one extra (always empty) sentinel bit on top
+    of every column, so that shifting never wraps a line into the next column.
+
+    The following is the bit index of each cell for the regular 6 x 7 board; the
+    top row (6, 13, ...) is the sentinel row
+
+    6 13 20 27 34 41 48
+    5 12 19 26 33 40 47
+    4 11 18 25 32 39 46
+    3 10 17 24 31 38 45
+    2  9 16 23 30 37 44
+    1  8 15 22 29 36 43
+    0  7 14 21 28 35 42
+    """
+    rows: int
+    columns: int
+    height: int  # bits per column, including the sentinel bit
+    size: int  # total number of bits, including the sentinel bits
+    bottom_mask: int
+    board_mask: int
+    cell_bits: tuple[int, ...]  # board index -> bit index
+
+    def column_mask(self, column: int) -> int:
+        return ((1 << self.rows) - 1) << (column * self.height)
+
+    def top_mask(self, column: int) -> int:
+        return 1 << (column * self.height + self.rows - 1)
+
+    def bottom_mask_of(self, column: int) -> int:
+        return 1 << (column * self.height)
+
+
+@lru_cache(maxsize=None)
+def get_layout(rows: int, columns: int) -> BitboardLayout:
+    height = rows + 1
+    bottom_mask = sum(1 << (column * height) for column in range(columns))
+    board_mask = bottom_mask * ((1 << rows) - 1)
+    cell_bits = tuple(
+        (index % columns) * height + (rows - 1 - index // columns)
+        for index in range(rows * columns)
+    )
+    return BitboardLayout(
+        rows, columns, height, columns * height, bottom_mask, board_mask, cell_bits
+    )
+
+
+@dataclass
+class BitBoard:
+    """
+    The same position as a `Board`, stored as one bitmask per player, using the
+    layout described in `BitboardLayout`
+    """
+    player_1: int
+    player_2: int
+    rows: int
+    columns: int
+
+    def pieces_of(self, mark: int) -> int:
+        return self.player_1 if mark == 1 else self.player_2
+
+    @property
+    def occupied(self) -> int:
+        return self.player_1 | self.player_2
+
+
+def from_board(board: Board) -> BitBoard:
+    layout = get_layout(board.rows, board.columns)
+    player_1 = 0
+    player_2 = 0
+    for index, value in enumerate(board.board):
+        if value == 1:
+            player_1 |= 1 << layout.cell_bits[index]
+        elif value == 2:
+            player_2 |= 1 << layout.cell_bits[index]
+    return BitBoard(player_1, player_2, board.rows, board.columns)
+
+
+def to_board(bitboard: BitBoard) -> Board:
+    layout = get_layout(bitboard.rows, bitboard.columns)
+    cells = []
+    for bit in layout.cell_bits:
+        if bitboard.player_1 >> bit & 1:
+            cells.append(1)
+        elif bitboard.player_2 >> bit & 1:
+            cells.append(2)
+        else:
+            cells.append(0)
+    return Board(cells, bitboard.rows, bitboard.columns)
+
+
+def has_four(bits: int, rows: int) -> bool:
+    """returns if the given player bits contain four in a row on any axis"""
+    height = rows + 1
+    # vertical, horizontal and both diagonals
+    for shift in (1, height, height - 1, height + 1):
+        pairs = bits & (bits >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
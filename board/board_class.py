@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 
 @dataclass
@@ -22,10 +23,55 @@ class Board:
     4   28, 29, 30, 31, 32, 33, 34,
     5   35, 36, 37, 38, 39, 40, 41 ]
 
+    Optionally, the board keeps the number of pieces in every column (heights),
+    which makes finding legal moves and landing cells constant time. Heights are
+    kept in sync by `add_piece` and `remove_piece`; the list-only constructor
+    (e.g. from an observation) does not track them until `track_heights` is called.
     """
     board: list[int]
     rows: int
     columns: int
+    heights: Optional[list[int]] = field(default=None, compare=False, repr=False)
+    piece_count: int = field(default=0, compare=False, repr=False)
+
+    @classmethod
+    def with_heights(cls, board: list[int], rows: int, columns: int) -> 'Board':
+        return cls(board, rows, columns).track_heights()
+
+    def track_heights(self) -> 'Board':
+        """computes the heights of all columns and keeps them in sync from now on"""
+        self.heights = [
+            sum(1 for row in range(self.rows) if self.board[row * self.columns + column] != 0)
+            for column in range(self.columns)
+        ]
+        self.piece_count = sum(self.heights)
+        return self
+
+    def legal_columns(self) -> list[int]:
+        if self.heights is None:
+            return [column for column in range(self.columns) if self.board[column] == 0]
+        return [column for column in range(self.columns) if self.heights[column] < self.rows]
+
+    def is_full(self) -> bool:
+        if self.heights is None:
+            return all(value != 0 for value in self.board[:self.columns])
+        return self.piece_count == self.rows * self.columns
+
+    def landing_index(self, column: int) -> Optional[int]:
+        """returns the board index a piece played in that column lands on, None if it's full"""
+        if self.heights is None:
+            for row in range(self.rows - 1, -1, -1):
+                if self.board[row * self.columns + column] == 0:
+                    return row * self.columns + column
+            return None
+        height = self.heights[column]
+        if height == self.rows:
+            return None
+        return (self.rows - 1 - height) * self.columns + column
+
+    def freeze(self) -> bytes:
+        """the cells as bytes, a hashable copy for cache keys"""
+        return bytes(self.board)
 
     def __getitem__(self, item):
         return self.board[item]
@@ -0,0 +1,96 @@
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from board.board_class import Board
+from board.packed import position_key
+from board.value_calculation import get_board_value
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+    nbytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class EvaluationCache:
+    """
+    memoises a board evaluation function (by default `get_board_value`) by
+    (position key, mark), evicting the least recently used entry once
+    `max_size` entries are stored. Safe to share between threads.
+
+    Enable it for an agent by binding it, e.g.
+    `functools.partial(simple_reward_agent, cache=EvaluationCache())`
+    """
+
+    def __init__(self, max_size: int = 1 << 16, evaluate: Callable[[Board, int], float] = get_board_value):
+        assert max_size > 0, 'max_size must be positive'
+        self.max_size = max_size
+        self.evaluate = evaluate
+        self._entries: OrderedDict[tuple[int, int], float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_board_value(self, board: Board, mark: int) -> float:
+        key = (position_key(board), mark)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            self._misses += 1
+
+        # evaluate outside the lock, concurrent misses on the same key just compute it twice
+        value = self.evaluate(board, mark)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resize(self, max_size: int):
+        """changes `max_size`, evicting the least recently used entries that no longer fit"""
+        assert max_size > 0, 'max_size must be positive'
+        with self._lock:
+            self.max_size = max_size
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        """approximate memory of the entries, estimated from the size of the most recent one"""
+        with self._lock:
+            if not self._entries:
+                return sys.getsizeof(self._entries)
+            key, value = next(reversed(self._entries.items()))
+            entry = sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) + sys.getsizeof(value)
+            return sys.getsizeof(self._entries) + entry * len(self._entries)
+
+    def stats(self) -> CacheStats:
+        nbytes = self.nbytes
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self.max_size, nbytes)
+
+    def __len__(self):
+        return len(self._entries)
@@ -9,6 +9,13 @@ def add_piece(board: Board, mark: int, column: int) -> int:
     """
     assert get_value_at(board, 0, column) == 0, 'column is full'
 
+    if board.heights is not None:
+        index = board.landing_index(column)
+        board.board[index] = mark
+        board.heights[column] += 1
+        board.piece_count += 1
+        return index
+
     # search for any pieces in this column, and place our piece on top of it
     for row in range(board.rows):
         first_piece_in_column = get_value_at(board, row, column)
@@ -20,3 +27,25 @@ def add_piece(board: Board, mark: int, column: int) -> int:
     bottom_index = get_index_at(board, board.rows - 1, column)
     board.board[bottom_index] = mark
     return bottom_index
+
+
+def remove_piece(board: Board, column: int) -> int:
+    """
+    removes the topmost piece of the column, undoing `add_piece`
+    returns the board index of the piece removed
+    mutates the board
+    """
+    assert get_value_at(board, board.rows - 1, column) != 0, 'column is empty'
+
+    if board.heights is not None:
+        index = get_index_at(board, board.rows - board.heights[column], column)
+        board.board[index] = 0
+        board.heights[column] -= 1
+        board.piece_count -= 1
+        return index
+
+    for row in range(board.rows):
+        if get_value_at(board, row, column) != 0:
+            index = get_index_at(board, row, column)
+            board.board[index] = 0
+            return index
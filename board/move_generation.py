@@ -0,0 +1,69 @@
+"""
+Move generation that never hands the opponent a win.
+
+Given the player to move, the legal moves are reduced, in this order, to
+- the moves that win immediately, if there are any
+- the forced blocks, if the opponent has an immediate threat
+- the moves that do not unlock an opponent threat directly above them
+All sets are bitmasks of playable cells (see `board.threats.playable_cells`).
+"""
+from dataclasses import dataclass
+
+from board.bitboard import BitBoard, BitboardLayout, get_layout, from_board
+from board.board_class import Board
+from board.threats import winning_cells, playable_cells
+
+
+@dataclass
+class MoveOptions:
+    legal: int
+    winning: int  # legal moves that complete four
+    forced_blocks: int  # legal moves on an immediate threat of the opponent
+    unlocking: int  # legal moves directly below a threat of the opponent
+    non_losing: int  # the reduced legal set, 0 when every move loses
+
+
+def analyse_moves(bitboard: BitBoard, mark: int) -> MoveOptions:
+    layout = get_layout(bitboard.rows, bitboard.columns)
+    return analyse_move_bits(bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark), layout)
+
+
+def analyse_move_bits(own: int, opponent: int, layout: BitboardLayout) -> MoveOptions:
+    """`analyse_moves` for the player with the `own` bits, without building a BitBoard"""
+    occupied = own | opponent
+    legal = playable_cells(occupied, layout)
+    winning = legal & winning_cells(own, occupied, layout)
+    opponent_threats = winning_cells(opponent, occupied, layout)
+    forced_blocks = legal & opponent_threats
+    unlocking = legal & (opponent_threats >> 1)
+
+    if winning:
+        non_losing = winning
+    elif forced_blocks & (forced_blocks - 1):
+        # more than one immediate threat can't be blocked
+        non_losing = 0
+    elif forced_blocks:
+        non_losing = forced_blocks & ~unlocking
+    else:
+        non_losing = legal & ~unlocking
+    return MoveOptions(legal, winning, forced_blocks, unlocking, non_losing)
+
+
+def non_losing_moves(bitboard: BitBoard, mark: int) -> int:
+    return analyse_moves(bitboard, mark).non_losing
+
+
+def columns_of(cells: int, layout: BitboardLayout) -> list[int]:
+    """returns the columns of the given cells, in ascending order"""
+    return [column for column in range(layout.columns) if cells & layout.column_mask(column)]
+
+
+def non_losing_columns(board: Board, mark: int) -> list[int]:
+    """
+    returns the columns the player with that mark can play without losing on the
+    opponent's next move. When every move loses, the forced blocks are returned,
+    or every legal column if there are none.
+    """
+    options = analyse_moves(from_board(board), mark)
+    layout = get_layout(board.rows, board.columns)
+    return columns_of(options.non_losing or options.forced_blocks or options.legal, layout)
@@ -0,0 +1,130 @@
+"""
+Compact encodings of a `Board`, for storing and hashing large amounts of
+positions.
+
+- cells: 2 bits per cell, 4 cells per byte, cell 0 in the lowest bits of byte 0
+- bitboards: both players' bitboards packed into one int, player 1 in the low bits
+- key: a stable 64-bit integer, identical across processes and runs
+
+The bulk functions work on NumPy arrays of shape (n, rows * columns) and import
+NumPy lazily, so the rest of this module works without it.
+"""
+import hashlib
+from typing import Iterable
+
+from board.bitboard import get_layout, from_board, BitBoard, to_board
+from board.board_class import Board
+
+KEY_BITS = 64
+
+
+def packed_size(rows: int, columns: int) -> int:
+    """number of bytes of a board encoded with `encode_cells`"""
+    return (rows * columns + 3) // 4
+
+
+def encode_cells(board: Board) -> bytes:
+    data = bytearray(packed_size(board.rows, board.columns))
+    for index, value in enumerate(board.board):
+        data[index >> 2] |= value << ((index & 3) << 1)
+    return bytes(data)
+
+
+def decode_cells(data: bytes, rows: int, columns: int) -> Board:
+    assert len(data) == packed_size(rows, columns), \
+        f'expected {packed_size(rows, columns)} bytes, got {len(data)}'
+    cells = [data[index >> 2] >> ((index & 3) << 1) & 3 for index in range(rows * columns)]
+    assert all(value in [0, 1, 2] for value in cells), 'invalid board value'
+    return Board(cells, rows, columns)
+
+
+def encode_bitboards(board: Board) -> int:
+    bitboard = from_board(board)
+    return bitboard.player_1 | bitboard.player_2 << get_layout(board.rows, board.columns).size
+
+
+def decode_bitboards(value: int, rows: int, columns: int) -> Board:
+    layout = get_layout(rows, columns)
+    player_1 = value & ((1 << layout.size) - 1)
+    player_2 = value >> layout.size
+    assert player_1 & player_2 == 0, 'both players occupy the same cell'
+    return to_board(BitBoard(player_1, player_2, rows, columns))
+
+
+def position_key(board: Board) -> int:
+    """
+    returns a stable 64-bit key of the position.
+
+    When the board fits into 64 bits (the regular 6 x 7 board needs 49), the key
+    is `player_1 + occupied + bottom`, which is unique for every position without
+    floating pieces and can be turned back into a board with `key_to_board`.
+    Larger boards fall back to a 64-bit BLAKE2 digest of the packed cells.
+    """
+    layout = get_layout(board.rows, board.columns)
+    if layout.size > KEY_BITS:
+        return _digest_key(encode_cells(board))
+    bitboard = from_board(board)
+    return bitboard.player_1 + bitboard.occupied + layout.bottom_mask
+
+
+def key_to_board(key: int, rows: int, columns: int) -> Board:
+    """inverse of `position_key`, for boards that fit into 64 bits"""
+    layout = get_layout(rows, columns)
+    assert layout.size <= KEY_BITS, 'key is a digest for boards of this size'
+    player_1 = 0
+    occupied = 0
+    for column in range(columns):
+        column_bits = key >> (column * layout.height) & ((1 << layout.height) - 1)
+        # the highest set bit of a column marks the first empty cell
+        column_height = column_bits.bit_length() - 1
+        assert column_height >= 0, f'invalid key {key}'
+        below = (1 << column_height) - 1
+        player_1 |= (column_bits & below) << (column * layout.height)
+        occupied |= below << (column * layout.height)
+    return to_board(BitBoard(player_1, occupied ^ player_1, rows, columns))
+
+
+def _digest_key(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def boards_to_array(boards: Iterable[Board]):
+    """returns an int8 array of shape (n, rows * columns)"""
+    import numpy as np
+    return np.array([board.board for board in boards], dtype=np.int8)
+
+
+def array_to_boards(array, rows: int, columns: int) -> list[Board]:
+    assert array.shape[1] == rows * columns, f'expected {rows * columns} cells per row'
+    return [Board(cells, rows, columns) for cells in array.tolist()]
+
+
+def pack_array(array):
+    """2-bit packs an (n, rows * columns) array into a uint8 array of shape (n, packed_size)"""
+    import numpy as np
+    n, cells = array.shape
+    padded = np.zeros((n, (cells + 3) // 4 * 4), dtype=np.uint8)
+    padded[:, :cells] = array
+    quads = padded.reshape(n, -1, 4)
+    return (quads[..., 0] | quads[..., 1] << 2 | quads[..., 2] << 4 | quads[..., 3] << 6) \
+        .astype(np.uint8)
+
+
+def unpack_array(packed, rows: int, columns: int):
+    """inverse of `pack_array`"""
+    import numpy as np
+    shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+    quads = (packed[..., np.newaxis] >> shifts) & 3
+    return quads.reshape(packed.shape[0], -1)[:, :rows * columns].astype(np.int8)
+
+
+def keys_from_array(array, rows: int, columns: int):
+    """returns the `position_key` of every row of an (n, rows * columns) array as uint64"""
+    import numpy as np
+    layout = get_layout(rows, columns)
+    if layout.size > KEY_BITS:
+        return np.array([_digest_key(row.tobytes()) for row in pack_array(array)], dtype=np.uint64)
+    cell_values = np.array([1 << bit for bit in layout.cell_bits], dtype=np.uint64)
+    player_1 = np.where(array == 1, cell_values, np.uint64(0)).sum(axis=1, dtype=np.uint64)
+    occupied = np.where(array != 0, cell_values, np.uint64(0)).sum(axis=1, dtype=np.uint64)
+    return player_1 + occupied + np.uint64(layout.bottom_mask)
@@ -1,17 +1,159 @@
+"""
+Linear board evaluation over window patterns.
+
+Every window of 4 cells (see `board.windows`) is classified, once for each
+player, by the number of that player's pieces in it and whether the opponent
+has a piece in it too (blocked). The board value is the dot product of the
+pattern counts of both players with a weight vector that is fitted offline on
+self-play data (see `dataset.fit_patterns`).
+"""
+import json
 from enum import Enum
-from unittest import TestCase
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from board.bitboard import from_board
+from board.board_class import Board
+from board.windows import get_window_masks, get_windows
+
+
+class Pattern(int, Enum):
+    One = 0
+    Two = 1
+    Three = 2
+    OneBlocked = 3
+    TwoBlocked = 4
+    ThreeBlocked = 5
+    Four = 6
+
+
+PATTERN_COUNT = len(Pattern)
+# pattern counts of the player, then pattern counts of the opponent
+FEATURE_COUNT = 2 * PATTERN_COUNT
+
+# fitted with `dataset.fit_patterns --method logistic` on 15k positions from 1500
+# games between simple_reward, priority and pattern_reward with 8 random opening
+# moves. Replace them with `load_weights` after fitting on a larger data set.
+default_weights: list[float] = [
+    0.0142, 0.1164, 0.3859, 0.0075, 0.0004, -0.0350, 561.2374,
+    -0.0320, -0.2044, -0.5612, -0.0017, 0.0091, 0.0121, -561.2374,
+]
+
+
+def get_pattern_for_connection(own: int, opponent: int) -> Optional[Pattern]:
+    """
+    returns the pattern of a window with `own` pieces of the player and
+    `opponent` pieces of the opponent, or None for a window without own pieces
+    """
+    if own == 0:
+        return None
+    if own == 4:
+        return Pattern.Four
+    if opponent == 0:
+        return Pattern(own - 1)
+    return Pattern(own + 2)
+
+
+# feature index of a window, by (own pieces, opponent pieces), from the view of the player
+_own_feature = {
+    (own, opponent): get_pattern_for_connection(own, opponent)
+    for own in range(1, 5) for opponent in range(5 - own)
+}
+_opponent_feature = {
+    (own, opponent): PATTERN_COUNT + get_pattern_for_connection(opponent, own)
+    for own in range(5) for opponent in range(1, 5 - own)
+}
+
+
+def get_pattern_features(board: Board, mark: int) -> list[int]:
+    """returns the pattern counts of the player specified by mark, followed by the opponent's"""
+    assert mark in [1, 2], f'invalid value for mark: {mark}'
+    bitboard = from_board(board)
+    return get_bitboard_features(bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark), board.rows, board.columns)
+
+
+def get_bitboard_features(own_bits: int, opponent_bits: int, rows: int, columns: int) -> list[int]:
+    """`get_pattern_features` for the bitmasks of the player and the opponent"""
+    features = [0] * FEATURE_COUNT
+    for window_mask in get_window_masks(rows, columns):
+        counts = ((own_bits & window_mask).bit_count(), (opponent_bits & window_mask).bit_count())
+        if counts[0]:
+            features[_own_feature[counts]] += 1
+        if counts[1]:
+            features[_opponent_feature[counts]] += 1
+    return features
+
+
+def get_board_value(board: Board, mark: int, weights: Optional[Sequence[float]] = None) -> float:
+    weights = default_weights if weights is None else weights
+    return sum(w * f for w, f in zip(weights, get_pattern_features(board, mark)))
+
+
+@lru_cache(maxsize=16)
+def _window_values(weights: tuple[float, ...]) -> dict[tuple[int, int], float]:
+    """the value of a single window, by (own pieces, opponent pieces)"""
+    values = {}
+    for own in range(5):
+        for opponent in range(5 - own):
+            value = 0.0
+            if own:
+                value += weights[_own_feature[own, opponent]]
+            if opponent:
+                value += weights[_opponent_feature[own, opponent]]
+            values[own, opponent] = value
+    return values
+
+
+def get_bitboard_value(own_bits: int, opponent_bits: int, rows: int, columns: int,
+                       weights: Optional[Sequence[float]] = None) -> float:
+    """
+    `get_board_value` for the bitmasks of the player and the opponent, summed
+    window by window, which is what a search evaluates at its leaves
+    """
+    values = _window_values(tuple(default_weights if weights is None else weights))
+    return sum(
+        values[(own_bits & window_mask).bit_count(), (opponent_bits & window_mask).bit_count()]
+        for window_mask in get_window_masks(rows, columns)
+    )
+
+
+def get_pattern_features_array(boards, marks, rows: int, columns: int):
+    """
+    vectorised `get_pattern_features` for an int8 array of boards of shape
+    (n, rows * columns) and an array of n marks; returns an (n, FEATURE_COUNT) array
+    """
+    import numpy as np
+    windows = np.array(get_windows(rows, columns), dtype=np.intp)
+    marks = np.asarray(marks).reshape(-1, 1, 1)
+    cells = np.asarray(boards)[:, windows]  # (n, windows, 4)
+    own = (cells == marks).sum(axis=2)
+    opponent = ((cells != marks) & (cells != 0)).sum(axis=2)
+
+    features = np.zeros((len(cells), FEATURE_COUNT), dtype=np.int32)
+    for offset, (a, b) in enumerate([(own, opponent), (opponent, own)]):
+        patterns = np.where(b == 0, a - 1, a + 2)
+        patterns = np.where(a == 4, Pattern.Four, patterns)
+        patterns = np.where(a == 0, PATTERN_COUNT, patterns)  # no pattern, dropped below
+        for pattern in Pattern:
+            features[:, offset * PATTERN_COUNT + pattern] = (patterns == pattern).sum(axis=1)
+    return features
+
+
+def get_board_values_array(boards, marks, rows: int, columns: int, weights: Optional[Sequence[float]] = None):
+    """vectorised `get_board_value`, a single matrix-vector product for the whole batch"""
+    import numpy as np
+    weights = np.asarray(default_weights if weights is None else weights, dtype=np.float64)
+    return get_pattern_features_array(boards, marks, rows, columns) @ weights
 
 
-class Pattern(Enum):
-    One: 0
-    Two: 1
-    Three: 2
-    OneBlocked: 3
-    TwoBlocked: 4
-    ThreeBlocked: 5
+def load_weights(path: str) -> list[float]:
+    with open(path) as file:
+        weights = json.load(file)
+    assert len(weights) == FEATURE_COUNT, f'expected {FEATURE_COUNT} weights, got {len(weights)}'
+    return [float(w) for w in weights]
 
-def get_board_value(board: Board, mark: int) -> float:
-    pass
 
-def get_pattern_for_connection(connection: list[int]) -> Pattern:
-    pass
+def save_weights(weights: Sequence[float], path: str):
+    assert len(weights) == FEATURE_COUNT, f'expected {FEATURE_COUNT} weights, got {len(weights)}'
+    with open(path, 'w') as file:
+        json.dump([float(w) for w in weights], file, indent=2)
@@ -0,0 +1,181 @@
+"""
+Perft for connect 4: counts the positions reached after every number of plies
+from a position, to check that board engines generate the same moves and
+detect the same wins, and to benchmark them.
+
+A move that wins, or fills the board, ends the game there: it's counted, as a
+win or a draw, but not played on from. Engines are registered in `ENGINES`:
+- list: `Board` and `add_piece` / `remove_piece` on the plain list, as agents
+  get it from an observation
+- list_heights: the same, with the heights of the columns tracked
+- array: the same, on the `array('b')` of `board.views.writable_copy`
+- bitboard: the bitboards of `board.bitboard`
+
+Positions are given as the columns played from the empty board, e.g. 3324.
+
+    python -m board.perft --depth 6
+    python -m board.perft --depth 5 --positions 3324 33333 --engines list bitboard
+"""
+import argparse
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from board.bitboard import from_board, get_layout, has_four
+from board.board_class import Board
+from board.interaction import add_piece, remove_piece
+from board.views import writable_copy
+from board.windows import get_cell_windows
+
+
+@dataclass
+class PerftCounts:
+    """per ply, from 1 to the depth"""
+    positions: list[int] = field(default_factory=list)
+    wins: list[int] = field(default_factory=list)  # of the player who made the last move
+    draws: list[int] = field(default_factory=list)
+
+    @classmethod
+    def of_depth(cls, depth: int) -> 'PerftCounts':
+        return cls([0] * depth, [0] * depth, [0] * depth)
+
+    @property
+    def total(self) -> int:
+        return sum(self.positions)
+
+
+def perft_list(board: Board, mark: int, depth: int) -> PerftCounts:
+    counts = PerftCounts.of_depth(depth)
+    _perft_list(Board(list(board.board), board.rows, board.columns), mark, 0, counts)
+    return counts
+
+
+def perft_list_heights(board: Board, mark: int, depth: int) -> PerftCounts:
+    counts = PerftCounts.of_depth(depth)
+    _perft_list(Board.with_heights(list(board.board), board.rows, board.columns), mark, 0, counts)
+    return counts
+
+
+def perft_array(board: Board, mark: int, depth: int) -> PerftCounts:
+    counts = PerftCounts.of_depth(depth)
+    _perft_list(writable_copy(board), mark, 0, counts)
+    return counts
+
+
+def _perft_list(board: Board, mark: int, ply: int, counts: PerftCounts):
+    cell_windows = get_cell_windows(board.rows, board.columns)
+    for column in board.legal_columns():
+        index = add_piece(board, mark, column)
+        counts.positions[ply] += 1
+        if any(all(board.board[cell] == mark for cell in window) for window in cell_windows[index]):
+            counts.wins[ply] += 1
+        elif board.is_full():
+            counts.draws[ply] += 1
+        elif ply + 1 < len(counts.positions):
+            _perft_list(board, 3 - mark, ply + 1, counts)
+        remove_piece(board, column)
+
+
+def perft_bitboard(board: Board, mark: int, depth: int) -> PerftCounts:
+    counts = PerftCounts.of_depth(depth)
+    bitboard = from_board(board)
+    layout = get_layout(board.rows, board.columns)
+    column_masks = tuple(layout.column_mask(column) for column in range(board.columns))
+    _perft_bits(bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark), layout, column_masks, 0, counts)
+    return counts
+
+
+def _perft_bits(own: int, opponent: int, layout, column_masks: tuple[int, ...], ply: int, counts: PerftCounts):
+    occupied = own | opponent
+    playable = occupied + layout.bottom_mask
+    for column_mask in column_masks:
+        move = playable & column_mask
+        if not move:
+            continue
+        counts.positions[ply] += 1
+        pieces = own | move
+        if has_four(pieces, layout.rows):
+            counts.wins[ply] += 1
+        elif occupied | move == layout.board_mask:
+            counts.draws[ply] += 1
+        elif ply + 1 < len(counts.positions):
+            _perft_bits(opponent, pieces, layout, column_masks, ply + 1, counts)
+
+
+ENGINES: dict[str, Callable[[Board, int, int], PerftCounts]] = {
+    'list': perft_list,
+    'list_heights': perft_list_heights,
+    'array': perft_array,
+    'bitboard': perft_bitboard,
+}
+
+
+def play_moves(moves: str, rows: int, columns: int) -> tuple[Board, int]:
+    """the board after playing the columns of `moves` from the empty board, and the mark to move"""
+    board = Board([0] * (rows * columns), rows, columns)
+    mark = 1
+    for move in moves:
+        column = int(move)
+        assert column < columns and board.board[column] == 0, f'illegal move {move} in {moves}'
+        add_piece(board, mark, column)
+        mark = 3 - mark
+    return board, mark
+
+
+@dataclass
+class EngineRun:
+    engine: str
+    counts: PerftCounts
+    seconds: float
+
+    @property
+    def positions_per_second(self) -> float:
+        return self.counts.total / self.seconds if self.seconds else 0.0
+
+
+def run_engines(board: Board, mark: int, depth: int, engines: list[str]) -> list[EngineRun]:
+    runs = []
+    for engine in engines:
+        start = time.perf_counter()
+        counts = ENGINES[engine](board, mark, depth)
+        runs.append(EngineRun(engine, counts, time.perf_counter() - start))
+    return runs
+
+
+def disagreements(runs: list[EngineRun]) -> list[str]:
+    """the engines whose counts differ from those of the first one"""
+    return [run.engine for run in runs[1:] if run.counts != runs[0].counts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--positions', nargs='+', default=[''], help='the columns played from the empty board')
+    parser.add_argument('--engines', nargs='+', default=sorted(ENGINES), choices=sorted(ENGINES))
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    args = parser.parse_args()
+
+    failed = False
+    for moves in args.positions:
+        board, mark = play_moves(moves, args.rows, args.columns)
+        runs = run_engines(board, mark, args.depth, args.engines)
+        counts = runs[0].counts
+        print(f'position "{moves}", mark {mark} to move')
+        print(f'{"ply":>4} {"positions":>12} {"wins":>10} {"draws":>8}')
+        for ply in range(args.depth):
+            print(f'{ply + 1:>4} {counts.positions[ply]:>12} {counts.wins[ply]:>10} {counts.draws[ply]:>8}')
+        for run in runs:
+            print(f'{run.engine:<14} {run.seconds:>8.2f}s {run.positions_per_second:>12,.0f} positions/s')
+        different = disagreements(runs)
+        if different:
+            failed = True
+            print(f'MISMATCH: {", ".join(different)} disagree with {runs[0].engine}')
+            for run in runs[1:]:
+                print(f'{run.engine}: {run.counts}')
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
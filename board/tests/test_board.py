@@ -1,11 +1,14 @@
+import random
 import unittest
 
-from board.interaction import add_piece
+from board.board_class import Board
+from board.interaction import add_piece, remove_piece
 from board.navigation import get_value_at, get_row_and_col_at, get_index_at, Up, UpRight, Right, \
     DownRight, Down, DownLeft, Left, UpLeft, DownwardsDiagonal, UpwardsDiagonal, Horizontal, Vertical, TAxis, \
     all_axes
 from board.tests.helpers import parse_board
-from board.value_calculation import get_board_value, value_table, find_blocked_opponent_connections, find_connections
+from board.value_calculation import get_board_value, value_table, find_blocked_opponent_connections, find_connections, \
+    connection_is_blocked
 
 
 class TestBoardSpecialCases(unittest.TestCase):
@@ -140,6 +143,51 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(board, expected_board)
 
 
+class TestBoardHeights(unittest.TestCase):
+    def boards(self):
+        nested_list = [[0, 0, 0],  # [[0, 1, 2]
+                       [2, 0, 0],  # [3, 4, 5]
+                       [1, 1, 0]]  # [6, 7, 8]]
+        return [parse_board(nested_list), parse_board(nested_list).track_heights()]
+
+    def test_track_heights(self):
+        board = self.boards()[1]
+        self.assertEqual(board.heights, [2, 1, 0])
+        self.assertEqual(board.piece_count, 3)
+
+    def test_legal_columns_and_landing_index(self):
+        for board in self.boards():
+            self.assertEqual(board.legal_columns(), [0, 1, 2])
+            self.assertEqual(board.landing_index(0), 0)
+            self.assertEqual(board.landing_index(1), 4)
+            self.assertEqual(board.landing_index(2), 8)
+            add_piece(board, 1, 0)
+            self.assertEqual(board.legal_columns(), [1, 2])
+            self.assertIsNone(board.landing_index(0))
+            self.assertFalse(board.is_full())
+
+    def test_add_and_remove_piece(self):
+        for board in self.boards():
+            self.assertEqual(add_piece(board, 2, 1), 4)
+            self.assertEqual(add_piece(board, 1, 1), 1)
+            self.assertEqual(remove_piece(board, 1), 1)
+            self.assertEqual(remove_piece(board, 1), 4)
+            self.assertEqual(remove_piece(board, 0), 3)
+            self.assertEqual(board, parse_board([[0, 0, 0], [0, 0, 0], [1, 1, 0]]))
+            self.assertRaises(AssertionError, lambda: remove_piece(board, 2))
+
+        board = self.boards()[1]
+        add_piece(board, 1, 1)
+        remove_piece(board, 0)
+        self.assertEqual(board.heights, [1, 2, 0])
+        self.assertEqual(board.heights, Board(board.board, 3, 3).track_heights().heights)
+
+    def test_is_full(self):
+        for board in [parse_board([[1, 2], [2, 1]]), Board.with_heights([1, 2, 2, 1], 2, 2)]:
+            self.assertTrue(board.is_full())
+            self.assertEqual(board.legal_columns(), [])
+
+
 class TestFindBlockedConnections(unittest.TestCase):
     def test(self):
         board_with_blocked_connections = parse_board(
@@ -158,6 +206,19 @@ class TestFindBlockedConnections(unittest.TestCase):
         for axis in all_axes():
             self.assertEqual(sorted(blocked_connections[axis]), sorted(actual[axis]))
 
+    def test_same_as_connection_is_blocked(self):
+        rng = random.Random(0)
+        for rows, columns in [(6, 7), (4, 4), (3, 5)]:
+            for _ in range(300):
+                board = Board([rng.choice([0, 1, 1, 2, 2]) for _ in range(rows * columns)], rows, columns)
+                for mark in [1, 2]:
+                    expected = {
+                        axis: [connection for connection in connections
+                               if connection_is_blocked(board, connection, axis, mark)]
+                        for axis, connections in find_connections(board, 3 - mark).items()
+                    }
+                    self.assertEqual(find_blocked_opponent_connections(board, mark), expected)
+
 
 class TestFindConnections(unittest.TestCase):
     def test(self):
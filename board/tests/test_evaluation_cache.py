@@ -0,0 +1,97 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from agent import simple_reward_agent, pattern_reward_agent
+from board.evaluation_cache import EvaluationCache
+from board.pattern_based_value_calculation import get_board_value as get_pattern_board_value
+from board.tests.helpers import parse_board
+from board.value_calculation import get_board_value
+from data_structures import Observation, Configuration
+
+
+def boards():
+    return [
+        parse_board([[0, 0, 0], [0, 0, 0], [1, 0, 0]]),
+        parse_board([[0, 0, 0], [0, 0, 0], [1, 2, 0]]),
+        parse_board([[0, 0, 0], [1, 0, 0], [1, 2, 0]]),
+    ]
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = EvaluationCache()
+        board = boards()[2]
+        self.assertEqual(cache.get_board_value(board, 1), get_board_value(board, 1))
+        self.assertEqual(cache.get_board_value(board, 1), get_board_value(board, 1))
+        self.assertEqual(cache.get_board_value(board, 2), get_board_value(board, 2))
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 2, 2))
+        self.assertAlmostEqual(stats.hit_rate, 1 / 3)
+
+    def test_least_recently_used_is_evicted(self):
+        calls = []
+        cache = EvaluationCache(max_size=2, evaluate=lambda board, mark: calls.append(board) or 0.0)
+        first, second, third = boards()
+        cache.get_board_value(first, 1)
+        cache.get_board_value(second, 1)
+        cache.get_board_value(first, 1)  # first is now the most recently used
+        cache.get_board_value(third, 1)  # evicts second
+        self.assertEqual(len(calls), 3)
+        cache.get_board_value(first, 1)
+        self.assertEqual(len(calls), 3)
+        cache.get_board_value(second, 1)
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(cache.stats().evictions, 2)
+        self.assertEqual(len(cache), 2)
+
+    def test_resize(self):
+        cache = EvaluationCache()
+        for board in boards():
+            cache.get_board_value(board, 1)
+        nbytes = cache.nbytes
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats().evictions, 2)
+        self.assertLess(cache.nbytes, nbytes)
+        cache.get_board_value(boards()[2], 1)
+        self.assertEqual(cache.stats().hits, 1)
+
+    def test_concurrent_use(self):
+        cache = EvaluationCache(max_size=2)
+        tasks = [(board, mark) for _ in range(50) for board in boards() for mark in [1, 2]]
+        with ThreadPoolExecutor(8) as executor:
+            values = list(executor.map(lambda task: cache.get_board_value(*task), tasks))
+        self.assertEqual(values, [get_board_value(*task) for task in tasks])
+        stats = cache.stats()
+        self.assertEqual(stats.hits + stats.misses, len(tasks))
+        self.assertLessEqual(stats.size, 2)
+
+    def test_agent_with_cache(self):
+        cache = EvaluationCache()
+        board = parse_board(
+            [
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 1, 0, 0, 0],
+                [0, 2, 0, 1, 0, 0, 2]
+            ]
+        )
+        observation = Observation(board.board, step=4, mark=1)
+        configuration = Configuration(rows=6, columns=7)
+        expected = simple_reward_agent(observation, configuration)
+        self.assertEqual(simple_reward_agent(observation, configuration, cache=cache), expected)
+        self.assertEqual(simple_reward_agent(observation, configuration, cache=cache), expected)
+        self.assertEqual(cache.stats().hits, cache.stats().misses)
+
+    def test_agent_rejects_a_cache_of_another_evaluator(self):
+        observation = Observation([0] * 42, step=0, mark=1)
+        configuration = Configuration(rows=6, columns=7)
+        with self.assertRaises(AssertionError):
+            pattern_reward_agent(observation, configuration, cache=EvaluationCache())
+        with self.assertRaises(AssertionError):
+            simple_reward_agent(observation, configuration, cache=EvaluationCache(evaluate=get_pattern_board_value))
+        cache = EvaluationCache(evaluate=get_pattern_board_value)
+        self.assertEqual(pattern_reward_agent(observation, configuration, cache=cache),
+                         pattern_reward_agent(observation, configuration))
@@ -0,0 +1,82 @@
+import unittest
+
+from board.bitboard import from_board, get_layout
+from board.move_generation import analyse_moves, columns_of, non_losing_columns
+from board.tests.helpers import parse_board, get_default_empty_board
+
+
+class TestMoveGeneration(unittest.TestCase):
+    def columns(self, cells: int) -> list[int]:
+        return columns_of(cells, get_layout(6, 7))
+
+    def test_empty_board(self):
+        self.assertEqual(non_losing_columns(get_default_empty_board(), 1), list(range(7)))
+
+    def test_winning_move(self):
+        board = parse_board(
+            [
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 2, 2, 2, 0, 0],
+                [0, 0, 1, 1, 1, 0, 0]
+            ]
+        )
+        options = analyse_moves(from_board(board), 1)
+        self.assertEqual(self.columns(options.winning), [1, 5])
+        self.assertEqual(self.columns(options.non_losing), [1, 5])
+
+    def test_forced_block(self):
+        board = parse_board(
+            [
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 2, 2, 2, 0, 1, 1]
+            ]
+        )
+        options = analyse_moves(from_board(board), 1)
+        self.assertEqual(self.columns(options.forced_blocks), [0, 4])
+        self.assertEqual(options.non_losing, 0)
+        self.assertEqual(non_losing_columns(board, 1), [0, 4])
+
+    def test_do_not_play_under_a_threat(self):
+        board = parse_board(
+            [
+                #  0  1  2  3  4  5  6
+                [0, 0, 0, 0, 0, 0, 0],  # 0
+                [0, 0, 0, 0, 0, 0, 0],  # 1
+                [0, 0, 0, 0, 0, 0, 0],  # 2
+                [0, 2, 2, 2, 0, 0, 0],  # 3
+                [0, 1, 1, 1, 0, 0, 0],  # 4
+                [0, 2, 1, 2, 1, 0, 0]   # 5
+            ]
+        )
+        # player 1 wins on 32, which player 2 has to block even though it unlocks
+        # player 1's threat on 25 above it
+        options = analyse_moves(from_board(board), 1)
+        self.assertEqual(self.columns(options.unlocking), [4])
+        self.assertEqual(self.columns(options.winning), [4])
+        self.assertEqual(non_losing_columns(board, 1), [4])
+        options = analyse_moves(from_board(board), 2)
+        self.assertEqual(self.columns(options.forced_blocks), [4])
+        self.assertEqual(non_losing_columns(board, 2), [4])
+
+    def test_unlocking_moves_are_removed(self):
+        board = parse_board(
+            [
+                #  0  1  2  3  4  5  6
+                [0, 0, 0, 0, 0, 0, 0],  # 0
+                [0, 0, 0, 0, 0, 0, 0],  # 1
+                [0, 0, 0, 0, 0, 0, 0],  # 2
+                [0, 0, 0, 0, 0, 0, 0],  # 3
+                [0, 2, 2, 2, 0, 0, 0],  # 4
+                [0, 1, 1, 2, 0, 1, 1]   # 5
+            ]
+        )
+        options = analyse_moves(from_board(board), 1)
+        self.assertEqual(self.columns(options.unlocking), [0, 4])
+        self.assertEqual(non_losing_columns(board, 1), [1, 2, 3, 5, 6])
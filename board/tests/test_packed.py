@@ -0,0 +1,123 @@
+import unittest
+
+from board.bitboard import from_board, to_board, has_four
+from board.packed import encode_cells, decode_cells, encode_bitboards, decode_bitboards, \
+    position_key, key_to_board, packed_size, boards_to_array, array_to_boards, pack_array, \
+    unpack_array, keys_from_array
+from board.tests.helpers import parse_board, get_default_empty_board
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def sample_boards():
+    return [
+        get_default_empty_board(),
+        parse_board(
+            [
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 2, 0, 0, 0],
+                [0, 0, 1, 1, 0, 0, 0],
+                [0, 2, 1, 2, 1, 0, 2]
+            ]
+        ),
+        parse_board(
+            [
+                [1, 2, 1, 2, 1, 2, 1],
+                [1, 2, 1, 2, 1, 2, 1],
+                [2, 1, 2, 1, 2, 1, 2],
+                [2, 1, 2, 1, 2, 1, 2],
+                [1, 2, 1, 2, 1, 2, 1],
+                [1, 2, 1, 2, 1, 2, 1]
+            ]
+        ),
+    ]
+
+
+class TestBitBoard(unittest.TestCase):
+    def test_round_trip(self):
+        for board in sample_boards():
+            self.assertEqual(board, to_board(from_board(board)))
+
+    def test_has_four(self):
+        board = parse_board(
+            [[0, 0, 0, 0],
+             [0, 0, 0, 1],
+             [0, 0, 1, 2],
+             [0, 1, 2, 2],
+             [1, 2, 2, 2]]
+        )
+        bitboard = from_board(board)
+        self.assertTrue(has_four(bitboard.player_1, board.rows))
+        self.assertFalse(has_four(bitboard.player_2, board.rows))
+
+    def test_no_four_across_columns(self):
+        # the pieces in the bottom and top row of neighboring columns are adjacent
+        # bits, the sentinel row keeps them from being counted as a connection
+        board = parse_board(
+            [[0, 1, 0, 0],
+             [0, 1, 0, 0],
+             [1, 2, 0, 0],
+             [1, 2, 0, 0]]
+        )
+        self.assertFalse(has_four(from_board(board).player_1, board.rows))
+
+
+class TestPackedCodec(unittest.TestCase):
+    def test_cells_round_trip(self):
+        for board in sample_boards():
+            data = encode_cells(board)
+            self.assertEqual(len(data), packed_size(6, 7))
+            self.assertEqual(board, decode_cells(data, board.rows, board.columns))
+
+    def test_bitboards_round_trip(self):
+        for board in sample_boards():
+            self.assertEqual(board, decode_bitboards(encode_bitboards(board), board.rows, board.columns))
+
+    def test_key_round_trip(self):
+        for board in sample_boards():
+            key = position_key(board)
+            self.assertLess(key, 2 ** 64)
+            self.assertEqual(board, key_to_board(key, board.rows, board.columns))
+
+    def test_keys_are_unique(self):
+        keys = {position_key(board) for board in sample_boards()}
+        self.assertEqual(len(keys), len(sample_boards()))
+
+    def test_key_of_large_board(self):
+        board = parse_board([[0] * 9] * 8)
+        board.board[-1] = 1
+        key = position_key(board)
+        self.assertLess(key, 2 ** 64)
+        self.assertEqual(key, position_key(parse_board([[0] * 9] * 7 + [[0] * 8 + [1]])))
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestPackedArrays(unittest.TestCase):
+    def test_array_round_trip(self):
+        array = boards_to_array(sample_boards())
+        self.assertEqual(array.shape, (3, 42))
+        self.assertEqual(sample_boards(), array_to_boards(array, 6, 7))
+
+    def test_pack_array_matches_encode_cells(self):
+        packed = pack_array(boards_to_array(sample_boards()))
+        for row, board in zip(packed, sample_boards()):
+            self.assertEqual(row.tobytes(), encode_cells(board))
+
+    def test_unpack_array(self):
+        array = boards_to_array(sample_boards())
+        self.assertTrue((unpack_array(pack_array(array), 6, 7) == array).all())
+
+    def test_keys_from_array(self):
+        keys = keys_from_array(boards_to_array(sample_boards()), 6, 7)
+        self.assertEqual(keys.tolist(), [position_key(board) for board in sample_boards()])
+
+    def test_keys_from_array_of_large_board(self):
+        board = parse_board([[0] * 9] * 8)
+        board.board[40] = 2
+        keys = keys_from_array(boards_to_array([board]), 8, 9)
+        self.assertEqual(keys.tolist(), [position_key(board)])
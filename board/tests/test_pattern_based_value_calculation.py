@@ -0,0 +1,100 @@
+import unittest
+
+from board.pattern_based_value_calculation import Pattern, get_pattern_for_connection, \
+    get_pattern_features, get_board_value, get_pattern_features_array, get_board_values_array, \
+    PATTERN_COUNT
+from board.tests.helpers import parse_board, get_default_empty_board
+from board.windows import get_windows
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def sample_board():
+    return parse_board(
+        [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 0],
+            [0, 0, 1, 1, 0, 0, 0],
+            [0, 2, 1, 2, 1, 0, 2]
+        ]
+    )
+
+
+class TestWindows(unittest.TestCase):
+    def test_number_of_windows(self):
+        self.assertEqual(len(get_windows(6, 7)), 69)
+        self.assertEqual(len(get_windows(4, 4)), 10)
+
+    def test_windows_are_unique(self):
+        windows = get_windows(6, 7)
+        self.assertEqual(len(set(frozenset(window) for window in windows)), len(windows))
+
+
+class TestPatterns(unittest.TestCase):
+    def test_get_pattern_for_connection(self):
+        self.assertIsNone(get_pattern_for_connection(0, 2))
+        self.assertEqual(get_pattern_for_connection(1, 0), Pattern.One)
+        self.assertEqual(get_pattern_for_connection(3, 0), Pattern.Three)
+        self.assertEqual(get_pattern_for_connection(2, 1), Pattern.TwoBlocked)
+        self.assertEqual(get_pattern_for_connection(3, 1), Pattern.ThreeBlocked)
+        self.assertEqual(get_pattern_for_connection(4, 0), Pattern.Four)
+
+    def test_features_of_small_board(self):
+        board = parse_board(
+            [[0, 0, 0, 0],
+             [0, 0, 0, 0],
+             [0, 0, 0, 0],
+             [1, 1, 1, 2]]
+        )
+        features = get_pattern_features(board, 1)
+        # bottom row, 3 columns, 1 diagonal
+        self.assertEqual(features[Pattern.ThreeBlocked], 1)
+        self.assertEqual(features[Pattern.One], 4)
+        self.assertEqual(features[PATTERN_COUNT + Pattern.OneBlocked], 1)
+        self.assertEqual(features[PATTERN_COUNT + Pattern.One], 2)
+        self.assertEqual(sum(features), 8)
+
+    def test_features_are_symmetric(self):
+        board = sample_board()
+        features_1 = get_pattern_features(board, 1)
+        features_2 = get_pattern_features(board, 2)
+        self.assertEqual(features_1, features_2[PATTERN_COUNT:] + features_2[:PATTERN_COUNT])
+
+    def test_empty_board_has_no_value(self):
+        self.assertEqual(get_board_value(get_default_empty_board(), 1), 0)
+
+    def test_winning_board_outweighs_threats(self):
+        board = parse_board(
+            [
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 2, 2, 2, 0, 0, 0],
+                [1, 1, 1, 1, 2, 0, 0]
+            ]
+        )
+        self.assertGreater(get_board_value(board, 1), 0)
+        self.assertLess(get_board_value(board, 2), 0)
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestPatternArrays(unittest.TestCase):
+    def test_array_features_match(self):
+        boards = [sample_board(), get_default_empty_board()]
+        array = numpy.array([board.board for board in boards], dtype=numpy.int8)
+        for mark in [1, 2]:
+            features = get_pattern_features_array(array, [mark, mark], 6, 7)
+            self.assertEqual(features.tolist(), [get_pattern_features(board, mark) for board in boards])
+
+    def test_array_values_match(self):
+        board = sample_board()
+        array = numpy.array([board.board, board.board], dtype=numpy.int8)
+        values = get_board_values_array(array, [1, 2], 6, 7)
+        self.assertAlmostEqual(values[0], get_board_value(board, 1))
+        self.assertAlmostEqual(values[1], get_board_value(board, 2))
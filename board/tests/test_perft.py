@@ -0,0 +1,41 @@
+import unittest
+
+from board.perft import ENGINES, play_moves, run_engines, disagreements
+from board.tests.helpers import parse_board
+
+
+class TestPerft(unittest.TestCase):
+    def test_empty_board(self):
+        board, mark = play_moves('', 6, 7)
+        for engine in ENGINES.values():
+            self.assertEqual(engine(board, mark, 4).positions, [7, 49, 343, 2401])
+
+    def test_engines_agree_on_wins(self):
+        for moves in ['3324', '3333332222', '0123456']:
+            board, mark = play_moves(moves, 6, 7)
+            runs = run_engines(board, mark, 4, sorted(ENGINES))
+            self.assertEqual(disagreements(runs), [], moves)
+        self.assertEqual(runs[0].counts.wins[2], 0)
+
+    def test_draw(self):
+        board = parse_board([[int(value) for value in row] for row in [
+            '1122110',
+            '2211221',
+            '1122112',
+            '2211221',
+            '1122112',
+            '2211221',
+        ]])
+        for engine in ENGINES.values():
+            counts = engine(board, 2, 2)
+            self.assertEqual((counts.positions, counts.wins, counts.draws), ([1, 0], [0, 0], [1, 0]))
+
+    def test_first_win(self):
+        board, mark = play_moves('010101', 4, 4)
+        for engine in ENGINES.values():
+            counts = engine(board, mark, 1)
+            self.assertEqual((counts.positions, counts.wins), ([4], [1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+from board.bitboard import from_board, get_layout
+from board.tests.helpers import parse_board, get_default_empty_board
+from board.threats import analyse_threats, winning_cells, threat_score, odd_rows_mask
+
+
+def cells_of(bits: int, rows: int, columns: int) -> list[int]:
+    """board indexes of the set bits"""
+    layout = get_layout(rows, columns)
+    return sorted(index for index, bit in enumerate(layout.cell_bits) if bits >> bit & 1)
+
+
+class TestThreats(unittest.TestCase):
+    def test_empty_board(self):
+        analysis = analyse_threats(from_board(get_default_empty_board()))
+        self.assertEqual(analysis.player_1.all, 0)
+        self.assertEqual(analysis.player_2.all, 0)
+        self.assertEqual(analysis.zugzwang_controller, 2)
+
+    def test_immediate_threats(self):
+        board = parse_board(
+            [
+                #  0  1  2  3  4  5  6
+                [0, 0, 0, 0, 0, 0, 0],  # 0   00, 01, 02, 03, 04, 05, 06,
+                [0, 0, 0, 0, 0, 0, 0],  # 1   07, 08, 09, 10, 11, 12, 13,
+                [0, 0, 0, 0, 0, 0, 0],  # 2   14, 15, 16, 17, 18, 19, 20,
+                [0, 0, 0, 0, 0, 0, 0],  # 3   21, 22, 23, 24, 25, 26, 27,
+                [0, 0, 2, 2, 0, 0, 0],  # 4   28, 29, 30, 31, 32, 33, 34,
+                [0, 0, 1, 1, 1, 0, 0]   # 5   35, 36, 37, 38, 39, 40, 41
+            ]
+        )
+        analysis = analyse_threats(from_board(board))
+        self.assertEqual(cells_of(analysis.player_1.all, 6, 7), [36, 40])
+        self.assertEqual(analysis.player_1.immediate, analysis.player_1.all)
+        self.assertEqual(analysis.player_2.all, 0)
+
+    def test_vertical_threat(self):
+        board = parse_board(
+            [[0, 0, 0, 0],
+             [1, 0, 0, 0],
+             [1, 2, 0, 0],
+             [1, 2, 0, 0]]
+        )
+        bitboard = from_board(board)
+        layout = get_layout(4, 4)
+        self.assertEqual(cells_of(winning_cells(bitboard.player_1, bitboard.occupied, layout), 4, 4), [0])
+        self.assertEqual(winning_cells(bitboard.player_2, bitboard.occupied, layout), 0)
+
+    def test_future_threat_and_parity(self):
+        board = parse_board(
+            [
+                #  0  1  2  3  4  5  6
+                [0, 0, 0, 0, 0, 0, 0],  # 0   00, 01, 02, 03, 04, 05, 06,
+                [0, 0, 0, 0, 0, 0, 0],  # 1   07, 08, 09, 10, 11, 12, 13,
+                [0, 0, 0, 0, 0, 0, 0],  # 2   14, 15, 16, 17, 18, 19, 20,
+                [0, 1, 1, 1, 0, 0, 0],  # 3   21, 22, 23, 24, 25, 26, 27,
+                [0, 2, 2, 1, 0, 0, 0],  # 4   28, 29, 30, 31, 32, 33, 34,
+                [0, 2, 2, 1, 2, 0, 0]   # 5   35, 36, 37, 38, 39, 40, 41
+            ]
+        )
+        analysis = analyse_threats(from_board(board))
+        # player 1 threatens on the third row from the bottom, which is odd
+        self.assertEqual(cells_of(analysis.player_1.all, 6, 7), [17, 21, 25])
+        self.assertEqual(analysis.player_1.immediate & analysis.player_1.future, 0)
+        self.assertEqual(cells_of(analysis.player_1.immediate, 6, 7), [17])
+        self.assertEqual(cells_of(analysis.player_1.odd, 6, 7), [21, 25])
+        self.assertEqual(cells_of(analysis.player_1.even, 6, 7), [17])
+        self.assertEqual(analysis.zugzwang_controller, 1)
+        self.assertGreater(threat_score(analysis, 1), 0)
+        self.assertEqual(threat_score(analysis, 1), -threat_score(analysis, 2))
+
+    def test_threat_above_opponent_threat_is_not_live(self):
+        board = parse_board(
+            [
+                #  0  1  2  3  4  5  6
+                [0, 0, 0, 0, 0, 0, 0],  # 0   00, 01, 02, 03, 04, 05, 06,
+                [0, 0, 0, 0, 0, 0, 0],  # 1   07, 08, 09, 10, 11, 12, 13,
+                [0, 0, 0, 0, 0, 0, 0],  # 2   14, 15, 16, 17, 18, 19, 20,
+                [0, 1, 1, 1, 0, 0, 0],  # 3   21, 22, 23, 24, 25, 26, 27,
+                [0, 2, 2, 2, 0, 0, 0],  # 4   28, 29, 30, 31, 32, 33, 34,
+                [0, 1, 2, 1, 1, 2, 0]   # 5   35, 36, 37, 38, 39, 40, 41
+            ]
+        )
+        analysis = analyse_threats(from_board(board))
+        self.assertEqual(cells_of(analysis.player_2.live, 6, 7), [28, 32])
+        # player 1's threats at 21 and 25 are above player 2's threats at 28 and 32
+        self.assertEqual(cells_of(analysis.player_1.all, 6, 7), [21, 25])
+        self.assertEqual(analysis.player_1.live, 0)
+        self.assertEqual(analysis.zugzwang_controller, 2)
+
+    def test_odd_rows_mask(self):
+        layout = get_layout(6, 7)
+        self.assertEqual(cells_of(odd_rows_mask(layout), 6, 7)[:7], list(range(7, 14)))
@@ -0,0 +1,55 @@
+import unittest
+from array import array
+
+from board.board_class import Board
+from board.tests.helpers import parse_board
+from board.views import view, writable_copy, played
+
+
+def board() -> Board:
+    return parse_board([
+        [0, 0, 0],
+        [0, 2, 0],
+        [1, 2, 1],
+    ])
+
+
+class TestViews(unittest.TestCase):
+    def test_view_shares_the_cells(self):
+        cells = array('b', board().board)
+        board_view = view(cells, 3, 3)
+        self.assertEqual(board_view.legal_columns(), [0, 1, 2])
+        self.assertEqual(board_view.landing_index(1), 1)
+        cells[1] = 1
+        self.assertEqual(board_view[1], 1)
+
+    def test_view_of_numpy_cells(self):
+        import numpy as np
+        cells = np.array(board().board, dtype=np.int8)
+        board_view = view(cells, 3, 3)
+        self.assertEqual(list(board_view.board), board().board)
+        self.assertEqual(board_view.freeze(), board().freeze())
+
+    def test_list_is_not_copied(self):
+        cells = board().board
+        self.assertIs(view(cells, 3, 3).board, cells)
+
+    def test_played_takes_the_move_back(self):
+        cells = board().board
+        copy = writable_copy(view(cells, 3, 3))
+        with played(copy, 1, 1) as index:
+            self.assertEqual(index, 1)
+            self.assertEqual(copy[1], 1)
+            self.assertEqual(copy.heights, [1, 3, 1])
+            self.assertEqual(cells[1], 0)
+        self.assertEqual(list(copy.board), cells)
+        self.assertEqual(copy.heights, [1, 2, 1])
+
+    def test_freeze(self):
+        frozen = board().freeze()
+        self.assertEqual(frozen, bytes([0, 0, 0, 0, 2, 0, 1, 2, 1]))
+        self.assertEqual(writable_copy(board()).freeze(), frozen)
+
+
+if __name__ == '__main__':
+    unittest.main()
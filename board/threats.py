@@ -0,0 +1,128 @@
+"""
+Threat analysis on bitboards.
+
+A threat is an empty cell that would complete four for a player. Immediate
+threats can be played right now, future threats need the cells below them to
+be filled first. Threats are classified by the parity of their row, counted
+from the bottom starting at 1: with an even number of rows and the second
+player answering every move in the same column (claimeven), the first player
+(mark 1) ends up with every odd cell and the second player (mark 2) with every
+even cell, so odd threats are good for the first player and even threats are
+good for the second.
+
+Everything is computed with a constant number of mask operations per axis, so
+the analysis is cheap enough to be used inside a search.
+"""
+from dataclasses import dataclass
+
+from board.bitboard import BitBoard, BitboardLayout, get_layout
+
+
+@dataclass
+class PlayerThreats:
+    all: int  # every threat, as a bitmask
+    immediate: int  # threats that are playable now
+    live: int  # threats without an opponent threat below them in the same column
+    odd: int  # live threats on odd rows
+    even: int  # live threats on even rows
+
+    @property
+    def future(self) -> int:
+        return self.all & ~self.immediate
+
+
+@dataclass
+class ThreatAnalysis:
+    player_1: PlayerThreats
+    player_2: PlayerThreats
+    zugzwang_controller: int  # mark of the player who controls the endgame
+
+    def of(self, mark: int) -> PlayerThreats:
+        return self.player_1 if mark == 1 else self.player_2
+
+
+def winning_cells(bits: int, occupied: int, layout: BitboardLayout) -> int:
+    """returns every empty cell that would complete four for the player with these bits"""
+    height = layout.height
+    # vertical: only three pieces below the cell can complete it
+    cells = (bits << 1) & (bits << 2) & (bits << 3)
+    for shift in (height, height - 1, height + 1):
+        pair = (bits << shift) & (bits << 2 * shift)
+        cells |= pair & (bits << 3 * shift)  # three on one side
+        cells |= pair & (bits >> shift)  # two on one side, one on the other
+        pair = (bits >> shift) & (bits >> 2 * shift)
+        cells |= pair & (bits << shift)
+        cells |= pair & (bits >> 3 * shift)
+    return cells & (layout.board_mask ^ occupied)
+
+
+def playable_cells(occupied: int, layout: BitboardLayout) -> int:
+    """returns the cell each non-full column would be played into"""
+    return (occupied + layout.bottom_mask) & layout.board_mask
+
+
+def odd_rows_mask(layout: BitboardLayout) -> int:
+    """every cell on an odd row, counting rows from the bottom starting at 1"""
+    column = sum(1 << row for row in range(0, layout.rows, 2))
+    return layout.bottom_mask * column
+
+
+def cells_above(cells: int, layout: BitboardLayout) -> int:
+    """every cell strictly above one of the given cells, in the same column"""
+    above = 0
+    for _ in range(layout.rows - 1):
+        cells = (cells << 1) & layout.board_mask
+        above |= cells
+    return above
+
+
+def analyse_threats(bitboard: BitBoard) -> ThreatAnalysis:
+    layout = get_layout(bitboard.rows, bitboard.columns)
+    occupied = bitboard.occupied
+    playable = playable_cells(occupied, layout)
+    odd_rows = odd_rows_mask(layout)
+
+    threats_1 = winning_cells(bitboard.player_1, occupied, layout)
+    threats_2 = winning_cells(bitboard.player_2, occupied, layout)
+    # a threat above an opponent threat in the same column can't be reached,
+    # because the opponent completes four first
+    live_1 = threats_1 & ~cells_above(threats_2, layout)
+    live_2 = threats_2 & ~cells_above(threats_1, layout)
+
+    player_1 = PlayerThreats(threats_1, threats_1 & playable, live_1, live_1 & odd_rows, live_1 & ~odd_rows)
+    player_2 = PlayerThreats(threats_2, threats_2 & playable, live_2, live_2 & odd_rows, live_2 & ~odd_rows)
+    return ThreatAnalysis(player_1, player_2, zugzwang_controller(player_1, player_2, layout))
+
+
+def zugzwang_controller(player_1: PlayerThreats, player_2: PlayerThreats, layout: BitboardLayout) -> int:
+    """
+    simplified zugzwang rules for boards with an even number of rows:
+
+    - the first player controls the endgame with a live odd threat, i.e. one
+      without a threat of the second player below it in the same column
+    - otherwise the second player controls it by answering every move in the same
+      column, which wins with a live even threat and draws otherwise
+    """
+    if layout.rows % 2:
+        # claimeven does not fill columns of odd height, the rules do not apply
+        return 0
+    return 1 if player_1.odd else 2
+
+
+def threat_score(analysis: ThreatAnalysis, mark: int) -> int:
+    """
+    evaluation term from the view of the player with that mark: live threats on
+    rows of the player's parity count double, controlling the endgame counts 4
+    """
+    def score(good_parity: int, bad_parity: int, controls: bool) -> int:
+        return 2 * good_parity.bit_count() + bad_parity.bit_count() + (4 if controls else 0)
+
+    own = analysis.of(mark)
+    opponent = analysis.of(3 - mark)
+    if mark == 1:
+        own_score = score(own.odd, own.even, analysis.zugzwang_controller == 1)
+        opponent_score = score(opponent.even, opponent.odd, analysis.zugzwang_controller == 2)
+    else:
+        own_score = score(own.even, own.odd, analysis.zugzwang_controller == 2)
+        opponent_score = score(opponent.odd, opponent.even, analysis.zugzwang_controller == 1)
+    return own_score - opponent_score
@@ -1,9 +1,10 @@
 from collections import deque
-from typing import TypeVar
+from typing import Optional, TypeVar
 
 from board.board_class import Board
 from board.navigation import Vertical, Horizontal, UpwardsDiagonal, DownwardsDiagonal, TAxis, \
     TDirection, all_axes
+from board.windows import get_lines
 
 value_table = {
     1: 2**0,
@@ -52,18 +53,42 @@ def value_from_grouped_connections(
 
 
 def find_blocked_opponent_connections(board: Board, mark: int) -> dict[TAxis, list[list[int]]]:
+    """
+    returns the connections of the opponent of the player specified with mark,
+    as `find_connections` finds them, that are blocked (see `connection_is_blocked`),
+    grouped by axis.
+
+    The connections are read off the precomputed lines of `board.windows.get_lines`,
+    whose run ends are a table lookup, instead of searching from every piece.
+    """
     opponent_mark = 2 if mark == 1 else 1
-    opponent_connections = find_connections(board, opponent_mark)
-    blocked_opponent_connections: dict[TAxis, list[list[int]]] = {
-        Vertical: [],
-        Horizontal: [],
-        UpwardsDiagonal: [],
-        DownwardsDiagonal: []
-    }
-    for axis, connections in opponent_connections.items():
-        for connection in connections:
-            if connection_is_blocked(board, connection, axis, mark):
-                blocked_opponent_connections[axis].append(connection)
+    cells = board.board
+    blocked_opponent_connections: dict[TAxis, list[list[int]]] = {}
+    for axis, lines in get_lines(board.rows, board.columns).items():
+        # (the index find_connections finds it from first, connection)
+        blocked = []
+        for line in lines:
+            line_cells = line.cells
+            start = 0
+            while start < len(line_cells):
+                if cells[line_cells[start]] != opponent_mark:
+                    start += 1
+                    continue
+                end = start
+                while end + 1 < len(line_cells) and cells[line_cells[end + 1]] == opponent_mark:
+                    end += 1
+                runs = [(start, end)]
+                # find_connections never walks onto index 0, which starts its lines,
+                # so from the other pieces it finds the run without it
+                if line_cells[start] == 0 and end > start:
+                    runs.append((start + 1, end))
+                for first, last in runs:
+                    if _ends_are_blocked(cells, line.before[first], line.after[last], mark):
+                        connection = list(line_cells[first:last + 1])
+                        blocked.append((min(connection), connection))
+                start = end + 1
+        blocked.sort(key=lambda found: found[0])
+        blocked_opponent_connections[axis] = [connection for _, connection in blocked]
 
     return blocked_opponent_connections
 
@@ -74,14 +99,18 @@ def connection_is_blocked(board: Board, connection: list[int], axis: TAxis, mark
     is blocked by at least one piece from the player specified with mark"""
     positive_neighbor_index = axis.positive_direction().get_neighbor_index(board, connection[-1])
     negative_neighbor_index = axis.negative_direction().get_neighbor_index(board, connection[0])
+    return _ends_are_blocked(board.board, negative_neighbor_index, positive_neighbor_index, mark)
+
 
+def _ends_are_blocked(cells, negative_neighbor_index: Optional[int], positive_neighbor_index: Optional[int],
+                      mark: int) -> bool:
     if positive_neighbor_index is None and negative_neighbor_index is None:
         return False
     if positive_neighbor_index is None:
-        return board.board[negative_neighbor_index] == mark
+        return cells[negative_neighbor_index] == mark
     if negative_neighbor_index is None:
-        return board.board[positive_neighbor_index] == mark
-    return board.board[positive_neighbor_index] == mark and board.board[negative_neighbor_index] == mark
+        return cells[positive_neighbor_index] == mark
+    return cells[positive_neighbor_index] == mark and cells[negative_neighbor_index] == mark
 
 
 def find_connections(board: Board, mark: int) -> dict[TAxis, list[list[int]]]:
@@ -0,0 +1,45 @@
+"""
+Boards over existing cell buffers, and moves played in place.
+
+`view` wraps the cells of an observation into a `Board` without copying them.
+Besides a list, the cells may be any buffer of signed bytes, e.g. an
+`array('b')` or a NumPy int8 array. A view shares its cells with the
+observation, so it's read-only by convention: an agent that plays moves takes
+one `writable_copy` and plays every child position on it with `played`, which
+takes the move back afterwards, instead of copying the board per child.
+Use `Board.freeze` for a cache key that doesn't share the cells.
+"""
+from array import array
+from contextlib import contextmanager
+from typing import Iterator
+
+from board.board_class import Board
+from board.interaction import add_piece, remove_piece
+
+
+def view(cells, rows: int, columns: int) -> Board:
+    """a `Board` over the cells, which are not copied"""
+    if not isinstance(cells, list):
+        cells = memoryview(cells)
+        assert cells.itemsize == 1, 'cells must be a buffer of bytes'
+        cells = cells.cast('b')
+    assert len(cells) == rows * columns, f'expected {rows * columns} cells, got {len(cells)}'
+    return Board(cells, rows, columns)
+
+
+def writable_copy(board: Board) -> Board:
+    """a copy of the board in an `array('b')`, with its heights tracked"""
+    return Board.with_heights(array('b', board.board), board.rows, board.columns)
+
+
+@contextmanager
+def played(board: Board, mark: int, column: int) -> Iterator[int]:
+    """
+    plays the move for the duration of the block, which gets the board index of
+    the piece added; mutates the board
+    """
+    index = add_piece(board, mark, column)
+    try:
+        yield index
+    finally:
+        remove_piece(board, column)
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from board.bitboard import get_layout
+from board.board_class import Board
+from board.navigation import all_axes, TAxis
+
+WINDOW_LENGTH = 4
+
+
+@lru_cache(maxsize=None)
+def get_windows(rows: int, columns: int) -> tuple[tuple[int, ...], ...]:
+    """
+    returns every window of 4 consecutive board indexes on any axis, in the order
+    of the axis' positive direction. The regular 6 x 7 board has 69 windows.
+    """
+    board = Board([0] * (rows * columns), rows, columns)
+    windows = []
+    for axis in all_axes():
+        for index in range(rows * columns):
+            window = _window_from_index(board, index, axis)
+            if window is not None:
+                windows.append(window)
+    return tuple(windows)
+
+
+@lru_cache(maxsize=None)
+def get_window_masks(rows: int, columns: int) -> tuple[int, ...]:
+    """the windows of `get_windows` as bitboard masks"""
+    cell_bits = get_layout(rows, columns).cell_bits
+    return tuple(
+        sum(1 << cell_bits[index] for index in window) for window in get_windows(rows, columns)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_cell_windows(rows: int, columns: int) -> tuple[tuple[tuple[int, ...], ...], ...]:
+    """returns, for every board index, the windows containing it, in the order of `get_windows`"""
+    cell_windows = [[] for _ in range(rows * columns)]
+    for window in get_windows(rows, columns):
+        for index in window:
+            cell_windows[index].append(window)
+    return tuple(tuple(windows) for windows in cell_windows)
+
+
+@lru_cache(maxsize=None)
+def get_cell_neighbourhoods(rows: int, columns: int) -> tuple[frozenset[int], ...]:
+    """returns, for every board index, every index sharing a window with it (itself included)"""
+    return tuple(
+        frozenset(index for window in windows for index in window) | {cell}
+        for cell, windows in enumerate(get_cell_windows(rows, columns))
+    )
+
+
+@dataclass(frozen=True)
+class Line:
+    """
+    the board indexes of a whole line on one axis, in the order of the axis'
+    positive direction, and the ends of every run on it: the run from position
+    `a` to `b` is bounded by `before[a]` and `after[b]`, None at the edge of
+    the board
+    """
+    cells: tuple[int, ...]
+    before: tuple[Optional[int], ...]
+    after: tuple[Optional[int], ...]
+
+
+@lru_cache(maxsize=None)
+def get_lines(rows: int, columns: int) -> dict[TAxis, tuple[Line, ...]]:
+    """returns every line of the board by axis, the regular 6 x 7 board has 7 + 6 + 12 + 12 lines"""
+    board = Board([0] * (rows * columns), rows, columns)
+    lines = {}
+    for axis in all_axes():
+        axis_lines = []
+        for start in range(rows * columns):
+            if axis.negative_direction().get_neighbor_index(board, start) is not None:
+                continue
+            cells = [start]
+            next_index = axis.positive_direction().get_neighbor_index(board, start)
+            while next_index is not None:
+                cells.append(next_index)
+                next_index = axis.positive_direction().get_neighbor_index(board, next_index)
+            axis_lines.append(Line(tuple(cells), (None, *cells[:-1]), (*cells[1:], None)))
+        lines[axis] = tuple(axis_lines)
+    return lines
+
+
+def _window_from_index(board: Board, index: int, axis: TAxis):
+    direction = axis.positive_direction()
+    window = [index]
+    for _ in range(WINDOW_LENGTH - 1):
+        next_index = direction.get_neighbor_index(board, window[-1])
+        if next_index is None:
+            return None
+        window.append(next_index)
+    return tuple(window)
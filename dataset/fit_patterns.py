@@ -0,0 +1,108 @@
+"""
+Fits the weights of the window-pattern evaluator
+(`board.pattern_based_value_calculation`) on self-play shards.
+
+Every stored position is evaluated from the view of the player who made the
+previous move, which is how agents evaluate the board after their own move, and
+the target is the final result of the game for that player.
+
+    python -m dataset.fit_patterns --data data/self_play --method logistic --output weights.json
+"""
+import argparse
+
+import numpy as np
+
+from board.pattern_based_value_calculation import get_pattern_features_array, FEATURE_COUNT, \
+    save_weights, Pattern, PATTERN_COUNT
+from dataset.shards import list_shards, iter_batches, shard_shape
+
+
+def batch_features_and_targets(batch, rows: int, columns: int) -> tuple[np.ndarray, np.ndarray]:
+    previous_marks = 3 - batch.marks.astype(np.int8)
+    features = get_pattern_features_array(batch.boards, previous_marks, rows, columns)
+    targets = -batch.results.astype(np.float64)
+    return features.astype(np.float64), targets
+
+
+def with_win_weights(weights: np.ndarray) -> np.ndarray:
+    """
+    games end as soon as four are connected, so the stored positions never contain
+    the `Four` pattern and its weights can't be fitted; a win must outweigh everything
+    """
+    weights = weights.copy()
+    win_weight = 1000 * np.abs(weights).max()
+    weights[Pattern.Four] = win_weight
+    weights[PATTERN_COUNT + Pattern.Four] = -win_weight
+    return weights
+
+
+def fit_least_squares(paths: list[str], ridge: float = 1e-3, batch_size: int = 1 << 14) -> np.ndarray:
+    """solves the normal equations, accumulated one batch at a time"""
+    rows, columns = shard_shape(paths[0])
+    gram = np.zeros((FEATURE_COUNT, FEATURE_COUNT))
+    moments = np.zeros(FEATURE_COUNT)
+    for batch in iter_batches(paths, batch_size):
+        features, targets = batch_features_and_targets(batch, rows, columns)
+        gram += features.T @ features
+        moments += features.T @ targets
+    return np.linalg.solve(gram + ridge * np.eye(FEATURE_COUNT), moments)
+
+
+def fit_logistic(
+        paths: list[str],
+        epochs: int = 50,
+        learning_rate: float = 0.05,
+        ridge: float = 1e-4,
+        batch_size: int = 1 << 14
+) -> np.ndarray:
+    """
+    fits P(win) with draws counting as half a win, using mini-batch gradient
+    descent on the standardised features
+    """
+    rows, columns = shard_shape(paths[0])
+    count = 0
+    total = np.zeros(FEATURE_COUNT)
+    total_squares = np.zeros(FEATURE_COUNT)
+    for batch in iter_batches(paths, batch_size):
+        features, _ = batch_features_and_targets(batch, rows, columns)
+        count += len(features)
+        total += features.sum(axis=0)
+        total_squares += (features ** 2).sum(axis=0)
+    mean = total / count
+    scale = np.sqrt(np.maximum(total_squares / count - mean ** 2, 0)) + 1e-9
+
+    weights = np.zeros(FEATURE_COUNT)
+    bias = 0.0
+    for _ in range(epochs):
+        for batch in iter_batches(paths, batch_size):
+            features, targets = batch_features_and_targets(batch, rows, columns)
+            standardised = (features - mean) / scale
+            probabilities = 1 / (1 + np.exp(-(standardised @ weights + bias)))
+            error = probabilities - (targets + 1) / 2
+            weights -= learning_rate * (standardised.T @ error / len(error) + ridge * weights)
+            bias -= learning_rate * error.mean()
+    # fold the standardisation into the weights; the bias does not change the ranking of moves
+    return weights / scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', required=True, help='directory with self-play shards')
+    parser.add_argument('--method', choices=['least_squares', 'logistic'], default='logistic')
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    paths = list_shards(args.data)
+    assert paths, f'no shards in {args.data}'
+    if args.method == 'least_squares':
+        weights = fit_least_squares(paths)
+    else:
+        weights = fit_logistic(paths, epochs=args.epochs)
+    weights = with_win_weights(weights)
+    save_weights(weights.tolist(), args.output)
+    print(f'fitted {FEATURE_COUNT} weights with {args.method}: {np.round(weights, 4).tolist()}')
+
+
+if __name__ == '__main__':
+    main()
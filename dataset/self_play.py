@@ -0,0 +1,155 @@
+"""
+Generates self-play data by running the project's agents against each other in
+worker processes and streaming every position into shards (see `dataset.shards`).
+
+    python -m dataset.self_play --agents simple_reward priority --games 10000 \
+        --workers 8 --opening-moves 4 --output data/self_play
+
+With --shared-table, the search agents of all workers share one transposition
+table of that many entries (see `search.shared_table`).
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import math
+import random
+import time
+from multiprocessing import Pool
+from typing import Optional
+
+import numpy as np
+
+from arena.agents import get_agent, AGENTS
+from arena.game import play_game, GameRecord
+from board.board_class import Board
+from board.interaction import add_piece
+from board.packed import encode_cells, position_key
+from board.value_calculation import get_board_value
+from data_structures import Configuration
+from dataset.shards import ShardWriter, record_dtype
+from search.negamax import get_searcher
+from search.shared_table import SharedTranspositionTable
+
+
+def board_value_score(board: Board, mark: int, column: int) -> float:
+    """the evaluation of the position after the move, from the view of the mover"""
+    next_board = Board(list(board.board), board.rows, board.columns)
+    add_piece(next_board, mark, column)
+    return get_board_value(next_board, mark)
+
+
+SCORERS = {
+    'board_value': board_value_score,
+    'none': lambda board, mark, column: math.nan,
+}
+
+
+def game_to_records(game: GameRecord, configuration: Configuration, scorer) -> np.ndarray:
+    records = np.zeros(len(game.turns), dtype=record_dtype(configuration.rows, configuration.columns))
+    for i, turn in enumerate(game.turns):
+        board = Board(turn.board, configuration.rows, configuration.columns)
+        legal = 0 <= turn.column < board.columns and board.board[turn.column] == 0
+        records[i]['cells'] = np.frombuffer(encode_cells(board), dtype=np.uint8)
+        records[i]['key'] = position_key(board)
+        records[i]['mark'] = turn.mark
+        records[i]['move'] = turn.column
+        records[i]['score'] = scorer(board, turn.mark, turn.column) if legal else math.nan
+        records[i]['result'] = game.result_for(turn.mark)
+        records[i]['step'] = i
+    return records
+
+
+# the shared table of a worker process, attached by `_init_worker`
+_table: Optional[SharedTranspositionTable] = None
+
+
+def _init_worker(rows: int, columns: int, table: Optional[tuple[int, str]]):
+    """`table` is the (capacity, name) of a shared table for the search agents"""
+    global _table
+    if table is not None:
+        _table = SharedTranspositionTable(*table)
+        get_searcher(rows, columns).table = _table
+
+
+def _play_one(task: tuple) -> tuple[np.ndarray, int, Optional[tuple[int, int, int]]]:
+    """returns the records, the winner and the counters of the shared table for one game"""
+    agent_names, rows, columns, opening_moves, scorer_name, seed = task
+    random.seed(seed)
+    configuration = Configuration(columns=columns, rows=rows)
+    agents = [get_agent(name) for name in agent_names]
+    counters = None if _table is None else _table.counters()
+    # some agents print their reasoning, which would flood the terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = play_game(agents, configuration, opening_moves, random.Random(seed))
+    if counters is not None:
+        counters = _table.counters_since(counters)
+    return game_to_records(game, configuration, SCORERS[scorer_name]), game.winner, counters
+
+
+def generate(
+        agent_names: list[str],
+        games: int,
+        output: str,
+        rows: int = 6,
+        columns: int = 7,
+        workers: int = 1,
+        opening_moves: int = 0,
+        shard_size: int = 1 << 16,
+        scorer_name: str = 'board_value',
+        seed: int = 0,
+        table: Optional[SharedTranspositionTable] = None
+) -> ShardWriter:
+    """
+    plays `games` games, cycling through every ordered pairing of the given agents,
+    and writes all positions to shards in `output`. The counters of the workers
+    are added to the shared `table`, if there is one.
+    """
+    pairings = list(itertools.product(agent_names, repeat=2))
+    tasks = [
+        (pairings[game % len(pairings)], rows, columns, opening_moves, scorer_name, seed + game)
+        for game in range(games)
+    ]
+    initargs = (rows, columns, None if table is None else (table.capacity, table.name))
+    with ShardWriter(output, rows, columns, shard_size) as writer, Pool(workers, _init_worker, initargs) as pool:
+        for records, _, counters in pool.imap_unordered(_play_one, tasks, chunksize=4):
+            writer.write(records)
+            if counters is not None:
+                table.add_counters(counters)
+    return writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', nargs='+', default=['simple_reward', 'priority'], choices=sorted(AGENTS))
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--opening-moves', type=int, default=4,
+                        help='number of random moves at the start of every game')
+    parser.add_argument('--shard-size', type=int, default=1 << 16, help='records per shard')
+    parser.add_argument('--score', choices=sorted(SCORERS), default='board_value')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shared-table', type=int, metavar='ENTRIES',
+                        help='share a transposition table of that many entries between the search agents')
+    args = parser.parse_args()
+
+    table = None if args.shared_table is None else SharedTranspositionTable(args.shared_table)
+    try:
+        start = time.perf_counter()
+        writer = generate(args.agents, args.games, args.output, args.rows, args.columns, args.workers,
+                          args.opening_moves, args.shard_size, args.score, args.seed, table)
+        elapsed = time.perf_counter() - start
+        print(f'{args.games} games, {writer.written} positions written, '
+              f'{writer.duplicates} duplicates skipped in {elapsed:.1f}s')
+        if table is not None:
+            print(f'shared table: {table.stats()}')
+    finally:
+        if table is not None:
+            table.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Fixed-size binary shards of self-play positions.
+
+A shard starts with a 16 byte header (magic, rows, columns, record count),
+followed by `count` records of `record_dtype(rows, columns)`. Boards are stored
+with the 2-bit encoding of `board.packed`, so a 6 x 7 record takes 28 bytes:
+11 bytes of cells and 17 bytes of the other fields.
+"""
+import os
+import struct
+from dataclasses import dataclass
+from typing import Iterator, Iterable
+
+import numpy as np
+
+from board.packed import packed_size, unpack_array
+
+MAGIC = b'CXSHARD1'
+HEADER = struct.Struct('<8sBBHI')
+HEADER_SIZE = HEADER.size
+
+
+def record_dtype(rows: int, columns: int) -> np.dtype:
+    return np.dtype([
+        ('cells', np.uint8, (packed_size(rows, columns),)),
+        ('key', '<u8'),
+        ('mark', 'u1'),
+        ('move', 'i1'),
+        ('score', '<f4'),
+        ('result', 'i1'),  # 1 win, 0 draw, -1 loss, from the view of `mark`
+        ('step', '<u2'),
+    ])
+
+
+def shard_path(directory: str, number: int) -> str:
+    return os.path.join(directory, f'shard-{number:05d}.bin')
+
+
+class ShardWriter:
+    """
+    appends records to shards of at most `shard_size` records each and starts a
+    new shard when the current one is full. Positions whose key was already
+    written are skipped.
+    """
+
+    def __init__(self, directory: str, rows: int, columns: int, shard_size: int = 1 << 16):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rows = rows
+        self.columns = columns
+        self.shard_size = shard_size
+        self.dtype = record_dtype(rows, columns)
+        self.seen_keys: set[int] = set()
+        self.written = 0
+        self.duplicates = 0
+        self._shard_number = 0
+        self._file = None
+        self._count = 0
+
+    def write(self, records: np.ndarray):
+        for record in records:
+            key = int(record['key'])
+            if key in self.seen_keys:
+                self.duplicates += 1
+                continue
+            self.seen_keys.add(key)
+            if self._file is None or self._count == self.shard_size:
+                self._open_next_shard()
+            self._file.write(record.tobytes())
+            self._count += 1
+            self.written += 1
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self.rows, self.columns, 0, self._count))
+        self._file.close()
+        self._file = None
+
+    def _open_next_shard(self):
+        if self._file is not None:
+            self.close()
+            self._shard_number += 1
+        self._file = open(shard_path(self.directory, self._shard_number), 'wb')
+        self._file.write(HEADER.pack(MAGIC, self.rows, self.columns, 0, 0))
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_shard(path: str) -> np.memmap:
+    """memory-maps the records of a shard without reading them"""
+    with open(path, 'rb') as file:
+        magic, rows, columns, _, count = HEADER.unpack(file.read(HEADER_SIZE))
+    assert magic == MAGIC, f'{path} is not a shard'
+    return np.memmap(path, dtype=record_dtype(rows, columns), mode='r', offset=HEADER_SIZE,
+                     shape=(count,))
+
+
+def list_shards(directory: str) -> list[str]:
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith('shard-') and name.endswith('.bin')
+    )
+
+
+@dataclass
+class Batch:
+    boards: np.ndarray  # int8, (n, rows * columns)
+    keys: np.ndarray
+    marks: np.ndarray
+    moves: np.ndarray
+    scores: np.ndarray
+    results: np.ndarray
+    steps: np.ndarray
+
+
+def iter_batches(paths: Iterable[str], batch_size: int = 4096) -> Iterator[Batch]:
+    """yields batches of at most `batch_size` positions, one shard at a time"""
+    for path in paths:
+        records = open_shard(path)
+        if len(records) == 0:
+            continue
+        rows, columns = shard_shape(path)
+        for start in range(0, len(records), batch_size):
+            chunk = records[start:start + batch_size]
+            yield Batch(
+                boards=unpack_array(chunk['cells'], rows, columns),
+                keys=np.asarray(chunk['key']),
+                marks=np.asarray(chunk['mark']),
+                moves=np.asarray(chunk['move']),
+                scores=np.asarray(chunk['score']),
+                results=np.asarray(chunk['result']),
+                steps=np.asarray(chunk['step']),
+            )
+
+
+def shard_shape(path: str) -> tuple[int, int]:
+    with open(path, 'rb') as file:
+        _, rows, columns, _, _ = HEADER.unpack(file.read(HEADER_SIZE))
+    return rows, columns
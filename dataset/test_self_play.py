@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from board.packed import position_key, array_to_boards
+from board.pattern_based_value_calculation import FEATURE_COUNT, Pattern
+from dataset.fit_patterns import fit_least_squares, fit_logistic, with_win_weights
+from dataset.self_play import generate
+from dataset.shards import ShardWriter, record_dtype, list_shards, iter_batches, open_shard
+from search.shared_table import SharedTranspositionTable
+
+
+class TestShards(unittest.TestCase):
+    def records(self, keys: list[int]) -> np.ndarray:
+        records = np.zeros(len(keys), dtype=record_dtype(6, 7))
+        records['key'] = keys
+        records['move'] = 3
+        records['cells'][:, 0] = 0b01  # a piece of player 1 in the top left corner
+        return records
+
+    def test_write_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with ShardWriter(directory, 6, 7, shard_size=4) as writer:
+                writer.write(self.records([1, 2, 3, 4, 5]))
+                writer.write(self.records([5, 6]))
+            self.assertEqual(writer.written, 6)
+            self.assertEqual(writer.duplicates, 1)
+
+            paths = list_shards(directory)
+            self.assertEqual([len(open_shard(path)) for path in paths], [4, 2])
+
+            batches = list(iter_batches(paths, batch_size=3))
+            self.assertEqual([len(batch.keys) for batch in batches], [3, 1, 2])
+            self.assertEqual(np.concatenate([batch.keys for batch in batches]).tolist(), [1, 2, 3, 4, 5, 6])
+            self.assertEqual(batches[0].boards.shape, (3, 42))
+            self.assertEqual(batches[0].boards[0, 0], 1)
+
+
+class TestSelfPlay(unittest.TestCase):
+    def test_generate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = generate(['random'], games=4, output=directory, opening_moves=2, scorer_name='none')
+            batches = list(iter_batches(list_shards(directory)))
+            positions = sum(len(batch.keys) for batch in batches)
+            self.assertEqual(positions, writer.written)
+            self.assertGreater(positions, 4)
+
+            batch = batches[0]
+            boards = array_to_boards(batch.boards, 6, 7)
+            self.assertEqual(batch.keys.tolist(), [position_key(board) for board in boards])
+            self.assertEqual(len(set(batch.keys.tolist())), len(batch.keys))
+            self.assertTrue(set(batch.results.tolist()) <= {-1, 0, 1})
+
+    def test_generate_with_shared_table(self):
+        with tempfile.TemporaryDirectory() as directory, SharedTranspositionTable(1 << 12) as table:
+            generate(['search', 'random'], games=2, output=directory, workers=2, opening_moves=2,
+                     scorer_name='none', table=table)
+            stats = table.stats()
+        self.assertGreater(stats.stores, 0)
+        self.assertGreater(stats.hits + stats.misses, stats.stores)
+
+
+class TestFitPatterns(unittest.TestCase):
+    def test_fit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            generate(['random'], games=8, output=directory, scorer_name='none')
+            paths = list_shards(directory)
+            for weights in [fit_least_squares(paths), fit_logistic(paths, epochs=2)]:
+                self.assertEqual(weights.shape, (FEATURE_COUNT,))
+                self.assertTrue(np.isfinite(weights).all())
+
+    def test_with_win_weights(self):
+        weights = with_win_weights(np.linspace(-1, 1, FEATURE_COUNT))
+        self.assertEqual(weights[Pattern.Four], 1000)
+        self.assertEqual(weights[-1], -1000)
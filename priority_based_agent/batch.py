@@ -0,0 +1,86 @@
+"""
+`priority_based_agent` for many observations in one call.
+
+Every (observation, candidate column) pair becomes a row of one array, and
+the 4-tuples of all windows through the landing cells are classified at once:
+a 4-tuple is encoded in base 3 and looked up in a table of the priorities of
+all 81 tuples, which is built once from `get_priority_from_4_tuple`. The chosen
+columns are the same as those of `priority_based_agent`.
+"""
+import itertools
+from functools import lru_cache
+
+from board.board_class import Board
+from board.move_generation import non_losing_columns
+from board.windows import get_cell_windows, WINDOW_LENGTH
+from data_structures import Observation, Configuration
+from priority_based_agent.four_tuple import FourTuple
+from priority_based_agent.priority import Priority, get_priority_from_4_tuple
+
+# base 3 place value of each cell of a window
+_PLACES = [3 ** (WINDOW_LENGTH - 1 - i) for i in range(WINDOW_LENGTH)]
+
+
+@lru_cache(maxsize=None)
+def get_priority_table():
+    """returns an array of shape (3, 81): the priority of every encoded 4-tuple, for marks 1 and 2 (row 0 is unused)"""
+    import numpy as np
+    table = np.full((3, 3 ** WINDOW_LENGTH), Priority.none, dtype=np.int8)
+    for values in itertools.product(range(3), repeat=WINDOW_LENGTH):
+        code = sum(value * place for value, place in zip(values, _PLACES))
+        for mark in [1, 2]:
+            table[mark, code] = get_priority_from_4_tuple(FourTuple(*values), mark)
+    return table
+
+
+@lru_cache(maxsize=None)
+def get_padded_cell_windows(rows: int, columns: int):
+    """
+    returns the windows through every cell as an array of shape (cells, max windows, 4);
+    missing windows point at index `cells`, an extra cell that is always empty
+    """
+    import numpy as np
+    cell_windows = get_cell_windows(rows, columns)
+    cells = rows * columns
+    padded = np.full((cells, max(len(windows) for windows in cell_windows), WINDOW_LENGTH), cells, dtype=np.intp)
+    for cell, windows in enumerate(cell_windows):
+        padded[cell, :len(windows)] = windows
+    return padded
+
+
+def priority_based_agent_batch(observations: list[Observation], configuration: Configuration) -> list[int]:
+    import numpy as np
+    rows, columns = configuration.rows, configuration.columns
+    cells = rows * columns
+
+    candidates = []  # (observation index, column, landing index, mark)
+    fallbacks = []
+    for i, observation in enumerate(observations):
+        board = Board(observation.board, rows, columns)
+        allowed = non_losing_columns(board, observation.mark)
+        fallbacks.append(allowed[0])
+        candidates.extend((i, column, board.landing_index(column), observation.mark) for column in allowed)
+    if not candidates:
+        return fallbacks
+
+    owners, chosen_columns, landings, marks = (np.array(values, dtype=np.intp) for values in zip(*candidates))
+    boards = np.zeros((len(observations), cells + 1), dtype=np.int8)
+    boards[:, :cells] = [observation.board for observation in observations]
+    children = boards[owners]
+    children[np.arange(len(candidates)), landings] = marks
+
+    windows = get_padded_cell_windows(rows, columns)[landings]  # (pairs, max windows, 4)
+    tuples = children[np.arange(len(candidates))[:, None, None], windows]
+    codes = tuples.astype(np.intp) @ np.array(_PLACES, dtype=np.intp)
+    priorities = get_priority_table()[marks[:, None], codes]
+    # padding windows are all empty, which is a null-priority
+    best = priorities.min(axis=1)
+
+    results = list(fallbacks)
+    best_priorities = [Priority.none] * len(observations)
+    for owner, column, priority in zip(owners.tolist(), chosen_columns.tolist(), best.tolist()):
+        # like the agent, the first column with the best priority wins
+        if priority < best_priorities[owner]:
+            best_priorities[owner] = priority
+            results[owner] = column
+    return results
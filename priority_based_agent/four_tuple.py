@@ -1,46 +1,36 @@
-from dataclasses import dataclass
+from operator import itemgetter
 
 
-@dataclass
-class FourTuple:
-    zero: int
-    one: int
-    two: int
-    three: int
+class FourTuple(tuple):
+    """
+    immutable 4-tuple of board values or board indexes (-1 for a position
+    outside the board). Being a plain tuple underneath, it is cheap to create,
+    index and hash.
+    """
+    __slots__ = ()
 
-    def __getitem__(self, index: int):
-        if index == 0: return self.zero
-        elif index == 1: return self.one
-        elif index == 2: return self.two
-        elif index == 3: return self.three
-        else: raise KeyError('key must be between 0 and 3')
+    def __new__(cls, zero: int, one: int, two: int, three: int):
+        return tuple.__new__(cls, (zero, one, two, three))
 
-    def __setitem__(self, index: int, value: int):
-        if index == 0: self.zero = value
-        elif index == 1: self.one = value
-        elif index == 2: self.two = value
-        elif index == 3: self.three = value
-        else: raise KeyError('key must be between 0 and 3')
-
-    def __hash__(self):
-        return hash(self.zero) ^ hash(self.one) ^ hash(self.two) ^ hash(self.three)
+    zero = property(itemgetter(0))
+    one = property(itemgetter(1))
+    two = property(itemgetter(2))
+    three = property(itemgetter(3))
 
     def __str__(self):
-        return f'4-tuple({self.zero}, {self.one}, {self.two}, {self.three})'
+        return f'4-tuple({self[0]}, {self[1]}, {self[2]}, {self[3]})'
 
-    def __contains__(self, item: int):
-        return item in [self.zero, self.one, self.two, self.three]
+    def __repr__(self):
+        return f'FourTuple({self[0]}, {self[1]}, {self[2]}, {self[3]})'
 
 
-def invert_4_tuple(t: FourTuple) -> FourTuple:
-    def invert_number(n: int):
-        if n == 0: return 0
-        if n == 1: return 2
-        if n == 2: return 1
+_inverted_number = {0: 0, 1: 2, 2: 1}
 
+
+def invert_4_tuple(t: FourTuple) -> FourTuple:
     return FourTuple(
-        invert_number(t.zero),
-        invert_number(t.one),
-        invert_number(t.two),
-        invert_number(t.three)
+        _inverted_number.get(t[0]),
+        _inverted_number.get(t[1]),
+        _inverted_number.get(t[2]),
+        _inverted_number.get(t[3])
     )
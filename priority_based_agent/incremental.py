@@ -0,0 +1,87 @@
+from typing import Optional
+
+from board.board_class import Board
+from board.move_generation import non_losing_columns
+from board.windows import get_cell_neighbourhoods
+from data_structures import Observation, Configuration
+from priority_based_agent.priority import Priority, PriorityResult
+from priority_based_agent.priority_based_agent import get_best_4_tuple_at
+
+
+class IncrementalPriorityAgent:
+    """
+    plays the same moves as `priority_based_agent`, but keeps the best
+    PriorityResult of every candidate column between turns.
+
+    A column's result only depends on the cells of the windows through the cell a
+    piece would land on. Before every move, the board is compared with the board
+    of the previous call, and only the columns whose windows contain a changed
+    cell are scored again; usually that's our last piece and the opponent's reply.
+    """
+
+    def __init__(self):
+        self._board: Optional[list[int]] = None
+        self._shape: Optional[tuple[int, int]] = None
+        self._mark: Optional[int] = None
+        self._results: dict[int, tuple[int, PriorityResult]] = {}  # column -> (landing index, result)
+        self.computed = 0
+        self.reused = 0
+
+    def __call__(self, observation: Observation, configuration: Configuration) -> int:
+        board = Board(list(observation.board), configuration.rows, configuration.columns)
+        our_mark = observation.mark
+        self._invalidate(board, our_mark)
+
+        current_best_priority = Priority.none
+        current_best_col = -1
+        columns = non_losing_columns(board, our_mark)
+        for column in columns:
+            result = self._get_result(board, our_mark, column)
+            if result.priority == Priority.none:
+                continue
+            if result.priority == Priority.connect_4:
+                return column
+            if result.priority < current_best_priority:
+                current_best_priority = result.priority
+                current_best_col = column
+        # every column has a null-priority, play any column that doesn't lose
+        return current_best_col if current_best_col != -1 else columns[0]
+
+    def reset(self):
+        self._board = None
+        self._results = {}
+
+    def _invalidate(self, board: Board, mark: int):
+        shape = (board.rows, board.columns)
+        if self._board is None or shape != self._shape or mark != self._mark \
+                or len(self._board) != len(board.board):
+            self._results = {}
+        else:
+            changed = [
+                index for index, (before, after) in enumerate(zip(self._board, board.board))
+                if before != after
+            ]
+            if changed:
+                neighbourhoods = get_cell_neighbourhoods(board.rows, board.columns)
+                self._results = {
+                    column: (landing_index, result)
+                    for column, (landing_index, result) in self._results.items()
+                    if neighbourhoods[landing_index].isdisjoint(changed)
+                }
+        self._board = list(board.board)
+        self._shape = shape
+        self._mark = mark
+
+    def _get_result(self, board: Board, mark: int, column: int) -> PriorityResult:
+        cached = self._results.get(column)
+        if cached is not None:
+            self.reused += 1
+            return cached[1]
+
+        self.computed += 1
+        landing_index = board.landing_index(column)
+        next_state_board = Board(list(board.board), board.rows, board.columns)
+        next_state_board.board[landing_index] = mark
+        result = get_best_4_tuple_at(next_state_board, landing_index, mark)
+        self._results[column] = (landing_index, result)
+        return result
@@ -0,0 +1,96 @@
+"""
+Two-ply lookahead for the priority-based agent.
+
+Every (our move, opponent reply) pair is scored with the same 4-tuple
+classification the priority-based agent uses. A reply only changes the
+windows through the cell it lands on, and of those, only the windows that also
+contain our piece differ between our candidate moves. So the windows through
+every reply cell are scored once on the current board, and only the few that
+contain our candidate piece are scored again per move, instead of scanning
+each of the 49 grandchild positions from scratch.
+"""
+from board.board_class import Board
+from board.move_generation import non_losing_columns
+from board.windows import get_cell_windows
+from priority_based_agent.four_tuple import FourTuple
+from priority_based_agent.priority import Priority, get_priority_from_4_tuple
+
+
+def get_window_priority(cells: list[int], window: tuple[int, ...], mark: int, changes: dict[int, int]) \
+        -> Priority:
+    """priority of the window for mark, with `changes` (index -> value) applied to the board"""
+    return get_priority_from_4_tuple(FourTuple(*(changes.get(i, cells[i]) for i in window)), mark)
+
+
+def get_best_priority(cells: list[int], windows, mark: int, changes: dict[int, int]) -> Priority:
+    return min((get_window_priority(cells, window, mark, changes) for window in windows), default=Priority.none)
+
+
+def score_moves_and_replies(board: Board, our_mark: int, columns: list[int]) \
+        -> dict[int, tuple[Priority, Priority]]:
+    """
+    returns, for each of our candidate columns, our best priority after playing it
+    and the opponent's best priority over all replies to it
+    """
+    their_mark = 3 - our_mark
+    cells = board.board
+    cell_windows = get_cell_windows(board.rows, board.columns)
+    landing = {column: board.landing_index(column) for column in board.legal_columns()}
+
+    # the opponent's replies on the current board, scored once for all our moves
+    base_replies = {
+        column: [
+            (window, get_window_priority(cells, window, their_mark, {index: their_mark}))
+            for window in cell_windows[index]
+        ]
+        for column, index in landing.items()
+    }
+
+    scores = {}
+    for column in columns:
+        our_index = landing[column]
+        ours = get_best_priority(cells, cell_windows[our_index], our_mark, {our_index: our_mark})
+
+        theirs = Priority.none
+        for reply, reply_index in landing.items():
+            if reply == column:
+                # the reply lands on top of our piece
+                reply_index = our_index - board.columns
+                if reply_index < 0:
+                    continue
+                changes = {our_index: our_mark, reply_index: their_mark}
+                priority = get_best_priority(cells, cell_windows[reply_index], their_mark, changes)
+            else:
+                changes = {our_index: our_mark, reply_index: their_mark}
+                priority = min(
+                    (
+                        get_window_priority(cells, window, their_mark, changes) if our_index in window else base
+                        for window, base in base_replies[reply]
+                    ),
+                    default=Priority.none
+                )
+            theirs = min(theirs, priority)
+        scores[column] = (ours, theirs)
+    return scores
+
+
+def choose_column(board: Board, our_mark: int) -> int:
+    """
+    wins, forced blocks and better priorities still come first, and between
+    columns of equal priority the one that leaves the opponent the weakest best
+    reply is played
+    """
+    columns = non_losing_columns(board, our_mark)
+    scores = score_moves_and_replies(board, our_mark, columns)
+
+    best_column = columns[0]
+    best_key = None
+    for column in columns:
+        ours, theirs = scores[column]
+        if ours == Priority.connect_4:
+            return column
+        key = (ours, -theirs)
+        if best_key is None or key < best_key:
+            best_key = key
+            best_column = column
+    return best_column
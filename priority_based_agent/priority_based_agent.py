@@ -1,19 +1,23 @@
-import copy
-
 from board.board_class import Board
-from board.interaction import add_piece
+from board.move_generation import non_losing_columns
 from board.navigation import TAxis, all_axes
+from board.views import view, writable_copy, played
+from board.windows import get_cell_windows
 from data_structures import Observation, Configuration
 from priority_based_agent.four_tuple import FourTuple
-from priority_based_agent.priority import Priority, PriorityResult, get_priority_from_4_tuple
+from priority_based_agent.lookahead import choose_column
+from priority_based_agent.priority import Priority, PriorityResult, get_priority_from_4_tuple, \
+    make_priority_result
+from search.threat_space import find_forced_win
 
 
 def get_4_tuple_from_indexes(board: Board, indexes: FourTuple) -> FourTuple:
+    cells = board.board
     return FourTuple(
-        -1 if indexes.zero == -1 else board.board[indexes.zero],
-        -1 if indexes.one == -1 else board.board[indexes.one],
-        -1 if indexes.two == -1 else board.board[indexes.two],
-        -1 if indexes.three == -1 else board.board[indexes.three],
+        -1 if indexes[0] == -1 else cells[indexes[0]],
+        -1 if indexes[1] == -1 else cells[indexes[1]],
+        -1 if indexes[2] == -1 else cells[indexes[2]],
+        -1 if indexes[3] == -1 else cells[indexes[3]],
     )
 
 def get_4_tuple_from_index(board: Board, index: int, axis: TAxis, mark: int) -> PriorityResult:
@@ -22,23 +26,27 @@ def get_4_tuple_from_index(board: Board, index: int, axis: TAxis, mark: int) ->
     (e.g. at the edge of the board)
     """
     direction = axis.positive_direction() # we only need to check in one direction
-    tuple_indexes = FourTuple(index, -1, -1, -1)
+    indexes = [index, -1, -1, -1]
     for i in range(1, 4):
-        next_index = direction.get_neighbor_index(board, tuple_indexes[i-1])
+        next_index = direction.get_neighbor_index(board, indexes[i-1])
         if next_index is None:
+            tuple_indexes = FourTuple(*indexes)
             four_tuple = get_4_tuple_from_indexes(board, tuple_indexes)
-            priority = Priority.none
-            return PriorityResult(priority, four_tuple, tuple_indexes)
-        tuple_indexes[i] = next_index
+            return make_priority_result(Priority.none, four_tuple, tuple_indexes)
+        indexes[i] = next_index
 
+    tuple_indexes = FourTuple(*indexes)
     four_tuple = get_4_tuple_from_indexes(board, tuple_indexes)
     priority = get_priority_from_4_tuple(four_tuple, mark)
-    return PriorityResult(priority, four_tuple, tuple_indexes)
+    return make_priority_result(priority, four_tuple, tuple_indexes)
+
+
 
+_no_result = PriorityResult(Priority.none, FourTuple(-1, -1, -1, -1), FourTuple(-1, -1, -1, -1))
 
 
 def get_best_4_tuple(board: Board, with_index: int, mark: int) -> PriorityResult:
-    current_best_result = PriorityResult(Priority.none, FourTuple(-1, -1, -1, -1), FourTuple(-1, -1, -1, -1))
+    current_best_result = _no_result
     for axis in all_axes():
         print(f'axis: {axis}')
         for index in range(len(board.board)):
@@ -60,21 +68,53 @@ def get_best_4_tuple(board: Board, with_index: int, mark: int) -> PriorityResult
 
     return current_best_result
 
-def priority_based_agent(observation: Observation, configuration: Configuration):
+def get_best_4_tuple_at(board: Board, with_index: int, mark: int) -> PriorityResult:
+    """
+    same result as `get_best_4_tuple`, but only visits the (at most 16) windows
+    that contain the newly added piece
+    """
+    current_best_result = _no_result
+    for window in get_cell_windows(board.rows, board.columns)[with_index]:
+        tuple_indexes = FourTuple(*window)
+        four_tuple = get_4_tuple_from_indexes(board, tuple_indexes)
+        priority = get_priority_from_4_tuple(four_tuple, mark)
+        if priority == Priority.none: continue
+        if priority == Priority.connect_4:
+            return make_priority_result(priority, four_tuple, tuple_indexes)
+        if priority < current_best_result.priority:
+            current_best_result = make_priority_result(priority, four_tuple, tuple_indexes)
+
+    return current_best_result
+
+
+def priority_based_agent(observation: Observation, configuration: Configuration, *, lookahead: bool = False,
+                         threat_nodes: int = 0):
+    """
+    plays the column with the best immediate priority. With `lookahead`, the
+    opponent's best reply to every column is scored too, see `priority_based_agent.lookahead`;
+    enable it by binding it, e.g. `functools.partial(priority_based_agent, lookahead=True)`.
+    With `threat_nodes`, a forced win of immediate threats found in that many
+    nodes is played first, see `search.threat_space`
+    """
     print(f'state from [{observation.step + 1}] -> [{observation.step + 2}]\n')
-    board = Board(observation.board, configuration.rows, configuration.columns)
+    board = view(observation.board, configuration.rows, configuration.columns)
     our_mark = observation.mark
+    if threat_nodes:
+        forced_win = find_forced_win(board, our_mark, threat_nodes)
+        if forced_win is not None:
+            print(f'forced win: {forced_win.moves}')
+            return forced_win.column
+    if lookahead:
+        return choose_column(board, our_mark)
 
     current_best_priority = Priority.none
     current_best_col = -1
-    for column in range(board.columns):
+    columns = non_losing_columns(board, our_mark)
+    next_state_board = writable_copy(board)
+    for column in columns:
         print(f'column: {column}')
-        next_state_board = copy.deepcopy(board)
-        try:
-            added_piece_index = add_piece(next_state_board, our_mark, column)
-        except AssertionError:
-            continue
-        result = get_best_4_tuple(next_state_board, added_piece_index, our_mark)
+        with played(next_state_board, our_mark, column) as added_piece_index:
+            result = get_best_4_tuple(next_state_board, added_piece_index, our_mark)
         if result.priority == Priority.none:
             continue
         if result.priority == Priority.connect_4:
@@ -84,4 +124,5 @@ def priority_based_agent(observation: Observation, configuration: Configuration)
             current_best_col = column
         print('')
     print('-------------------\n')
-    return current_best_col
+    # every column has a null-priority, play any column that doesn't lose
+    return current_best_col if current_best_col != -1 else columns[0]
@@ -3,7 +3,7 @@ import copy
 from abc import abstractmethod, ABC
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Type, Tuple
+from typing import List, Type, Tuple, NamedTuple
 
 
 def act(observation, configuration):
@@ -40,58 +40,24 @@ def act(observation, configuration):
             return len(self.board)
 
 
-    @dataclass
-    class FourTuple:
-        zero: int
-        one: int
-        two: int
-        three: int
-
-        def __getitem__(self, index: int):
-            if index == 0:
-                return self.zero
-            elif index == 1:
-                return self.one
-            elif index == 2:
-                return self.two
-            elif index == 3:
-                return self.three
-            else:
-                raise KeyError('key must be between 0 and 3')
-
-        def __setitem__(self, index: int, value: int):
-            if index == 0:
-                self.zero = value
-            elif index == 1:
-                self.one = value
-            elif index == 2:
-                self.two = value
-            elif index == 3:
-                self.three = value
-            else:
-                raise KeyError('key must be between 0 and 3')
-
-        def __hash__(self):
-            return hash(self.zero) ^ hash(self.one) ^ hash(self.two) ^ hash(self.three)
+    class FourTuple(tuple):
+        __slots__ = ()
+
+        def __new__(cls, zero: int, one: int, two: int, three: int):
+            return tuple.__new__(cls, (zero, one, two, three))
 
         def __str__(self):
-            return f'4-tuple({self.zero}, {self.one}, {self.two}, {self.three})'
+            return f'4-tuple({self[0]}, {self[1]}, {self[2]}, {self[3]})'
 
-        def __contains__(self, item: int):
-            return item in [self.zero, self.one, self.two, self.three]
 
+    inverted_number = {0: 0, 1: 2, 2: 1}
 
     def invert_4_tuple(t: FourTuple) -> FourTuple:
-        def invert_number(n: int):
-            if n == 0: return 0
-            if n == 1: return 2
-            if n == 2: return 1
-
         return FourTuple(
-            invert_number(t.zero),
-            invert_number(t.one),
-            invert_number(t.two),
-            invert_number(t.three)
+            inverted_number.get(t[0]),
+            inverted_number.get(t[1]),
+            inverted_number.get(t[2]),
+            inverted_number.get(t[3])
         )
 
 
@@ -309,16 +275,114 @@ def act(observation, configuration):
         none = 8
 
 
-    @dataclass
-    class PriorityResult:
+    class PriorityResult(NamedTuple):
         priority: Priority
         four_tuple: FourTuple
         tuple_indexes: FourTuple
 
-        def __post_init__(self):
-            assert type(self.priority) == Priority
-            assert type(self.four_tuple) == FourTuple
-            assert type(self.tuple_indexes) == FourTuple
+
+    # we have to cover the following permutations:
+    # - at least one occurrence of 1
+    # - all 1s need to be next to each other in the permutation
+    # of the following multiset:
+    # - of cardinality 4
+    # - with reoccurring values
+    # - values in [0, 1, 2]
+    priority_map = {
+        FourTuple(0, 0, 0, 0): Priority.none,
+        # just one 1
+        FourTuple(0, 0, 0, 1): Priority.connect_1,
+        FourTuple(0, 0, 1, 0): Priority.connect_1,
+        FourTuple(0, 1, 0, 0): Priority.connect_1,
+        FourTuple(1, 0, 0, 0): Priority.connect_1,
+
+        # one 1, one 2
+        FourTuple(0, 0, 0, 1): Priority.connect_1,  # 1 at pos 4
+        FourTuple(0, 0, 2, 1): Priority.prevent_2,
+        FourTuple(0, 2, 0, 1): Priority.connect_1,
+        FourTuple(2, 0, 0, 1): Priority.connect_1,
+
+        FourTuple(0, 0, 1, 2): Priority.prevent_2,  # 1 at pos 3
+        FourTuple(0, 2, 1, 0): Priority.connect_1,
+        FourTuple(2, 0, 1, 0): Priority.connect_1,
+
+        FourTuple(0, 1, 0, 2): Priority.connect_1,  # 1 at pos 2
+        FourTuple(0, 1, 2, 0): Priority.connect_1,
+        FourTuple(2, 1, 0, 0): Priority.prevent_2,
+
+        FourTuple(1, 0, 0, 2): Priority.connect_1,  # 1 at pos 1
+        FourTuple(1, 0, 2, 0): Priority.connect_1,
+        FourTuple(1, 2, 0, 0): Priority.none,
+
+        # one 1, two 2s
+        FourTuple(0, 2, 2, 1): Priority.none,  # 1 at pos 4
+        FourTuple(2, 0, 2, 1): Priority.none,
+        FourTuple(2, 2, 0, 1): Priority.connect_1,
+
+        FourTuple(0, 2, 1, 2): Priority.prevent_3,  # 1 at pos 3
+        FourTuple(2, 0, 1, 2): Priority.prevent_2,
+        FourTuple(2, 2, 1, 0): Priority.prevent_3,
+
+        FourTuple(0, 1, 2, 2): Priority.prevent_3,  # 1 at pos 2
+        FourTuple(2, 1, 0, 2): Priority.prevent_2,
+        FourTuple(2, 1, 2, 0): Priority.prevent_3,
+
+        FourTuple(1, 0, 2, 2): Priority.connect_1,  # 1 at pos 1
+        FourTuple(1, 2, 0, 2): Priority.prevent_2,
+        FourTuple(1, 2, 2, 0): Priority.prevent_3,
+
+        # one 1, three 2s
+        FourTuple(2, 2, 2, 1): Priority.prevent_4,
+        FourTuple(2, 2, 1, 2): Priority.prevent_4,
+        FourTuple(2, 1, 2, 2): Priority.prevent_4,
+        FourTuple(1, 2, 2, 2): Priority.prevent_4,
+
+        # just two 1s
+        FourTuple(0, 0, 1, 1): Priority.connect_2,
+        FourTuple(0, 1, 0, 1): Priority.connect_1,
+        FourTuple(0, 1, 1, 0): Priority.connect_2,
+        FourTuple(1, 0, 0, 1): Priority.connect_1,
+        FourTuple(1, 0, 1, 0): Priority.connect_1,
+        FourTuple(1, 1, 0, 0): Priority.connect_2,
+
+        # two 1s, one 2
+        FourTuple(0, 2, 1, 1): Priority.none,
+        FourTuple(2, 0, 1, 1): Priority.connect_2,
+
+        FourTuple(0, 1, 2, 1): Priority.prevent_2,
+        FourTuple(2, 1, 0, 1): Priority.prevent_2,
+
+        FourTuple(0, 1, 1, 2): Priority.connect_2,
+        FourTuple(2, 1, 1, 0): Priority.connect_2,
+
+        FourTuple(1, 0, 1, 2): Priority.prevent_2,
+        FourTuple(1, 2, 1, 0): Priority.prevent_2,
+
+        FourTuple(1, 1, 0, 2): Priority.connect_2,
+        FourTuple(1, 1, 2, 0): Priority.connect_2,
+
+        # two 1s, two 2s
+        FourTuple(2, 2, 1, 1): Priority.prevent_3,
+        FourTuple(2, 1, 2, 1): Priority.prevent_3,
+        FourTuple(2, 1, 1, 2): Priority.none,
+        FourTuple(1, 2, 1, 2): Priority.prevent_3,
+        FourTuple(1, 1, 2, 2): Priority.prevent_3,
+
+        # just three 1s
+        FourTuple(0, 1, 1, 1): Priority.connect_3,
+        FourTuple(1, 0, 1, 1): Priority.connect_2,
+        FourTuple(1, 1, 0, 1): Priority.connect_2,
+        FourTuple(1, 1, 1, 0): Priority.connect_3,
+
+        # three 1s, one 2
+        FourTuple(2, 1, 1, 1): Priority.connect_3,
+        FourTuple(1, 2, 1, 1): Priority.connect_2,
+        FourTuple(1, 1, 2, 1): Priority.connect_2,
+        FourTuple(1, 1, 1, 2): Priority.connect_3,
+
+        # 4 ones
+        FourTuple(1, 1, 1, 1): Priority.connect_4,
+    }
 
 
     def get_priority_from_4_tuple(t: FourTuple, mark: int) -> Priority:
@@ -327,108 +391,6 @@ def act(observation, configuration):
         if mark == 2:
             t = invert_4_tuple(t)
 
-        # we have to cover the following permutations:
-        # - at least one occurrence of 1
-        # - all 1s need to be next to each other in the permutation
-        # of the following multiset:
-        # - of cardinality 4
-        # - with reoccurring values
-        # - values in [0, 1, 2]
-        priority_map = {
-            FourTuple(0, 0, 0, 0): Priority.none,
-            # just one 1
-            FourTuple(0, 0, 0, 1): Priority.connect_1,
-            FourTuple(0, 0, 1, 0): Priority.connect_1,
-            FourTuple(0, 1, 0, 0): Priority.connect_1,
-            FourTuple(1, 0, 0, 0): Priority.connect_1,
-
-            # one 1, one 2
-            FourTuple(0, 0, 0, 1): Priority.connect_1,  # 1 at pos 4
-            FourTuple(0, 0, 2, 1): Priority.prevent_2,
-            FourTuple(0, 2, 0, 1): Priority.connect_1,
-            FourTuple(2, 0, 0, 1): Priority.connect_1,
-
-            FourTuple(0, 0, 1, 2): Priority.prevent_2,  # 1 at pos 3
-            FourTuple(0, 2, 1, 0): Priority.connect_1,
-            FourTuple(2, 0, 1, 0): Priority.connect_1,
-
-            FourTuple(0, 1, 0, 2): Priority.connect_1,  # 1 at pos 2
-            FourTuple(0, 1, 2, 0): Priority.connect_1,
-            FourTuple(2, 1, 0, 0): Priority.prevent_2,
-
-            FourTuple(1, 0, 0, 2): Priority.connect_1,  # 1 at pos 1
-            FourTuple(1, 0, 2, 0): Priority.connect_1,
-            FourTuple(1, 2, 0, 0): Priority.none,
-
-            # one 1, two 2s
-            FourTuple(0, 2, 2, 1): Priority.none,  # 1 at pos 4
-            FourTuple(2, 0, 2, 1): Priority.none,
-            FourTuple(2, 2, 0, 1): Priority.connect_1,
-
-            FourTuple(0, 2, 1, 2): Priority.prevent_3,  # 1 at pos 3
-            FourTuple(2, 0, 1, 2): Priority.prevent_2,
-            FourTuple(2, 2, 1, 0): Priority.prevent_3,
-
-            FourTuple(0, 1, 2, 2): Priority.prevent_3,  # 1 at pos 2
-            FourTuple(2, 1, 0, 2): Priority.prevent_2,
-            FourTuple(2, 1, 2, 0): Priority.prevent_3,
-
-            FourTuple(1, 0, 2, 2): Priority.connect_1,  # 1 at pos 1
-            FourTuple(1, 2, 0, 2): Priority.prevent_2,
-            FourTuple(1, 2, 2, 0): Priority.prevent_3,
-
-            # one 1, three 2s
-            FourTuple(2, 2, 2, 1): Priority.prevent_4,
-            FourTuple(2, 2, 1, 2): Priority.prevent_4,
-            FourTuple(2, 1, 2, 2): Priority.prevent_4,
-            FourTuple(1, 2, 2, 2): Priority.prevent_4,
-
-            # just two 1s
-            FourTuple(0, 0, 1, 1): Priority.connect_2,
-            FourTuple(0, 1, 0, 1): Priority.connect_1,
-            FourTuple(0, 1, 1, 0): Priority.connect_2,
-            FourTuple(1, 0, 0, 1): Priority.connect_1,
-            FourTuple(1, 0, 1, 0): Priority.connect_1,
-            FourTuple(1, 1, 0, 0): Priority.connect_2,
-
-            # two 1s, one 2
-            FourTuple(0, 2, 1, 1): Priority.none,
-            FourTuple(2, 0, 1, 1): Priority.connect_2,
-
-            FourTuple(0, 1, 2, 1): Priority.prevent_2,
-            FourTuple(2, 1, 0, 1): Priority.prevent_2,
-
-            FourTuple(0, 1, 1, 2): Priority.connect_2,
-            FourTuple(2, 1, 1, 0): Priority.connect_2,
-
-            FourTuple(1, 0, 1, 2): Priority.prevent_2,
-            FourTuple(1, 2, 1, 0): Priority.prevent_2,
-
-            FourTuple(1, 1, 0, 2): Priority.connect_2,
-            FourTuple(1, 1, 2, 0): Priority.connect_2,
-
-            # two 1s, two 2s
-            FourTuple(2, 2, 1, 1): Priority.prevent_3,
-            FourTuple(2, 1, 2, 1): Priority.prevent_3,
-            FourTuple(2, 1, 1, 2): Priority.none,
-            FourTuple(1, 2, 1, 2): Priority.prevent_3,
-            FourTuple(1, 1, 2, 2): Priority.prevent_3,
-
-            # just three 1s
-            FourTuple(0, 1, 1, 1): Priority.connect_3,
-            FourTuple(1, 0, 1, 1): Priority.connect_2,
-            FourTuple(1, 1, 0, 1): Priority.connect_2,
-            FourTuple(1, 1, 1, 0): Priority.connect_3,
-
-            # three 1s, one 2
-            FourTuple(2, 1, 1, 1): Priority.connect_3,
-            FourTuple(1, 2, 1, 1): Priority.connect_2,
-            FourTuple(1, 1, 2, 1): Priority.connect_2,
-            FourTuple(1, 1, 1, 2): Priority.connect_3,
-
-            # 4 ones
-            FourTuple(1, 1, 1, 1): Priority.connect_4,
-        }
         other_t = invert_4_tuple(t)
         if t in priority_map:
             return priority_map[t]
@@ -438,11 +400,12 @@ def act(observation, configuration):
 
 
     def get_4_tuple_from_indexes(board: Board, indexes: FourTuple) -> FourTuple:
+        cells = board.board
         return FourTuple(
-            -1 if indexes.zero == -1 else board.board[indexes.zero],
-            -1 if indexes.one == -1 else board.board[indexes.one],
-            -1 if indexes.two == -1 else board.board[indexes.two],
-            -1 if indexes.three == -1 else board.board[indexes.three],
+            -1 if indexes[0] == -1 else cells[indexes[0]],
+            -1 if indexes[1] == -1 else cells[indexes[1]],
+            -1 if indexes[2] == -1 else cells[indexes[2]],
+            -1 if indexes[3] == -1 else cells[indexes[3]],
         )
 
 
@@ -452,15 +415,16 @@ def act(observation, configuration):
         (e.g. at the edge of the board)
         """
         direction = axis.positive_direction()  # we only need to check in one direction
-        tuple_indexes = FourTuple(index, -1, -1, -1)
+        indexes = [index, -1, -1, -1]
         for i in range(1, 4):
-            next_index = direction.get_neighbor_index(board, tuple_indexes[i - 1])
+            next_index = direction.get_neighbor_index(board, indexes[i - 1])
             if next_index is None:
+                tuple_indexes = FourTuple(*indexes)
                 four_tuple = get_4_tuple_from_indexes(board, tuple_indexes)
-                priority = Priority.none
-                return PriorityResult(priority, four_tuple, tuple_indexes)
-            tuple_indexes[i] = next_index
+                return PriorityResult(Priority.none, four_tuple, tuple_indexes)
+            indexes[i] = next_index
 
+        tuple_indexes = FourTuple(*indexes)
         four_tuple = get_4_tuple_from_indexes(board, tuple_indexes)
         priority = get_priority_from_4_tuple(four_tuple, mark)
         return PriorityResult(priority, four_tuple, tuple_indexes)
@@ -520,18 +484,56 @@ def act(observation, configuration):
         return bottom_index
 
 
+    def non_losing_columns(board: Board, mark: int) -> List[int]:
+        """
+        returns the columns that don't let the opponent win on the next move,
+        see board.move_generation in the project for the full version
+        """
+        height = board.rows + 1
+        bottom_mask = sum(1 << (column * height) for column in range(board.columns))
+        board_mask = bottom_mask * ((1 << board.rows) - 1)
+        bits = {1: 0, 2: 0}
+        for index, value in enumerate(board.board):
+            if value != 0:
+                row, column = index // board.columns, index % board.columns
+                bits[value] |= 1 << (column * height + board.rows - 1 - row)
+        occupied = bits[1] | bits[2]
+
+        def winning_cells(p: int) -> int:
+            cells = (p << 1) & (p << 2) & (p << 3)
+            for shift in (height, height - 1, height + 1):
+                pair = (p << shift) & (p << 2 * shift)
+                cells |= pair & (p << 3 * shift)
+                cells |= pair & (p >> shift)
+                pair = (p >> shift) & (p >> 2 * shift)
+                cells |= pair & (p << shift)
+                cells |= pair & (p >> 3 * shift)
+            return cells & (board_mask ^ occupied)
+
+        legal = (occupied + bottom_mask) & board_mask
+        winning = legal & winning_cells(bits[mark])
+        opponent_threats = winning_cells(bits[3 - mark])
+        forced_blocks = legal & opponent_threats
+        if winning:
+            moves = winning
+        elif forced_blocks:
+            moves = forced_blocks
+        else:
+            moves = (legal & ~(opponent_threats >> 1)) or legal
+        column_mask = (1 << board.rows) - 1
+        return [column for column in range(board.columns) if moves >> (column * height) & column_mask]
+
+
     def act(observation: Observation, configuration: Configuration):
         board = Board(observation.board, configuration.rows, configuration.columns)
         our_mark = observation.mark
 
         current_best_priority = Priority.none
         current_best_col = -1
-        for column in range(board.columns):
+        columns = non_losing_columns(board, our_mark)
+        for column in columns:
             next_state_board = copy.deepcopy(board)
-            try:
-                added_piece_index = add_piece(next_state_board, our_mark, column)
-            except AssertionError:
-                continue
+            added_piece_index = add_piece(next_state_board, our_mark, column)
             result = get_best_4_tuple(next_state_board, added_piece_index, our_mark)
             if result.priority == Priority.none:
                 continue
@@ -540,6 +542,7 @@ def act(observation, configuration):
             if result.priority < current_best_priority:
                 current_best_priority = result.priority
                 current_best_col = column
-        return current_best_col
+        # every column has a null-priority, play any column that doesn't lose
+        return current_best_col if current_best_col != -1 else columns[0]
 
     return act(observation, configuration)
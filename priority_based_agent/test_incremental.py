@@ -0,0 +1,54 @@
+import contextlib
+import io
+import random
+import unittest
+
+from arena.game import play_game
+from board.board_class import Board
+from data_structures import Configuration
+from priority_based_agent.incremental import IncrementalPriorityAgent
+from priority_based_agent.priority_based_agent import priority_based_agent, get_best_4_tuple, \
+    get_best_4_tuple_at
+
+
+class TestIncrementalPriorityAgent(unittest.TestCase):
+    def test_matches_full_recomputation(self):
+        configuration = Configuration(columns=7, rows=6)
+        incremental = IncrementalPriorityAgent()
+        mismatches = []
+        positions = []
+
+        def checked_agent(observation, configuration_):
+            column = incremental(observation, configuration_)
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = priority_based_agent(observation, configuration_)
+            if column != expected:
+                mismatches.append((observation.board, column, expected))
+            positions.append(Board(list(observation.board), configuration_.rows, configuration_.columns))
+            return column
+
+        for game in range(6):
+            rng = random.Random(game)
+            opponent = lambda observation, configuration_: rng.choice(
+                [c for c in range(configuration_.columns) if observation.board[c] == 0]
+            )
+            agents = [checked_agent, opponent] if game % 2 == 0 else [opponent, checked_agent]
+            play_game(agents, configuration, opening_moves=2, rng=random.Random(game))
+
+        self.assertEqual(mismatches, [])
+        self.assertGreater(incremental.reused, 0)
+        self.assertGreater(len(positions), 20)
+
+    def test_get_best_4_tuple_at(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            board = Board.with_heights([0] * 42, 6, 7)
+            for step in range(rng.randrange(1, 30)):
+                column = rng.choice(board.legal_columns())
+                index = board.landing_index(column)
+                board.board[index] = step % 2 + 1
+                board.track_heights()
+            for mark in [1, 2]:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    expected = get_best_4_tuple(board, index, mark)
+                self.assertEqual(get_best_4_tuple_at(board, index, mark), expected)
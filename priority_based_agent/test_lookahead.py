@@ -0,0 +1,78 @@
+import contextlib
+import io
+import random
+import unittest
+
+from board.board_class import Board
+from board.tests.helpers import parse_board
+from data_structures import Observation, Configuration
+from priority_based_agent.lookahead import score_moves_and_replies
+from priority_based_agent.priority import Priority
+from priority_based_agent.priority_based_agent import priority_based_agent, get_best_4_tuple_at
+
+
+def random_board(rng: random.Random) -> Board:
+    board = Board.with_heights([0] * 42, 6, 7)
+    for step in range(rng.randrange(0, 24)):
+        column = rng.choice(board.legal_columns())
+        board.board[board.landing_index(column)] = step % 2 + 1
+        board.track_heights()
+    return board
+
+
+def play(board: Board, mark: int, column: int) -> tuple[Board, int]:
+    next_board = Board.with_heights(list(board.board), board.rows, board.columns)
+    index = next_board.landing_index(column)
+    next_board.board[index] = mark
+    next_board.track_heights()
+    return next_board, index
+
+
+class TestLookahead(unittest.TestCase):
+    def test_matches_scoring_every_grandchild(self):
+        rng = random.Random(0)
+        for _ in range(30):
+            board = random_board(rng)
+            mark = sum(1 for cell in board.board if cell != 0) % 2 + 1
+            columns = board.legal_columns()
+            scores = score_moves_and_replies(board, mark, columns)
+            for column in columns:
+                child, index = play(board, mark, column)
+                ours = get_best_4_tuple_at(child, index, mark).priority
+                theirs = Priority.none
+                for reply in child.legal_columns():
+                    grandchild, reply_index = play(child, 3 - mark, reply)
+                    theirs = min(theirs, get_best_4_tuple_at(grandchild, reply_index, 3 - mark).priority)
+                self.assertEqual(scores[column], (ours, theirs))
+
+    def test_plays_the_best_pair(self):
+        board = parse_board([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 2, 0, 0],
+            [0, 0, 0, 1, 2, 0, 2],
+        ])
+        observation = Observation(board.board, 4, 1)
+        configuration = Configuration(7, 6)
+        scores = score_moves_and_replies(board, 1, board.legal_columns())
+        with contextlib.redirect_stdout(io.StringIO()):
+            column = priority_based_agent(observation, configuration, lookahead=True)
+        ours, theirs = scores[column]
+        self.assertTrue(all(
+            (ours, -theirs) <= (other_ours, -other_theirs) for other_ours, other_theirs in scores.values()
+        ))
+
+    def test_takes_the_win(self):
+        board = parse_board([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [2, 2, 2, 0, 0, 0, 0],
+            [1, 1, 1, 0, 0, 0, 0],
+        ])
+        observation = Observation(board.board, 6, 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(priority_based_agent(observation, Configuration(7, 6), lookahead=True), 3)
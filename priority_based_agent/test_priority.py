@@ -0,0 +1,41 @@
+import unittest
+
+from priority_based_agent import priority
+from priority_based_agent.four_tuple import FourTuple, invert_4_tuple
+from priority_based_agent.priority import Priority, PriorityResult, make_priority_result, \
+    get_priority_from_4_tuple
+
+
+class TestFourTuple(unittest.TestCase):
+    def test_fields(self):
+        t = FourTuple(0, 1, 2, -1)
+        self.assertEqual((t.zero, t.one, t.two, t.three), (0, 1, 2, -1))
+        self.assertEqual(t[3], -1)
+        self.assertIn(2, t)
+        self.assertEqual(str(t), '4-tuple(0, 1, 2, -1)')
+
+    def test_hash_distinguishes_permutations(self):
+        tuples = {FourTuple(0, 1, 2, 1), FourTuple(1, 2, 1, 0), FourTuple(2, 1, 0, 1)}
+        self.assertEqual(len({hash(t) for t in tuples}), 3)
+
+    def test_invert(self):
+        self.assertEqual(invert_4_tuple(FourTuple(0, 1, 2, 1)), FourTuple(0, 2, 1, 2))
+
+
+class TestPriority(unittest.TestCase):
+    def test_get_priority_from_4_tuple(self):
+        self.assertEqual(get_priority_from_4_tuple(FourTuple(1, 1, 1, 1), 1), Priority.connect_4)
+        self.assertEqual(get_priority_from_4_tuple(FourTuple(2, 2, 2, 2), 2), Priority.connect_4)
+        self.assertEqual(get_priority_from_4_tuple(FourTuple(2, 2, 2, 1), 1), Priority.prevent_4)
+        self.assertEqual(get_priority_from_4_tuple(FourTuple(2, 2, 0, 0), 1), Priority.none)
+
+    def test_validation_is_opt_in(self):
+        invalid = ('connect_4', FourTuple(1, 1, 1, 1), FourTuple(0, 1, 2, 3))
+        self.assertEqual(make_priority_result(*invalid).priority, 'connect_4')
+        priority.VALIDATE_RESULTS = True
+        try:
+            self.assertRaises(AssertionError, lambda: make_priority_result(*invalid))
+            valid = make_priority_result(Priority.connect_4, *invalid[1:])
+            self.assertEqual(valid, PriorityResult(Priority.connect_4, *invalid[1:]))
+        finally:
+            priority.VALIDATE_RESULTS = False
@@ -1,6 +1,7 @@
 import unittest
 
 from priority_based_agent.priority_based_agent import priority_based_agent
+from priority_based_agent.submission import act
 from board.tests.helpers import parse_board
 from data_structures import Observation, Configuration
 
@@ -61,4 +62,22 @@ class TestPriorityBasedAgent(unittest.TestCase):
         configuration = Configuration(7, 6)
         result = priority_based_agent(observation, configuration)
         print(result)
-        self.assertEqual(result, 2)
\ No newline at end of file
+        self.assertEqual(result, 2)
+
+    def test_agent_does_not_play_under_opponent_threat(self):
+        board = parse_board(
+            [
+            #    0  1  2  3  4  5  6
+                [0, 0, 0, 0, 0, 0, 0],  # 0   00, 01, 02, 03, 04, 05, 06,
+                [0, 0, 0, 0, 0, 0, 0],  # 1   07, 08, 09, 10, 11, 12, 13,
+                [0, 0, 0, 0, 0, 0, 0],  # 2   14, 15, 16, 17, 18, 19, 20,
+                [0, 0, 0, 0, 0, 0, 0],  # 3   21, 22, 23, 24, 25, 26, 27,
+                [0, 2, 2, 2, 0, 0, 0],  # 4   28, 29, 30, 31, 32, 33, 34,
+                [0, 1, 1, 2, 0, 1, 1]   # 5   35, 36, 37, 38, 39, 40, 41
+            ]
+        )
+
+        observation = Observation(board.board, 8, 1)
+        configuration = Configuration(7, 6)
+        self.assertNotIn(priority_based_agent(observation, configuration), [0, 4])
+        self.assertNotIn(act(observation, configuration), [0, 4])
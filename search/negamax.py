@@ -0,0 +1,279 @@
+"""
+Negamax search with alpha-beta pruning on bitboards.
+
+Positions are searched as a pair of bitmasks, the pieces of the player to move
+(own) and of the opponent (see `board.bitboard` for the layout). Every node
+only expands the moves of `board.move_generation`, so a node where the player
+to move can win, or can't prevent losing, is scored without searching
+further. The leaves are scored with the pattern evaluation of
+`board.pattern_based_value_calculation`, from the view of the player to move.
+
+Results are kept in a transposition table keyed like `board.packed.position_key`,
+and the search is iteratively deepened, which orders the root moves by the
+scores of the previous depth and stops cleanly at a time limit.
+"""
+import itertools
+import math
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Sequence
+
+from board.bitboard import from_board, get_layout, has_four
+from board.board_class import Board
+from board.move_generation import analyse_move_bits
+from board.pattern_based_value_calculation import get_bitboard_value
+from search.stats import IterationStats, SearchStats
+
+# any score beyond WIN_SCORE is a forced win, the remaining depth is added so that faster wins score higher
+WIN_SCORE = 1_000_000.0
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+@dataclass
+class SearchResult:
+    column: int
+    score: float
+    depth: int  # the deepest completed iteration
+    nodes: int
+    stats: Optional[SearchStats] = None
+
+
+class TranspositionTable:
+    """
+    stores (depth, bound, score, best column) by position key. Once `max_size`
+    entries are stored, the table is cleared rather than evicting entry by entry.
+    """
+
+    def __init__(self, max_size: int = 1 << 20):
+        assert max_size > 0, 'max_size must be positive'
+        self.max_size = max_size
+        self._entries: dict[int, tuple[int, int, float, int]] = {}
+
+    def get(self, key: int) -> Optional[tuple[int, int, float, int]]:
+        return self._entries.get(key)
+
+    def store(self, key: int, depth: int, bound: int, score: float, column: int):
+        if len(self._entries) >= self.max_size:
+            self._entries.clear()
+        self._entries[key] = (depth, bound, score, column)
+
+    def clear(self):
+        self._entries.clear()
+
+    def resize(self, max_size: int):
+        """changes `max_size`, evicting the oldest entries that no longer fit"""
+        assert max_size > 0, 'max_size must be positive'
+        self.max_size = max_size
+        for key in list(itertools.islice(self._entries, max(len(self._entries) - max_size, 0))):
+            del self._entries[key]
+
+    @property
+    def nbytes(self) -> int:
+        """approximate memory of the entries, estimated from the size of one of them"""
+        if not self._entries:
+            return sys.getsizeof(self._entries)
+        key, value = next(iter(self._entries.items()))
+        entry = sys.getsizeof(key) + sys.getsizeof(value) + sum(sys.getsizeof(part) for part in value)
+        return sys.getsizeof(self._entries) + entry * len(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def center_order(columns: int) -> tuple[int, ...]:
+    """the columns from the center outwards, the usual move ordering for connect 4"""
+    return tuple(sorted(range(columns), key=lambda column: (abs(2 * column - (columns - 1)), column)))
+
+
+class Searcher:
+    def __init__(self, rows: int, columns: int, weights: Optional[Sequence[float]] = None,
+                 table: Optional[TranspositionTable] = None):
+        self.rows = rows
+        self.columns = columns
+        self.weights = weights
+        self.table = table if table is not None else TranspositionTable()
+        self.layout = get_layout(rows, columns)
+        self.column_masks = tuple(self.layout.column_mask(column) for column in range(columns))
+        self.order = center_order(columns)
+        self.nodes = 0
+        self.deadline: Optional[float] = None  # in `time.monotonic` seconds
+        # set from another thread to abort the running search, see `search.ponder`
+        self.stopped = False
+        # counters of the running search, see `stats`
+        self.table_probes = 0
+        self.table_hits = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.stats: Optional[SearchStats] = None  # of the last search
+        # called with the stats of every search, see `arena.telemetry`
+        self.listener: Optional[Callable[[SearchStats], None]] = None
+
+    def evaluate(self, own: int, opponent: int) -> float:
+        return get_bitboard_value(own, opponent, self.rows, self.columns, self.weights)
+
+    def root_columns(self, own: int, opponent: int) -> list[int]:
+        """
+        the columns worth searching, center first; when every move loses, the
+        forced blocks, or any legal column, like `board.move_generation.non_losing_columns`
+        """
+        options = analyse_move_bits(own, opponent, self.layout)
+        moves = options.non_losing or options.forced_blocks or options.legal
+        return [column for column in self.order if moves & self.column_masks[column]]
+
+    def score_move(self, own: int, opponent: int, column: int, depth: int,
+                   alpha: float = -math.inf, beta: float = math.inf) -> float:
+        """the score of playing that column, searched `depth` plies deep including the move itself"""
+        move = playable_cell(own | opponent, self.column_masks[column], self.layout.bottom_mask)
+        if has_four(own | move, self.rows):
+            return WIN_SCORE + depth
+        return -self.negamax(opponent, own | move, depth - 1, -beta, -alpha)
+
+    def search_depth(self, own: int, opponent: int, columns: list[int], depth: int) -> list[tuple[int, float]]:
+        """
+        returns the scores of the given root columns at one depth. Only the best
+        score is exact, the others are upper bounds.
+        """
+        scores = []
+        alpha = -math.inf
+        for column in columns:
+            score = self.score_move(own, opponent, column, depth, alpha, math.inf)
+            scores.append((column, score))
+            alpha = max(alpha, score)
+        return scores
+
+    def search(self, board: Board, mark: int, max_depth: int, time_limit: Optional[float] = None) \
+            -> SearchResult:
+        """
+        iteratively deepens up to `max_depth` plies, or until `time_limit` seconds
+        passed or the search is stopped, and returns the best column of the
+        deepest completed iteration
+        """
+        bitboard = from_board(board)
+        return self.search_bits(bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark), max_depth, time_limit)
+
+    def search_bits(self, own: int, opponent: int, max_depth: int, time_limit: Optional[float] = None) \
+            -> SearchResult:
+        """`search` for the bits of the player to move and the opponent"""
+        columns = self.root_columns(own, opponent)
+        self.nodes = self.table_probes = self.table_hits = self.cutoffs = self.first_move_cutoffs = 0
+        start = time.monotonic()
+        self.deadline = None if time_limit is None else start + time_limit
+
+        result = SearchResult(columns[0], 0.0, 0, 0)
+        iterations = []
+        try:
+            for depth in range(1, max_depth + 1):
+                iteration_start, iteration_nodes = time.monotonic(), self.nodes
+                scores = self.search_depth(own, opponent, columns, depth)
+                columns, result = merge_scores(scores, depth, self.nodes)
+                iterations.append(IterationStats(depth, self.nodes - iteration_nodes,
+                                                 time.monotonic() - iteration_start))
+                if abs(result.score) >= WIN_SCORE:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        result.nodes = self.nodes
+        result.stats = self.stats = SearchStats(self.nodes, time.monotonic() - start, self.table_probes,
+                                                self.table_hits, self.cutoffs, self.first_move_cutoffs, iterations)
+        if self.listener is not None:
+            self.listener(self.stats)
+        return result
+
+    def negamax(self, own: int, opponent: int, depth: int, alpha: float, beta: float) -> float:
+        self.nodes += 1
+        if self.nodes & 255 == 0 and (self.stopped or self.deadline is not None and time.monotonic() > self.deadline):
+            raise SearchTimeout()
+
+        layout = self.layout
+        options = analyse_move_bits(own, opponent, layout)
+        if options.winning:
+            return WIN_SCORE + depth
+        if not options.legal:
+            return 0.0
+        if not options.non_losing:
+            # the opponent wins on the next move
+            return -(WIN_SCORE + depth - 1)
+        if depth <= 0:
+            return self.evaluate(own, opponent)
+
+        occupied = own | opponent
+        key = own + occupied + layout.bottom_mask
+        entry = self.table.get(key)
+        self.table_probes += 1
+        table_column = -1
+        if entry is not None:
+            self.table_hits += 1
+            entry_depth, bound, score, table_column = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return score
+                if bound == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        original_alpha = alpha
+        best_score = -math.inf
+        best_column = -1
+        moves = options.non_losing
+        for index, column in enumerate(self._ordered(moves, table_column)):
+            move = moves & self.column_masks[column]
+            score = -self.negamax(opponent, own | move, depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score = score
+                best_column = column
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        if index == 0:
+                            self.first_move_cutoffs += 1
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, depth, bound, best_score, best_column)
+        return best_score
+
+    def _ordered(self, moves: int, first_column: int) -> list[int]:
+        columns = [column for column in self.order if moves & self.column_masks[column]]
+        if first_column in columns:
+            columns.remove(first_column)
+            columns.insert(0, first_column)
+        return columns
+
+
+def playable_cell(occupied: int, column_mask: int, bottom_mask: int) -> int:
+    """the cell a piece played into that column lands on"""
+    return (occupied + bottom_mask) & column_mask
+
+
+def merge_scores(scores: list[tuple[int, float]], depth: int, nodes: int) -> tuple[list[int], SearchResult]:
+    """
+    returns the root columns reordered by score, best first (ties keep their
+    order), and the result for the best column
+    """
+    ordered = sorted(scores, key=lambda column_score: -column_score[1])
+    column, score = ordered[0]
+    return [column for column, _ in ordered], SearchResult(column, score, depth, nodes)
+
+
+@lru_cache(maxsize=None)
+def get_searcher(rows: int, columns: int) -> Searcher:
+    """a searcher per board shape, so the transposition table is kept between moves"""
+    return Searcher(rows, columns)
@@ -0,0 +1,136 @@
+"""
+Root-parallel search across a process pool.
+
+Threads don't speed up a pure Python search because of the GIL, so the root
+moves of every iteration are split across worker processes instead. Each
+worker searches its root move with a full window and its own `Searcher`, whose
+transposition table lives in the worker and is kept between moves. The scores
+are merged into a single best move exactly like the single-process search
+does (see `search.negamax.merge_scores`).
+
+With `table_size`, the workers share one `search.shared_table.SharedTranspositionTable`
+of that many entries instead, so a position searched by one worker is reused
+by all the others.
+
+The pool is started on the first search and reused for every following one;
+close it with `close()` or by using the searcher as a context manager.
+"""
+import multiprocessing
+import os
+import time
+from typing import Optional, Sequence
+
+from board.bitboard import from_board
+from board.board_class import Board
+from search.negamax import Searcher, SearchResult, SearchTimeout, WIN_SCORE, merge_scores
+from search.shared_table import SharedTranspositionTable
+
+# the searcher of a worker process, created by `_init_worker`
+_searcher: Optional[Searcher] = None
+
+
+def _init_worker(rows: int, columns: int, weights: Optional[Sequence[float]],
+                 table: Optional[tuple[int, str]]):
+    """`table` is the (capacity, name) of a shared table to attach to"""
+    global _searcher
+    _searcher = Searcher(rows, columns, weights, None if table is None else SharedTranspositionTable(*table))
+
+
+def _score_move(task: tuple[int, int, int, int, Optional[float]]) \
+        -> tuple[int, Optional[float], int, Optional[tuple[int, int, int]]]:
+    """
+    returns (column, score, nodes, shared table counters), the score is None when
+    the deadline passed
+    """
+    own, opponent, column, depth, deadline = task
+    table = _searcher.table
+    counters = table.counters() if isinstance(table, SharedTranspositionTable) else None
+    _searcher.nodes = 0
+    _searcher.deadline = deadline
+    try:
+        score = _searcher.score_move(own, opponent, column, depth)
+    except SearchTimeout:
+        score = None
+    finally:
+        _searcher.deadline = None
+    if counters is not None:
+        counters = table.counters_since(counters)
+    return column, score, _searcher.nodes, counters
+
+
+class ParallelSearcher:
+    """
+    drop-in replacement for `search.negamax.Searcher.search` that splits the
+    root moves across `workers` processes (by default one per CPU)
+    """
+
+    def __init__(self, workers: Optional[int] = None, weights: Optional[Sequence[float]] = None,
+                 table_size: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.weights = weights
+        self.table_size = table_size
+        # its counters include those of every worker
+        self.table: Optional[SharedTranspositionTable] = None
+        self._pool = None
+        self._shape: Optional[tuple[int, int]] = None
+        # the main process only needs a searcher to generate the root moves
+        self._root: Optional[Searcher] = None
+
+    def search(self, board: Board, mark: int, max_depth: int, time_limit: Optional[float] = None) \
+            -> SearchResult:
+        pool = self._get_pool(board.rows, board.columns)
+        bitboard = from_board(board)
+        own, opponent = bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark)
+        columns = self._root.root_columns(own, opponent)
+        # time.monotonic is system wide, so the workers can compare against it
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+
+        result = SearchResult(columns[0], 0.0, 0, 0)
+        nodes = 0
+        for depth in range(1, max_depth + 1):
+            tasks = [(own, opponent, column, depth, deadline) for column in columns]
+            scores = []
+            completed = True
+            for column, score, task_nodes, counters in pool.imap(_score_move, tasks):
+                nodes += task_nodes
+                if counters is not None:
+                    self.table.add_counters(counters)
+                if score is None:
+                    completed = False
+                else:
+                    scores.append((column, score))
+            if not completed:
+                break
+            columns, result = merge_scores(scores, depth, nodes)
+            if abs(result.score) >= WIN_SCORE:
+                break
+        result.nodes = nodes
+        return result
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._shape = None
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+
+    def _get_pool(self, rows: int, columns: int):
+        if self._pool is None or self._shape != (rows, columns):
+            self.close()
+            table = None
+            if self.table_size is not None:
+                self.table = SharedTranspositionTable(self.table_size)
+                table = (self.table.capacity, self.table.name)
+            self._pool = multiprocessing.Pool(self.workers, _init_worker, (rows, columns, self.weights, table))
+            self._shape = (rows, columns)
+            self._root = Searcher(rows, columns, self.weights)
+        return self._pool
+
+    def __enter__(self) -> 'ParallelSearcher':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
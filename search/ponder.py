@@ -0,0 +1,108 @@
+"""
+Pondering: searching during the opponent's turn.
+
+After returning a move, `PonderingAgent` keeps searching, in a background
+thread, the positions after every reply the opponent can make, most likely
+first. The results go to the transposition table the agent keeps for the
+whole game, so when the opponent's reply was pondered, the next search finds
+most of its tree in the table already. The next call stops pondering before it
+searches, which takes at most a few hundred nodes.
+
+The thread holds the GIL while it searches, so pondering only helps when the
+opponent runs in another process, like on the match server or in Kaggle.
+"""
+import threading
+import time
+from typing import Optional
+
+from board.bitboard import from_board, has_four
+from board.board_class import Board
+from data_structures import Observation, Configuration
+from search.negamax import Searcher, TranspositionTable, playable_cell
+
+
+def is_over(player_1: int, player_2: int, searcher: Searcher) -> bool:
+    occupied = player_1 | player_2
+    return occupied == searcher.layout.board_mask \
+        or has_four(player_1, searcher.rows) or has_four(player_2, searcher.rows)
+
+
+class PonderingAgent:
+    """
+    searches `depth` plies (or for `time_limit` seconds) on its own moves, and
+    ponders the opponent's replies up to `ponder_depth` plies, for at most
+    `ponder_time` seconds
+    """
+
+    def __init__(self, depth: int = 6, time_limit: Optional[float] = None, ponder_depth: int = 8,
+                 ponder_time: float = 10.0):
+        self.depth = depth
+        self.time_limit = time_limit
+        self.ponder_depth = ponder_depth
+        self.ponder_time = ponder_time
+        self.table = TranspositionTable()
+        self._searcher: Optional[Searcher] = None
+        self._ponderer: Optional[Searcher] = None
+        self._thread: Optional[threading.Thread] = None
+        self.pondered_nodes = 0  # of the last ponder, read after `stop_pondering`
+        # called with the stats of every search of its own moves, see `search.negamax.Searcher`
+        self.listener = None
+
+    def __call__(self, observation: Observation, configuration: Configuration) -> int:
+        self.stop_pondering()
+        board = Board(observation.board, configuration.rows, configuration.columns)
+        searcher = self._get_searcher(board.rows, board.columns)
+        searcher.listener = self.listener
+        bitboard = from_board(board)
+        own, opponent = bitboard.pieces_of(observation.mark), bitboard.pieces_of(3 - observation.mark)
+        result = searcher.search_bits(own, opponent, self.depth, self.time_limit)
+
+        move = playable_cell(own | opponent, searcher.column_masks[result.column], searcher.layout.bottom_mask)
+        if not is_over(own | move, opponent, searcher):
+            self._start_pondering(own | move, opponent)
+        return result.column
+
+    @property
+    def stats(self):
+        """the `search.stats.SearchStats` of the last move"""
+        return None if self._searcher is None else self._searcher.stats
+
+    def stop_pondering(self):
+        if self._thread is None:
+            return
+        self._ponderer.stopped = True
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        self.stop_pondering()
+
+    def _get_searcher(self, rows: int, columns: int) -> Searcher:
+        if self._searcher is None or (self._searcher.rows, self._searcher.columns) != (rows, columns):
+            self.table.clear()
+            # both share the table, so whatever is pondered is found by the next search
+            self._searcher = Searcher(rows, columns, table=self.table)
+            self._ponderer = Searcher(rows, columns, table=self.table)
+        return self._searcher
+
+    def _start_pondering(self, own: int, opponent: int):
+        """`own` are our bits after our move, the opponent is to move"""
+        self._ponderer.stopped = False
+        self.pondered_nodes = 0
+        self._thread = threading.Thread(target=self._ponder, args=(own, opponent), daemon=True)
+        self._thread.start()
+
+    def _ponder(self, own: int, opponent: int):
+        ponderer = self._ponderer
+        replies = ponderer.root_columns(opponent, own)
+        deadline = time.monotonic() + self.ponder_time
+        # deepen all replies together, so that every likely reply gets some work before a deep one
+        for depth in range(1, self.ponder_depth + 1):
+            for reply in replies:
+                remaining = deadline - time.monotonic()
+                if ponderer.stopped or remaining <= 0:
+                    return
+                move = playable_cell(own | opponent, ponderer.column_masks[reply], ponderer.layout.bottom_mask)
+                if is_over(own, opponent | move, ponderer):
+                    continue
+                self.pondered_nodes += ponderer.search_bits(own, opponent | move, depth, remaining).nodes
@@ -0,0 +1,146 @@
+"""
+A transposition table in `multiprocessing.shared_memory`, shared by every
+process that searches, see `search.parallel` and `dataset.self_play`.
+
+The table is an array of fixed-size entries of three little-endian 64 bit
+words: a check word, the score (as the bits of a double) and a packed word of
+depth, bound and best column. The check word is the key xor-ed with the other
+two words, so an entry only verifies against the key it was written for. Writes
+don't take a lock: if two processes write the same entry at once, or a read
+overlaps a write, the words of different entries get mixed, the check fails and
+the probe is counted as a miss.
+
+An entry is found by the key modulo the capacity and always replaced by the
+latest store. Keys wider than 64 bits are folded into 64 bits first.
+"""
+import struct
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional
+
+ENTRY = struct.Struct('<QQQ')
+_DOUBLE = struct.Struct('<d')
+_MASK = (1 << 64) - 1
+
+
+@dataclass
+class TableStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    capacity: int = 0
+    nbytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def __str__(self):
+        return f'{self.hits} hits in {self.hits + self.misses} probes ({self.hit_rate:.1%}), ' \
+               f'{self.stores} stores, {self.capacity} entries in {self.nbytes / (1 << 20):.1f} MiB'
+
+
+def fold_key(key: int) -> int:
+    while key > _MASK:
+        key = (key & _MASK) ^ (key >> 64)
+    return key
+
+
+def pack_meta(depth: int, bound: int, column: int) -> int:
+    return depth | bound << 16 | (column + 1) << 24
+
+
+def unpack_meta(meta: int) -> tuple[int, int, int]:
+    return meta & 0xFFFF, meta >> 16 & 0xFF, (meta >> 24 & 0xFF) - 1
+
+
+class SharedTranspositionTable:
+    """
+    same interface as `search.negamax.TranspositionTable`, for `capacity` entries.
+    The process creating the table owns the shared memory and frees it on
+    `close()`; other processes attach to it with `SharedTranspositionTable(capacity, name)`,
+    which is also what unpickling the table does.
+    """
+
+    def __init__(self, capacity: int = 1 << 20, name: Optional[str] = None):
+        assert capacity > 0, 'capacity must be positive'
+        self.capacity = capacity
+        self.owner = name is None
+        if self.owner:
+            self._memory = shared_memory.SharedMemory(create=True, size=capacity * ENTRY.size)
+            self._memory.buf[:] = bytes(capacity * ENTRY.size)
+        else:
+            # child processes share the resource tracker of the creating process, which
+            # only forgets about the memory when the owner unlinks it
+            self._memory = shared_memory.SharedMemory(name=name)
+        self._buffer = self._memory.buf
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def nbytes(self) -> int:
+        return self.capacity * ENTRY.size
+
+    def get(self, key: int) -> Optional[tuple[int, int, float, int]]:
+        key = fold_key(key)
+        check, score_bits, meta = ENTRY.unpack_from(self._buffer, key % self.capacity * ENTRY.size)
+        if check ^ score_bits ^ meta != key or meta == 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        depth, bound, column = unpack_meta(meta)
+        return depth, bound, _DOUBLE.unpack(score_bits.to_bytes(8, 'little'))[0], column
+
+    def store(self, key: int, depth: int, bound: int, score: float, column: int):
+        key = fold_key(key)
+        score_bits = int.from_bytes(_DOUBLE.pack(score), 'little')
+        meta = pack_meta(depth, bound, column)
+        ENTRY.pack_into(self._buffer, key % self.capacity * ENTRY.size, key ^ score_bits ^ meta, score_bits, meta)
+        self.stores += 1
+
+    def clear(self):
+        self._buffer[:] = bytes(self.nbytes)
+
+    def counters(self) -> tuple[int, int, int]:
+        return self.hits, self.misses, self.stores
+
+    def add_counters(self, counters: tuple[int, int, int]):
+        """adds the counters of another process, see `counters_since`"""
+        self.hits += counters[0]
+        self.misses += counters[1]
+        self.stores += counters[2]
+
+    def counters_since(self, counters: tuple[int, int, int]) -> tuple[int, int, int]:
+        return self.hits - counters[0], self.misses - counters[1], self.stores - counters[2]
+
+    def stats(self) -> TableStats:
+        """the counters of this process, and those added from other processes"""
+        return TableStats(self.hits, self.misses, self.stores, self.capacity, self.nbytes)
+
+    def close(self):
+        if self._buffer is None:
+            return
+        self._buffer.release()
+        self._buffer = None
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+    def __len__(self):
+        """the number of written entries, scans the whole table"""
+        return sum(1 for _, _, meta in ENTRY.iter_unpack(self._buffer) if meta)
+
+    def __reduce__(self):
+        return SharedTranspositionTable, (self.capacity, self.name)
+
+    def __enter__(self) -> 'SharedTranspositionTable':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,112 @@
+"""
+Telemetry of the negamax search: `SearchStats` describes one search (one
+move), `GameStats` sums the searches of a player over a game. A move found
+without searching, e.g. by `search.threat_space`, is reported as empty stats
+with another `source`. Both convert to
+plain dicts for JSON, see `arena.tournament --telemetry`.
+"""
+from dataclasses import dataclass, field, asdict
+
+
+@dataclass
+class IterationStats:
+    depth: int
+    nodes: int
+    seconds: float
+
+
+@dataclass
+class SearchStats:
+    nodes: int = 0
+    seconds: float = 0.0
+    table_probes: int = 0
+    table_hits: int = 0
+    cutoffs: int = 0  # beta-cutoffs
+    first_move_cutoffs: int = 0  # beta-cutoffs by the first move searched, a measure of the move ordering
+    iterations: list[IterationStats] = field(default_factory=list)  # the completed ones
+    source: str = 'search'  # or what found the move without searching, e.g. 'threat'
+
+    @property
+    def depth(self) -> int:
+        return self.iterations[-1].depth if self.iterations else 0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    @property
+    def effective_branching_factor(self) -> float:
+        """the growth of the nodes from the previous iteration to the last one"""
+        if len(self.iterations) < 2 or not self.iterations[-2].nodes:
+            return 0.0
+        return self.iterations[-1].nodes / self.iterations[-2].nodes
+
+    @property
+    def table_hit_rate(self) -> float:
+        return self.table_hits / self.table_probes if self.table_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            'depth': self.depth,
+            'nodes_per_second': self.nodes_per_second,
+            'effective_branching_factor': self.effective_branching_factor,
+            'table_hit_rate': self.table_hit_rate,
+            'first_move_cutoff_rate': self.first_move_cutoff_rate,
+        }
+
+
+@dataclass
+class GameStats:
+    moves: int = 0
+    nodes: int = 0
+    seconds: float = 0.0
+    table_probes: int = 0
+    table_hits: int = 0
+    cutoffs: int = 0
+    first_move_cutoffs: int = 0
+    depths: list[int] = field(default_factory=list)
+    branching_factors: list[float] = field(default_factory=list)  # of the moves with two iterations or more
+    seconds_per_depth: dict[int, float] = field(default_factory=dict)  # summed over the moves
+    shortcuts: dict[str, int] = field(default_factory=dict)  # moves played without searching, by source
+    unmatched: int = 0  # moves whose stats couldn't be told apart from the other games, not in `moves`
+
+    def add(self, stats: SearchStats):
+        self.moves += 1
+        if stats.source != 'search':
+            self.shortcuts[stats.source] = self.shortcuts.get(stats.source, 0) + 1
+            return
+        self.nodes += stats.nodes
+        self.seconds += stats.seconds
+        self.table_probes += stats.table_probes
+        self.table_hits += stats.table_hits
+        self.cutoffs += stats.cutoffs
+        self.first_move_cutoffs += stats.first_move_cutoffs
+        self.depths.append(stats.depth)
+        if len(stats.iterations) >= 2:
+            self.branching_factors.append(stats.effective_branching_factor)
+        for iteration in stats.iterations:
+            self.seconds_per_depth[iteration.depth] = self.seconds_per_depth.get(iteration.depth, 0.0) + \
+                iteration.seconds
+
+    def to_dict(self) -> dict:
+        return {
+            'moves': self.moves,
+            'nodes': self.nodes,
+            'seconds': self.seconds,
+            'nodes_per_second': self.nodes / self.seconds if self.seconds else 0.0,
+            'mean_depth': sum(self.depths) / len(self.depths) if self.depths else 0.0,
+            'max_depth': max(self.depths, default=0),
+            'effective_branching_factor':
+                sum(self.branching_factors) / len(self.branching_factors) if self.branching_factors else 0.0,
+            'table_hit_rate': self.table_hits / self.table_probes if self.table_probes else 0.0,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            'cutoffs': self.cutoffs,
+            'seconds_per_depth': self.seconds_per_depth,
+            'shortcuts': self.shortcuts,
+            'unmatched': self.unmatched,
+        }
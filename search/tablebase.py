@@ -0,0 +1,265 @@
+"""
+Retrograde tablebase: the exact values of positions with at most `max_empty`
+empty cells, stored in a sorted, memory-mapped file.
+
+The generator collects the positions reachable from seed positions, layer by
+layer by the number of empty cells, then solves them from the fullest layer
+back up: the value of a position follows from the values of its children, which
+are all one layer below and already solved. Only the moves of
+`board.move_generation` are followed, so positions that are won or lost on
+the next move are stored but not expanded.
+
+The positions of a 6 x 7 board with `max_empty` empty cells or fewer are far
+too many to solve them all for any useful `max_empty`, so the seeds are the
+positions of random games (--games) or of self-play shards (--shards) once
+they're `max_empty` cells from the end. --exhaustive seeds the empty board, which
+solves every reachable position of small boards.
+
+A value is from the view of the player to move: n > 0 wins with the n-th ply
+from the position (n is odd), n < 0 loses to the -n-th ply, 0 is a draw.
+
+The file has a 16 byte header (magic, rows, columns, max_empty, count),
+followed by `count` sorted keys (`board.packed.position_key`, uint64) and
+their `count` values (int8). Lookups are binary searches in the memory-mapped
+keys, so only the pages they touch are read.
+
+    python -m search.tablebase --output tablebase.bin --max-empty 10 --games 1000
+    python -m search.tablebase --output tablebase.bin --max-empty 8 --shards data/self_play
+    python -m search.tablebase --output small.bin --rows 4 --columns 5 --max-empty 20 --exhaustive
+"""
+import argparse
+import random
+import struct
+import time
+from typing import Iterable, Iterator, Optional
+
+from board.bitboard import BitboardLayout, from_board, get_layout, has_four
+from board.board_class import Board
+from board.move_generation import analyse_move_bits
+
+MAGIC = b'CXTB'
+HEADER = struct.Struct('<4sBBBxQ')
+HEADER_SIZE = HEADER.size
+
+
+def empty_cells(own: int, opponent: int, layout: BitboardLayout) -> int:
+    return layout.rows * layout.columns - bin(own | opponent).count('1')
+
+
+def bits_key(own: int, opponent: int, layout: BitboardLayout) -> int:
+    """`board.packed.position_key` of the position with the bits of the player to move and the opponent"""
+    occupied = own | opponent
+    # player 1 is to move when both players have played as many pieces
+    player_1 = own if bin(occupied).count('1') % 2 == 0 else opponent
+    return player_1 + occupied + layout.bottom_mask
+
+
+def child_value(value: int) -> int:
+    """the value of the move to a child with that value, which is from the view of the opponent"""
+    if value > 0:
+        return -value - 1
+    if value < 0:
+        return 1 - value
+    return 0
+
+
+def rank(value: int) -> int:
+    """orders values from the best for the player to move: fast wins, draws, slow losses"""
+    if value > 0:
+        return 100 - value
+    if value < 0:
+        return -100 - value
+    return 0
+
+
+def _moves(cells: int) -> Iterator[int]:
+    while cells:
+        move = cells & -cells
+        cells ^= move
+        yield move
+
+
+def collect_positions(seeds: Iterable[tuple[int, int]], layout: BitboardLayout, max_empty: int) \
+        -> list[set[tuple[int, int]]]:
+    """
+    the positions reachable from the seeds, (own, opponent) bits of the player
+    to move, by number of empty cells; layers above `max_empty` are emptied once expanded
+    """
+    layers: list[set[tuple[int, int]]] = [set() for _ in range(layout.rows * layout.columns + 1)]
+    for own, opponent in seeds:
+        layers[empty_cells(own, opponent, layout)].add((own, opponent))
+    for empty in range(len(layers) - 1, 0, -1):
+        below = layers[empty - 1]
+        for own, opponent in layers[empty]:
+            options = analyse_move_bits(own, opponent, layout)
+            if options.winning:
+                continue
+            for move in _moves(options.non_losing):
+                below.add((opponent, own | move))
+        if empty > max_empty:
+            layers[empty] = set()
+    return layers
+
+
+def solve(layers: list[set[tuple[int, int]]], layout: BitboardLayout) -> dict[int, int]:
+    """the value of every position of the layers by key, solved from the full board back"""
+    values: dict[int, int] = {}
+    for positions in layers:
+        for own, opponent in positions:
+            values[bits_key(own, opponent, layout)] = _solve_position(own, opponent, layout, values)
+    return values
+
+
+def _solve_position(own: int, opponent: int, layout: BitboardLayout, values: dict[int, int]) -> int:
+    options = analyse_move_bits(own, opponent, layout)
+    if options.winning:
+        return 1
+    if not options.legal:
+        return 0
+    if not options.non_losing:
+        # the opponent wins with its next move
+        return -2
+    return max((child_value(values[bits_key(opponent, own | move, layout)])
+                for move in _moves(options.non_losing)), key=rank)
+
+
+def write_tablebase(path: str, values: dict[int, int], rows: int, columns: int, max_empty: int):
+    import numpy as np
+    keys = np.fromiter(values.keys(), dtype='<u8', count=len(values))
+    order = np.argsort(keys)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, rows, columns, max_empty, len(values)))
+        file.write(keys[order].tobytes())
+        file.write(np.fromiter(values.values(), dtype='i1', count=len(values))[order].tobytes())
+
+
+class Tablebase:
+    """the memory-mapped values of a file written by `write_tablebase`"""
+
+    def __init__(self, path: str):
+        import numpy as np
+        with open(path, 'rb') as file:
+            magic, self.rows, self.columns, self.max_empty, count = HEADER.unpack(file.read(HEADER_SIZE))
+        assert magic == MAGIC, f'{path} is not a tablebase'
+        self.path = path
+        self.layout = get_layout(self.rows, self.columns)
+        self.keys = np.memmap(path, dtype='<u8', mode='r', offset=HEADER_SIZE, shape=(count,)) \
+            if count else np.zeros(0, dtype='<u8')
+        self.values = np.memmap(path, dtype='i1', mode='r', offset=HEADER_SIZE + 8 * count, shape=(count,)) \
+            if count else np.zeros(0, dtype='i1')
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.values.nbytes
+
+    def probe_bits(self, own: int, opponent: int) -> Optional[int]:
+        """the value of the position for the player to move, None when it isn't stored"""
+        if empty_cells(own, opponent, self.layout) > self.max_empty:
+            return None
+        key = bits_key(own, opponent, self.layout)
+        index = int(self.keys.searchsorted(key))
+        if index < len(self.keys) and int(self.keys[index]) == key:
+            return int(self.values[index])
+        return None
+
+    def probe(self, board: Board, mark: int) -> Optional[int]:
+        bitboard = from_board(board)
+        return self.probe_bits(bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark))
+
+    def best_column(self, board: Board, mark: int) -> Optional[int]:
+        """the column of the best value, None when the position isn't stored"""
+        assert (board.rows, board.columns) == (self.rows, self.columns), 'the tablebase is for another board shape'
+        bitboard = from_board(board)
+        own, opponent = bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark)
+        if self.probe_bits(own, opponent) is None:
+            return None
+        options = analyse_move_bits(own, opponent, self.layout)
+        if options.winning:
+            return self._column(options.winning & -options.winning)
+        if not options.non_losing:
+            # lost anyway, block what can be blocked
+            moves = options.forced_blocks or options.legal
+            return self._column(moves & -moves)
+        best_move, best_rank = 0, None
+        for move in _moves(options.non_losing):
+            value = self.probe_bits(opponent, own | move)
+            if value is None:
+                return None
+            if best_rank is None or rank(child_value(value)) > best_rank:
+                best_move, best_rank = move, rank(child_value(value))
+        return self._column(best_move)
+
+    def _column(self, cell: int) -> int:
+        return (cell.bit_length() - 1) // self.layout.height
+
+
+def random_seeds(games: int, layout: BitboardLayout, max_empty: int, seed: int = 0) -> list[tuple[int, int]]:
+    """
+    the positions of random games once they have `max_empty` empty cells, if
+    they're still being played; the players don't miss wins or blocks, so most games get there
+    """
+    generator = random.Random(seed)
+    seeds = []
+    for _ in range(games):
+        own, opponent = 0, 0
+        while empty_cells(own, opponent, layout) > max_empty:
+            options = analyse_move_bits(own, opponent, layout)
+            move = generator.choice(list(_moves(options.non_losing or options.legal)))
+            if has_four(own | move, layout.rows):
+                break
+            own, opponent = opponent, own | move
+        else:
+            seeds.append((own, opponent))
+    return seeds
+
+
+def shard_seeds(directory: str, layout: BitboardLayout, max_empty: int) -> list[tuple[int, int]]:
+    """the positions of the shards with at most `max_empty` empty cells"""
+    from dataset.shards import list_shards, iter_batches
+    seeds = []
+    for batch in iter_batches(list_shards(directory)):
+        for cells, mark in zip(batch.boards.tolist(), batch.marks.tolist()):
+            if cells.count(0) <= max_empty:
+                bitboard = from_board(Board(cells, layout.rows, layout.columns))
+                seeds.append((bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark)))
+    return seeds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--max-empty', type=int, default=8, help='the most empty cells of a stored position')
+    parser.add_argument('--games', type=int, default=0, help='seed the positions of that many random games')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shards', help='seed the positions of the self-play shards of this directory')
+    parser.add_argument('--exhaustive', action='store_true', help='seed the empty board, for small boards')
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    args = parser.parse_args()
+
+    layout = get_layout(args.rows, args.columns)
+    seeds = random_seeds(args.games, layout, args.max_empty, args.seed)
+    if args.shards:
+        seeds += shard_seeds(args.shards, layout, args.max_empty)
+    if args.exhaustive:
+        seeds.append((0, 0))
+    assert seeds, 'no seed positions, give --games, --shards or --exhaustive'
+
+    start = time.perf_counter()
+    layers = collect_positions(seeds, layout, args.max_empty)
+    for empty in range(args.max_empty, -1, -1):
+        print(f'{empty:>3} empty cells: {len(layers[empty]):>10} positions')
+    values = solve(layers, layout)
+    write_tablebase(args.output, values, args.rows, args.columns, args.max_empty)
+    wins = sum(1 for value in values.values() if value > 0)
+    losses = sum(1 for value in values.values() if value < 0)
+    print(f'{len(values)} positions from {len(seeds)} seeds in {time.perf_counter() - start:.1f}s: '
+          f'{wins} wins, {len(values) - wins - losses} draws, {losses} losses for the player to move')
+    print(f'written to {args.output}, {HEADER_SIZE + 9 * len(values)} bytes')
+
+
+if __name__ == '__main__':
+    main()
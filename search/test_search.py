@@ -0,0 +1,237 @@
+import pickle
+import time
+import unittest
+
+from agent import search_based_agent
+from board.board_class import Board
+from board.tests.helpers import parse_board
+from data_structures import Observation, Configuration
+from search.negamax import Searcher, TranspositionTable, WIN_SCORE, EXACT, LOWER, UPPER, center_order
+from search.parallel import ParallelSearcher
+from search.ponder import PonderingAgent
+from search.shared_table import SharedTranspositionTable, ENTRY
+from search.stats import SearchStats, GameStats
+
+
+def open_three() -> Board:
+    # player 1 plays 2 or 5 next and threatens both ends of the three
+    return parse_board([
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 2, 2, 0, 0],
+        [0, 0, 0, 1, 1, 0, 2],
+    ])
+
+
+def opening(moves: list[int]) -> Board:
+    board = Board.with_heights([0] * 42, 6, 7)
+    for step, column in enumerate(moves):
+        board.board[board.landing_index(column)] = step % 2 + 1
+        board.track_heights()
+    return board
+
+
+class TestSearcher(unittest.TestCase):
+    def test_center_order(self):
+        self.assertEqual(center_order(7), (3, 2, 4, 1, 5, 0, 6))
+        self.assertEqual(center_order(4), (1, 2, 0, 3))
+
+    def test_takes_the_win(self):
+        board = parse_board([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [2, 2, 2, 0, 0, 0, 0],
+            [1, 1, 1, 0, 0, 0, 0],
+        ])
+        result = Searcher(6, 7).search(board, 1, 4)
+        self.assertEqual(result.column, 3)
+        self.assertGreaterEqual(result.score, WIN_SCORE)
+
+    def test_finds_forced_win(self):
+        result = Searcher(6, 7).search(open_three(), 1, 4)
+        self.assertIn(result.column, [2, 5])
+        self.assertGreaterEqual(result.score, WIN_SCORE)
+
+    def test_defends_forced_win(self):
+        result = Searcher(6, 7).search(open_three(), 2, 4)
+        self.assertGreater(result.score, -WIN_SCORE)
+        self.assertIn(result.column, [1, 2, 5])
+
+    def test_table_does_not_change_the_result(self):
+        board = opening([3, 3, 2, 4, 4])
+        searcher = Searcher(6, 7)
+        first = searcher.search(board, 2, 5)
+        self.assertGreater(len(searcher.table), 0)
+        second = searcher.search(board, 2, 5)
+        self.assertEqual((first.column, first.score), (second.column, second.score))
+        self.assertLess(second.nodes, first.nodes)
+
+    def test_table_is_cleared_when_full(self):
+        table = TranspositionTable(max_size=2)
+        for key in range(3):
+            table.store(key, 1, 0, 0.0, 3)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.get(2), (1, 0, 0.0, 3))
+
+    def test_table_resize(self):
+        table = TranspositionTable()
+        for key in range(100):
+            table.store(key, 1, 0, 0.0, 3)
+        self.assertGreater(table.nbytes, 100 * 100)
+        table.resize(200)
+        self.assertEqual(len(table), 100)
+        table.resize(50)
+        self.assertEqual(len(table), 50)
+        self.assertEqual(table.max_size, 50)
+        # the oldest entries are evicted
+        self.assertIsNone(table.get(49))
+        self.assertEqual(table.get(50), (1, 0, 0.0, 3))
+
+    def test_stats(self):
+        searcher = Searcher(6, 7)
+        reported = []
+        searcher.listener = reported.append
+        result = searcher.search(opening([3, 3, 2, 4]), 1, 5)
+        stats = result.stats
+        self.assertEqual(reported, [stats])
+        self.assertEqual(stats.nodes, result.nodes)
+        self.assertEqual([iteration.depth for iteration in stats.iterations], list(range(1, result.depth + 1)))
+        self.assertEqual(sum(iteration.nodes for iteration in stats.iterations), stats.nodes)
+        self.assertGreater(stats.effective_branching_factor, 1)
+        self.assertLessEqual(stats.first_move_cutoffs, stats.cutoffs)
+        self.assertLessEqual(stats.table_hits, stats.table_probes)
+        self.assertEqual(stats.to_dict()['depth'], result.depth)
+
+        game = GameStats()
+        game.add(stats)
+        game.add(SearchStats(source='threat'))
+        self.assertEqual((game.moves, game.nodes, game.depths), (2, stats.nodes, [stats.depth]))
+        self.assertEqual(game.to_dict()['shortcuts'], {'threat': 1})
+
+    def test_time_limit(self):
+        result = Searcher(6, 7).search(opening([3]), 2, 40, time_limit=0.05)
+        self.assertLess(result.depth, 40)
+        self.assertIn(result.column, range(7))
+
+    def test_agent(self):
+        board = open_three()
+        observation = Observation(board.board, 6, 1)
+        self.assertIn(search_based_agent(observation, Configuration(7, 6), depth=4), [2, 5])
+
+
+class TestParallelSearcher(unittest.TestCase):
+    def test_matches_single_process(self):
+        with ParallelSearcher(workers=2) as parallel:
+            for moves in [[3, 3, 2, 4], [3, 2, 3, 3, 4], [0, 6, 3, 3, 3]]:
+                board = opening(moves)
+                mark = len(moves) % 2 + 1
+                expected = Searcher(6, 7).search(board, mark, 5)
+                result = parallel.search(board, mark, 5)
+                self.assertEqual((result.column, result.score, result.depth),
+                                 (expected.column, expected.score, expected.depth))
+
+    def test_pool_is_reused(self):
+        with ParallelSearcher(workers=2) as parallel:
+            parallel.search(opening([3]), 2, 2)
+            pool = parallel._pool
+            parallel.search(opening([3, 3, 4]), 2, 2)
+            self.assertIs(parallel._pool, pool)
+        self.assertIsNone(parallel._pool)
+
+    def test_agent(self):
+        board = open_three()
+        observation = Observation(board.board, 6, 1)
+        with ParallelSearcher(workers=2) as parallel:
+            column = search_based_agent(observation, Configuration(7, 6), depth=4, searcher=parallel)
+        self.assertIn(column, [2, 5])
+
+
+class TestSharedTranspositionTable(unittest.TestCase):
+    def test_store_and_get(self):
+        with SharedTranspositionTable(64) as table:
+            self.assertIsNone(table.get(12345))
+            table.store(12345, 3, LOWER, -0.25, 4)
+            table.store(1 << 70, 1, EXACT, WIN_SCORE + 1, -1)
+            self.assertEqual(table.get(12345), (3, LOWER, -0.25, 4))
+            self.assertEqual(table.get(1 << 70), (1, EXACT, WIN_SCORE + 1, -1))
+            self.assertEqual(len(table), 2)
+            self.assertEqual(table.stats().hits, 2)
+            self.assertEqual(table.stats().misses, 1)
+            self.assertEqual(table.nbytes, 64 * ENTRY.size)
+
+    def test_collision_replaces_the_entry(self):
+        with SharedTranspositionTable(64) as table:
+            table.store(5, 2, EXACT, 1.0, 3)
+            table.store(5 + 64, 2, EXACT, 2.0, 3)
+            self.assertIsNone(table.get(5))
+            self.assertEqual(table.get(5 + 64)[2], 2.0)
+
+    def test_torn_entry_is_a_miss(self):
+        with SharedTranspositionTable(64) as table:
+            table.store(7, 2, EXACT, 1.0, 3)
+            table.store(8, 5, UPPER, -3.0, 1)
+            # the score word of one entry with the other words of another
+            table._buffer[7 * ENTRY.size + 8:7 * ENTRY.size + 16] = table._buffer[8 * ENTRY.size + 8:8 * ENTRY.size + 16]
+            self.assertIsNone(table.get(7))
+            self.assertIsNotNone(table.get(8))
+
+    def test_attached_table_shares_entries(self):
+        with SharedTranspositionTable(64) as table:
+            attached = pickle.loads(pickle.dumps(table))
+            attached.store(42, 4, EXACT, 0.5, 2)
+            self.assertEqual(table.get(42), (4, EXACT, 0.5, 2))
+            attached.close()
+            self.assertEqual(table.get(42), (4, EXACT, 0.5, 2))
+
+    def test_parallel_search_shares_the_table(self):
+        board = opening([3, 3, 2, 4])
+        expected = Searcher(6, 7).search(board, 1, 5)
+        with ParallelSearcher(workers=2, table_size=1 << 12) as parallel:
+            result = parallel.search(board, 1, 5)
+            parallel.search(board, 1, 5)
+            stats = parallel.table.stats()
+        self.assertEqual((result.column, result.depth), (expected.column, expected.depth))
+        self.assertGreater(stats.stores, 0)
+        self.assertGreater(stats.hit_rate, 0)
+
+
+class TestPonderingAgent(unittest.TestCase):
+    def test_next_search_starts_from_pondered_work(self):
+        board = opening([3, 3, 2])
+        agent = PonderingAgent(depth=5, ponder_depth=5)
+        column = agent(Observation(list(board.board), 3, 2), Configuration(7, 6))
+        agent._thread.join()
+        self.assertGreater(agent.pondered_nodes, 0)
+
+        board = opening([3, 3, 2, column, 4])
+        pondered = agent(Observation(list(board.board), 5, 2), Configuration(7, 6))
+        agent.close()
+        fresh = Searcher(6, 7).search(board, 2, 5)
+        self.assertEqual(pondered, fresh.column)
+        self.assertLess(agent._searcher.nodes, fresh.nodes)
+
+    def test_stops_pondering_immediately(self):
+        agent = PonderingAgent(depth=2, ponder_depth=40, ponder_time=60)
+        agent(Observation(list(opening([3]).board), 1, 2), Configuration(7, 6))
+        time.sleep(0.05)
+        start = time.perf_counter()
+        agent.stop_pondering()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIsNone(agent._thread)
+
+    def test_does_not_ponder_after_winning(self):
+        board = parse_board([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [2, 2, 2, 0, 0, 0, 0],
+            [1, 1, 1, 0, 0, 0, 0],
+        ])
+        agent = PonderingAgent(depth=2)
+        self.assertEqual(agent(Observation(board.board, 6, 1), Configuration(7, 6)), 3)
+        self.assertIsNone(agent._thread)
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from functools import lru_cache
+
+from agent import search_based_agent
+from board.bitboard import from_board, get_layout, has_four
+from board.packed import key_to_board, position_key
+from board.tests.helpers import parse_board
+from data_structures import Observation, Configuration
+from search.negamax import Searcher
+from search.tablebase import Tablebase, collect_positions, solve, write_tablebase, random_seeds, child_value, \
+    rank, HEADER_SIZE
+
+LAYOUT = get_layout(6, 7)
+MAX_EMPTY = 8
+
+
+@lru_cache(maxsize=None)
+def minimax(own: int, opponent: int) -> int:
+    """the value of the position over every legal move, without move generation"""
+    legal = ((own | opponent) + LAYOUT.bottom_mask) & LAYOUT.board_mask
+    if not legal:
+        return 0
+    values = []
+    while legal:
+        move = legal & -legal
+        legal ^= move
+        if has_four(own | move, LAYOUT.rows):
+            return 1
+        values.append(child_value(minimax(opponent, own | move)))
+    return max(values, key=rank)
+
+
+class TestTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'tablebase.bin')
+        layers = collect_positions(random_seeds(100, LAYOUT, MAX_EMPTY), LAYOUT, MAX_EMPTY)
+        cls.values = solve(layers, LAYOUT)
+        write_tablebase(cls.path, cls.values, 6, 7, MAX_EMPTY)
+        cls.tablebase = Tablebase(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.tablebase
+        cls.directory.cleanup()
+
+    def test_values(self):
+        self.assertEqual(child_value(1), -2)
+        self.assertEqual(child_value(-2), 3)
+        self.assertEqual(child_value(0), 0)
+        self.assertEqual(sorted([-2, 0, 3, 1, -4], key=rank, reverse=True), [1, 3, 0, -4, -2])
+
+    def test_file(self):
+        self.assertEqual(len(self.tablebase), len(self.values))
+        self.assertGreater(len(self.values), 0)
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE + 9 * len(self.values))
+        keys = self.tablebase.keys.tolist()
+        self.assertEqual(keys, sorted(keys))
+
+    def test_values_are_exact(self):
+        for key, value in self.values.items():
+            board = key_to_board(key, 6, 7)
+            mark = 1 if board.board.count(0) % 2 == 0 else 2
+            self.assertEqual(position_key(board), key)
+            bitboard = from_board(board)
+            self.assertEqual(minimax(bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark)), value)
+            self.assertEqual(self.tablebase.probe(board, mark), value)
+
+    def test_best_column(self):
+        for key, value in list(self.values.items())[:100]:
+            board = key_to_board(key, 6, 7)
+            if board.is_full():
+                continue
+            mark = 1 if board.board.count(0) % 2 == 0 else 2
+            column = self.tablebase.best_column(board, mark)
+            bitboard = from_board(board)
+            own, opponent = bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark)
+            move = ((own | opponent) + LAYOUT.bottom_mask) & LAYOUT.column_mask(column)
+            if has_four(own | move, 6):
+                self.assertEqual(value, 1)
+            else:
+                self.assertEqual(child_value(minimax(opponent, own | move)), value)
+
+    def test_missing_positions(self):
+        self.assertIsNone(self.tablebase.probe(parse_board([[0] * 7] * 6), 1))
+        board = parse_board([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 2, 0, 0],
+            [0, 0, 0, 1, 1, 0, 1],
+        ])
+        self.assertIsNone(self.tablebase.best_column(board, 2))
+
+    def test_agent(self):
+        key = next(key for key, value in self.values.items() if value > 1)
+        board = key_to_board(key, 6, 7)
+        mark = 1 if board.board.count(0) % 2 == 0 else 2
+        searcher = Searcher(6, 7)
+        reported = []
+        searcher.listener = reported.append
+        column = search_based_agent(Observation(board.board, 42 - board.board.count(0), mark), Configuration(7, 6),
+                                    depth=1, searcher=searcher, threat_nodes=0, tablebase=self.tablebase)
+        self.assertEqual(column, self.tablebase.best_column(board, mark))
+        self.assertEqual([stats.source for stats in reported], ['tablebase'])
+
+
+if __name__ == '__main__':
+    unittest.main()
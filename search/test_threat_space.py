@@ -0,0 +1,91 @@
+import contextlib
+import io
+import random
+import unittest
+from functools import partial
+
+from agent import search_based_agent
+from board.bitboard import from_board, has_four
+from board.board_class import Board
+from board.interaction import add_piece
+from board.tests.helpers import parse_board
+from data_structures import Observation, Configuration
+from priority_based_agent.priority_based_agent import priority_based_agent
+from search.negamax import Searcher, WIN_SCORE
+from search.threat_space import find_forced_win
+
+
+def open_two() -> Board:
+    # player 1 plays 2 or 5 for two threats on the bottom row
+    return parse_board([
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 2, 2, 0, 0],
+        [0, 0, 0, 1, 1, 0, 2],
+    ])
+
+
+def random_position(generator: random.Random) -> tuple[Board, int]:
+    while True:
+        board = Board([0] * 42, 6, 7)
+        mark = 1
+        for _ in range(generator.randint(6, 30)):
+            add_piece(board, mark, generator.choice(board.legal_columns()))
+            if has_four(from_board(board).pieces_of(mark), 6):
+                break
+            mark = 3 - mark
+        else:
+            return board, mark
+
+
+class TestThreatSpace(unittest.TestCase):
+    def test_double_threat(self):
+        forced_win = find_forced_win(open_two(), 1)
+        self.assertIn(forced_win.column, [2, 5])
+        self.assertEqual(len(forced_win.moves), 3)
+
+    def test_sequence_longer_than_the_search_depth(self):
+        board = parse_board([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [1, 2, 0, 2, 0, 0, 0],
+            [1, 1, 1, 2, 0, 0, 0],
+            [2, 2, 1, 1, 2, 0, 1],
+        ])
+        forced_win = find_forced_win(board, 2)
+        self.assertEqual(forced_win.moves, [2, 1, 3, 3, 4, 4, 2, 0, 1])
+        self.assertGreaterEqual(Searcher(6, 7).search(board, 2, 9).score, WIN_SCORE)
+
+    def test_no_threats(self):
+        self.assertIsNone(find_forced_win(Board([0] * 42, 6, 7), 1))
+        self.assertIsNone(find_forced_win(open_two(), 2))
+
+    def test_node_limit(self):
+        self.assertIsNone(find_forced_win(open_two(), 1, max_nodes=0))
+
+    def test_wins_are_forced(self):
+        generator = random.Random(1)
+        found = 0
+        for _ in range(150):
+            board, mark = random_position(generator)
+            forced_win = find_forced_win(board, mark)
+            if forced_win is not None:
+                found += 1
+                result = Searcher(6, 7).search(board, mark, len(forced_win.moves))
+                self.assertGreaterEqual(result.score, WIN_SCORE, (board.board, mark, forced_win))
+        self.assertGreater(found, 0)
+
+    def test_agents(self):
+        observation = Observation(open_two().board, 7, 1)
+        configuration = Configuration(7, 6)
+        self.assertIn(search_based_agent(observation, configuration, depth=1), [2, 5])
+        with contextlib.redirect_stdout(io.StringIO()):
+            column = partial(priority_based_agent, threat_nodes=100)(observation, configuration)
+        self.assertIn(column, [2, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Threat-space search: proves a forced win made of immediate threats.
+
+The attacker only plays moves that create an immediate threat (a playable cell
+completing four), so the defender has exactly one move that doesn't lose, the
+block, which is the only reply searched. The attacker wins when a move creates
+two immediate threats, or a threat the defender can't block without unlocking
+another one above it (see `board.move_generation`). Such sequences are often
+longer than the depth of the main search, but searching them is cheap: one
+attacker move per column and a single reply per move.
+
+A search is limited to `max_nodes` attacker moves; when the limit is reached
+before a win is proven, no win is reported.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from board.bitboard import BitboardLayout, get_layout, from_board
+from board.board_class import Board
+from board.move_generation import analyse_move_bits
+from board.threats import winning_cells, playable_cells
+
+
+class NodeLimitReached(Exception):
+    pass
+
+
+@dataclass
+class ForcedWin:
+    column: int  # the first move
+    moves: list[int]  # the columns of the whole sequence, attacker and defender alternating
+    nodes: int
+
+
+class ThreatSpaceSearch:
+    def __init__(self, layout: BitboardLayout, max_nodes: int = 2000):
+        self.layout = layout
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self._failed: set[int] = set()  # keys of positions without a forced win
+
+    def search(self, own: int, opponent: int) -> Optional[ForcedWin]:
+        """a forced win for the player with the `own` bits, who is to move"""
+        self.nodes = 0
+        self._failed.clear()
+        try:
+            moves = self._attack(own, opponent)
+        except NodeLimitReached:
+            return None
+        if moves is None:
+            return None
+        return ForcedWin(moves[0], moves, self.nodes)
+
+    def _attack(self, own: int, opponent: int) -> Optional[list[int]]:
+        layout = self.layout
+        options = analyse_move_bits(own, opponent, layout)
+        if options.winning:
+            return [self._column(options.winning & -options.winning)]
+        key = own + (own | opponent) + layout.bottom_mask
+        if key in self._failed:
+            return None
+
+        moves = options.non_losing
+        while moves:
+            move = moves & -moves
+            moves ^= move
+            self.nodes += 1
+            if self.nodes > self.max_nodes:
+                raise NodeLimitReached()
+
+            attacker = own | move
+            occupied = own | opponent | move
+            if not winning_cells(attacker, occupied, layout) & playable_cells(occupied, layout):
+                continue
+            replies = analyse_move_bits(opponent, attacker, layout)
+            if replies.winning:
+                continue
+            if not replies.non_losing:
+                # two threats, or a block that unlocks another threat: any reply loses
+                return [self._column(move), self._column(replies.legal & -replies.legal)] + \
+                    self._winning_moves(attacker, opponent | (replies.legal & -replies.legal))
+            block = replies.non_losing
+            line = self._attack(attacker, opponent | block)
+            if line is not None:
+                return [self._column(move), self._column(block)] + line
+
+        self._failed.add(key)
+        return None
+
+    def _winning_moves(self, own: int, opponent: int) -> list[int]:
+        """the winning move of the attacker after any reply, to complete the sequence"""
+        options = analyse_move_bits(own, opponent, self.layout)
+        return [self._column(options.winning & -options.winning)] if options.winning else []
+
+    def _column(self, cell: int) -> int:
+        return (cell.bit_length() - 1) // self.layout.height
+
+
+def find_forced_win(board: Board, mark: int, max_nodes: int = 2000) -> Optional[ForcedWin]:
+    """a forced win of immediate threats for the player with that mark, who is to move"""
+    bitboard = from_board(board)
+    searcher = ThreatSpaceSearch(get_layout(board.rows, board.columns), max_nodes)
+    return searcher.search(bitboard.pieces_of(mark), bitboard.pieces_of(3 - mark))
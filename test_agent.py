@@ -1,6 +1,6 @@
 import unittest
 
-from agent import simple_reward_agent
+from agent import simple_reward_agent, pattern_reward_agent
 from board.tests.helpers import parse_board
 from data_structures import Observation, Configuration
 
@@ -27,3 +27,19 @@ class TestAgent(unittest.TestCase):
             columns=7
         )
         self.assertEqual(simple_reward_agent(observation, configuration), 3)
+
+    def test_does_not_play_under_opponent_threat(self):
+        board = parse_board(
+            [
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 2, 2, 2, 0, 0, 0],
+                [0, 1, 1, 2, 0, 1, 1]
+            ]
+        )
+        observation = Observation(board.board, step=8, mark=1)
+        configuration = Configuration(rows=6, columns=7)
+        self.assertNotIn(simple_reward_agent(observation, configuration), [0, 4])
+        self.assertNotIn(pattern_reward_agent(observation, configuration), [0, 4])